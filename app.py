@@ -1,26 +1,142 @@
 # Nicholas J Uhlhorn
 # November 2025
 
-from flask import Flask, session
+from flask import Flask, session, render_template
 import os
-from extensions import db
+from extensions import db, configure_sqlite, SQLITE_PROFILES
 from routes.routes import main_bp
-from routes.test_routes import test_bp, run_service_tests
+from routes.debug_routes import debug_bp
+from routes.api_routes import api_bp
+from cli import register_commands
+from services import user_service, project_service, password_service, friend_graph_service, event_bus, trending_service, access_service, reaction_service
+from services.write_queue import WriteQueueFull
+import migrations
+import instrumentation
+import fragment_cache
+import http_cache
 
 DB_DIR  = os.path.join(os.getcwd(), 'db_data')
 DB_PATH = os.path.join(DB_DIR, 'database.db')
 
-def create_app():
+def create_app(config: dict = None):
     app = Flask(__name__)
     basedir = os.path.abspath(os.path.dirname(__file__))
     app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + DB_PATH
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
     app.secret_key = "dummy"  # TODO: make this more secure
 
+    # Database tuning, see SQLITE_PROFILES in extensions.py
+    app.config['DATABASE_PROFILE'] = os.environ.get('DATABASE_PROFILE', 'tuned')
+    app.config['DB_POOL_SIZE'] = int(os.environ.get('DB_POOL_SIZE', 8))
+    app.config['DB_MAX_OVERFLOW'] = int(os.environ.get('DB_MAX_OVERFLOW', 8))
+    app.config['DB_POOL_TIMEOUT'] = int(os.environ.get('DB_POOL_TIMEOUT', 10))
+    # Overrides the profile's busy_timeout; gunicorn.conf.py lowers it under gevent
+    busy_timeout = os.environ.get('DB_BUSY_TIMEOUT_MS')
+    app.config['DB_BUSY_TIMEOUT_MS'] = int(busy_timeout) if busy_timeout else None
+
+    # Request/SQL instrumentation, see instrumentation.py
+    app.config['SLOW_REQUEST_MS'] = int(os.environ.get('SLOW_REQUEST_MS', 500))
+    app.config['SLOW_QUERY_MS'] = int(os.environ.get('SLOW_QUERY_MS', 100))
+    app.config['MAX_QUERIES_PER_REQUEST'] = int(os.environ.get('MAX_QUERIES_PER_REQUEST', 20))
+    app.config['DEBUG_METRICS_ENDPOINT'] = os.environ.get('DEBUG_METRICS_ENDPOINT', '0') == '1'
+
+    # Per-process cache of logged-in user identities, see user_service
+    app.config['IDENTITY_CACHE_SIZE'] = int(os.environ.get('IDENTITY_CACHE_SIZE', 4096))
+    app.config['IDENTITY_CACHE_TTL'] = float(os.environ.get('IDENTITY_CACHE_TTL', 60))
+    app.config['FRIEND_CACHE_SIZE'] = int(os.environ.get('FRIEND_CACHE_SIZE', 10000))
+    app.config['FRIEND_CACHE_TTL'] = float(os.environ.get('FRIEND_CACHE_TTL', 300))
+    app.config['AVAILABLE_CACHE_SIZE'] = int(os.environ.get('AVAILABLE_CACHE_SIZE', 4096))
+    app.config['AVAILABLE_CACHE_TTL'] = float(os.environ.get('AVAILABLE_CACHE_TTL', 30))
+    app.config['ACCESS_CACHE_SIZE'] = int(os.environ.get('ACCESS_CACHE_SIZE', 50000))
+    app.config['ACCESS_CACHE_TTL'] = float(os.environ.get('ACCESS_CACHE_TTL', 60))
+    app.config['FRAGMENT_CACHE_SIZE'] = int(os.environ.get('FRAGMENT_CACHE_SIZE', 2048))
+    app.config['FRAGMENT_CACHE_BACKEND'] = os.environ.get('FRAGMENT_CACHE_BACKEND')
+
+    # Password hashing pool, see password_service
+    app.config['PASSWORD_HASH_METHOD'] = os.environ.get('PASSWORD_HASH_METHOD', password_service.DEFAULT_METHOD)
+    app.config['PASSWORD_HASH_WORKERS'] = int(os.environ.get('PASSWORD_HASH_WORKERS', 2))
+    app.config['PASSWORD_HASH_QUEUE'] = int(os.environ.get('PASSWORD_HASH_QUEUE', 32))
+    app.config['PASSWORD_HASH_TIMEOUT'] = float(os.environ.get('PASSWORD_HASH_TIMEOUT', 10))
+
+    # Live update streams, see services/event_bus.py
+    # Each open stream holds a worker connection for up to EVENT_STREAM_MAX_SECONDS;
+    # gunicorn.conf.py turns streams off unless workers are gevent
+    app.config['EVENT_STREAMS'] = os.environ.get('EVENT_STREAMS', '1') == '1'
+    app.config['EVENT_HEARTBEAT_SECONDS'] = float(os.environ.get('EVENT_HEARTBEAT_SECONDS', 15))
+    app.config['EVENT_STREAM_MAX_SECONDS'] = float(os.environ.get('EVENT_STREAM_MAX_SECONDS', 300))
+    app.config['EVENT_BUFFER_SIZE'] = int(os.environ.get('EVENT_BUFFER_SIZE', event_bus.DEFAULT_BUFFER_SIZE))
+    app.config['EVENT_HISTORY_SIZE'] = int(os.environ.get('EVENT_HISTORY_SIZE', event_bus.DEFAULT_HISTORY_SIZE))
+    app.config['EVENT_HISTORY_SECONDS'] = float(os.environ.get('EVENT_HISTORY_SECONDS', event_bus.DEFAULT_HISTORY_SECONDS))
+
+    # Trending feed decay, see services/trending_service.py
+    app.config['TRENDING_HALF_LIFE_HOURS'] = float(os.environ.get('TRENDING_HALF_LIFE_HOURS', 24))
+
+    # Write-behind queue for reactions, see services/write_queue.py
+    app.config['REACTION_WRITE_MODE'] = os.environ.get('REACTION_WRITE_MODE', 'immediate')
+    app.config['REACTION_FLUSH_MS'] = float(os.environ.get('REACTION_FLUSH_MS', 5))
+    app.config['REACTION_BATCH_SIZE'] = int(os.environ.get('REACTION_BATCH_SIZE', 256))
+    app.config['REACTION_QUEUE_LIMIT'] = int(os.environ.get('REACTION_QUEUE_LIMIT', 10000))
+    app.config['REACTION_QUEUE_TIMEOUT'] = float(os.environ.get('REACTION_QUEUE_TIMEOUT', 10))
+
+    # Overrides (e.g. an in-memory database for the test suite)
+    if config:
+        app.config.update(config)
+
+    # In-memory databases use a single shared connection, so pool sizing only
+    # applies to file-backed databases. Size the pool to at least the number
+    # of threads per worker so requests don't queue for a connection.
+    if app.config['SQLALCHEMY_DATABASE_URI'] not in ('sqlite://', 'sqlite:///:memory:'):
+        app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', {
+            'pool_size': app.config['DB_POOL_SIZE'],
+            'max_overflow': app.config['DB_MAX_OVERFLOW'],
+            'pool_timeout': app.config['DB_POOL_TIMEOUT'],
+        })
+
     db.init_app(app)
+    pragmas = dict(SQLITE_PROFILES[app.config['DATABASE_PROFILE']])
+    if app.config['DB_BUSY_TIMEOUT_MS'] is not None:
+        pragmas['busy_timeout'] = app.config['DB_BUSY_TIMEOUT_MS']
+    with app.app_context():
+        configure_sqlite(db.engine, pragmas)
+    instrumentation.init_app(app)
+
+    user_service.identity_cache.configure(app.config['IDENTITY_CACHE_SIZE'], app.config['IDENTITY_CACHE_TTL'])
+    instrumentation.register_metrics_source('identity_cache', user_service.get_identity_cache_stats)
+    friend_graph_service.adjacency_cache.configure(app.config['FRIEND_CACHE_SIZE'], app.config['FRIEND_CACHE_TTL'])
+    instrumentation.register_metrics_source('friend_cache', friend_graph_service.get_adjacency_cache_stats)
+    project_service.available_cache.configure(app.config['AVAILABLE_CACHE_SIZE'], app.config['AVAILABLE_CACHE_TTL'])
+    instrumentation.register_metrics_source('available_cache', project_service.get_available_cache_stats)
+    access_service.access_cache.configure(app.config['ACCESS_CACHE_SIZE'], app.config['ACCESS_CACHE_TTL'])
+    instrumentation.register_metrics_source('access_cache', access_service.get_access_cache_stats)
+    fragment_cache.init_app(app)
+    http_cache.init_app(app)
+    instrumentation.register_metrics_source('fragment_cache', fragment_cache.get_stats)
+
+    password_service.configure(app.config['PASSWORD_HASH_METHOD'], app.config['PASSWORD_HASH_WORKERS'],
+                               app.config['PASSWORD_HASH_QUEUE'], app.config['PASSWORD_HASH_TIMEOUT'])
+    instrumentation.register_metrics_source('password_hashing', password_service.get_stats)
+    trending_service.configure(app.config['TRENDING_HALF_LIFE_HOURS'])
+    event_bus.bus.configure(app.config['EVENT_BUFFER_SIZE'], app.config['EVENT_HISTORY_SIZE'],
+                            app.config['EVENT_HISTORY_SECONDS'])
+    instrumentation.register_metrics_source('event_bus', event_bus.get_stats)
+    reaction_service.write_queue.configure(app, app.config['REACTION_WRITE_MODE'], app.config['REACTION_FLUSH_MS'],
+                                           app.config['REACTION_BATCH_SIZE'], app.config['REACTION_QUEUE_LIMIT'],
+                                           app.config['REACTION_QUEUE_TIMEOUT'])
+    instrumentation.register_metrics_source('reaction_writes', reaction_service.get_write_queue_stats)
+
+    @app.errorhandler(password_service.HashingPoolFull)
+    def hashing_pool_full(e):
+        # Shed load quickly instead of queueing more CPU-bound work
+        return render_template('something_went_wrong.html'), 503, {'Retry-After': '1'}
+
+    @app.errorhandler(WriteQueueFull)
+    def write_queue_full(e):
+        return render_template('something_went_wrong.html'), 503, {'Retry-After': '1'}
 
     app.register_blueprint(main_bp)
-    app.register_blueprint(test_bp)
+    app.register_blueprint(debug_bp)
+    app.register_blueprint(api_bp)
+    register_commands(app)
 
     import models
 
@@ -30,7 +146,6 @@ def create_app():
 if __name__ == '__main__':
     app = create_app()
     with app.app_context():
-        db.create_all()
-        run_service_tests()
+        migrations.upgrade()
 
     app.run(host='0.0.0.0', port=5001)
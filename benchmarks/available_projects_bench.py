@@ -0,0 +1,104 @@
+"""
+"Available projects" latency for users who belong to thousands of projects.
+
+Bulk-imports projects and memberships into an on-disk database, then times
+one page of get_available_projects (the NOT EXISTS anti-join, uncached and
+cached) against loading every published project and filtering out the user's
+memberships in Python:
+
+    python -m benchmarks.available_projects_bench --projects 200000 --memberships 0 1000 5000 20000
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from extensions import db
+from models.project import Project, ProjectMember
+from services import bulk_service, project_service
+import migrations
+
+
+def generate(n_projects: int, memberships: list, seed: int):
+    """User 1 owns everything; user k+2 is a member of memberships[k] projects."""
+    rng = random.Random(seed)
+    started = datetime(2025, 11, 1)
+    yield {'kind': 'user', 'uid': 1, 'email': 'owner@test.com', 'username': 'owner', 'hashed_password': 'hash'}
+    for i, count in enumerate(memberships):
+        uid = i + 2
+        yield {'kind': 'user', 'uid': uid, 'email': f'user{uid}@test.com', 'username': f'user{uid}', 'hashed_password': 'hash'}
+    for pid in range(1, n_projects + 1):
+        yield {'kind': 'project', 'pid': pid, 'name': f'Project {pid}', 'visibility': 'PUBLISHED',
+               'status': 0, 'owner_uid': 1, 'created_at': (started + timedelta(seconds=pid)).isoformat()}
+    for i, count in enumerate(memberships):
+        # Half the memberships are in the newest projects, which the feed has to skip first
+        newest = range(n_projects, n_projects - count // 2, -1)
+        spread = rng.sample(range(1, n_projects - count // 2 + 1), count - count // 2)
+        for pid in list(newest) + spread:
+            yield {'kind': 'member', 'pid': pid, 'uid': i + 2, 'role': 'VIEWER'}
+
+
+def naive_available(uid: int, limit: int) -> list:
+    joined = set(db.session.execute(db.select(ProjectMember.pid).where(ProjectMember.uid == uid)).scalars())
+    projects = db.session.execute(
+        db.select(Project).where(Project.visibility == 'PUBLISHED').order_by(Project.created_at.desc(), Project.pid.desc())
+    ).scalars().all()
+    return [p for p in projects if p.pid not in joined][:limit]
+
+
+def timed(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--projects', type=int, default=200000)
+    parser.add_argument('--memberships', type=int, nargs='+', default=[0, 1000, 5000, 20000])
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--naive-repeat', type=int, default=2)
+    parser.add_argument('--seed', type=int, default=436)
+    args = parser.parse_args()
+
+    db_path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + db_path})
+    with app.app_context():
+        migrations.upgrade()
+        bulk_service.import_records(generate(args.projects, args.memberships, args.seed))
+
+        def cursor_for(uid, page):
+            cursor = None
+            for _ in range(page - 1):
+                _, cursor = project_service.get_available_projects(uid, cursor)
+            return cursor
+
+        def uncached(uid, cursor):
+            def run():
+                project_service.available_cache.clear()
+                project_service.get_available_projects(uid, cursor)
+            return run
+
+        print(f"{'memberships':>12} {'page 1':>10} {'page 10':>10} {'cached':>10} {'naive':>10}   (median ms)")
+        for i, count in enumerate(args.memberships):
+            uid = i + 2
+            first = timed(uncached(uid, None), args.repeat)
+            tenth = timed(uncached(uid, cursor_for(uid, 10)), args.repeat)
+            cached = timed(lambda: project_service.get_available_projects(uid), args.repeat)
+            naive = timed(lambda: naive_available(uid, project_service.FEED_DEFAULT_LIMIT), args.naive_repeat)
+            print(f'{count:>12} {first:>10.2f} {tenth:>10.2f} {cached:>10.3f} {naive:>10.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""
+Bulk import throughput on an on-disk SQLite database.
+
+Generates a synthetic NDJSON stream (users, projects, memberships, reactions
+and friend requests), imports it with bulk_service and reports rows/minute.
+Also times the export of everything just imported:
+
+    python -m benchmarks.bulk_import_bench --users 50000 --projects 20000 --batch-size 5000
+"""
+
+import argparse
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from services import bulk_service
+import migrations
+
+
+def generate(n_users: int, n_projects: int, seed: int):
+    rng = random.Random(seed)
+    for uid in range(1, n_users + 1):
+        yield {'kind': 'user', 'uid': uid, 'email': f'user{uid}@test.com', 'username': f'user{uid}',
+               'hashed_password': 'hash', 'created_at': '2025-11-01T12:00:00'}
+    for pid in range(1, n_projects + 1):
+        owner = rng.randint(1, n_users)
+        yield {'kind': 'project', 'pid': pid, 'name': f'Project {pid}', 'description': 'Imported project',
+               'visibility': 'PUBLISHED', 'status': rng.random(), 'owner_uid': owner}
+        for uid in rng.sample(range(1, n_users + 1), 3):
+            if uid != owner:
+                yield {'kind': 'member', 'pid': pid, 'uid': uid, 'role': 'VIEWER'}
+        for uid in rng.sample(range(1, n_users + 1), 5):
+            yield {'kind': 'reaction', 'pid': pid, 'uid': uid, 'type': rng.choice(['LIKE', 'UPVOTE'])}
+    for uid in range(1, n_users + 1):
+        other = rng.randint(1, n_users)
+        if other != uid:
+            yield {'kind': 'friend_request', 'requestor_uid': uid, 'recipient_uid': other,
+                   'status': rng.choice(['PENDING', 'ACCEPTED'])}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=50000)
+    parser.add_argument('--projects', type=int, default=20000)
+    parser.add_argument('--batch-size', type=int, default=bulk_service.DEFAULT_BATCH_SIZE)
+    parser.add_argument('--seed', type=int, default=436)
+    args = parser.parse_args()
+
+    ndjson = io.StringIO()
+    for record in generate(args.users, args.projects, args.seed):
+        ndjson.write(json.dumps(record) + '\n')
+    ndjson.seek(0)
+
+    db_path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + db_path})
+    with app.app_context():
+        migrations.upgrade()
+
+        started = time.perf_counter()
+        counts = bulk_service.import_records(bulk_service.read_ndjson(ndjson), args.batch_size)
+        elapsed = time.perf_counter() - started
+        rows = sum(counts.values())
+        print(f'imported {rows} records in {elapsed:.2f}s ({rows / elapsed * 60:,.0f} rows/min)')
+        print('  ' + ', '.join(f'{kind}={count}' for kind, count in counts.items()))
+
+        started = time.perf_counter()
+        exported = bulk_service.write_ndjson(bulk_service.export_records(), io.StringIO())
+        elapsed = time.perf_counter() - started
+        print(f'exported {exported} records in {elapsed:.2f}s ({exported / elapsed * 60:,.0f} rows/min)')
+
+
+if __name__ == '__main__':
+    main()
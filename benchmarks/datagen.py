@@ -0,0 +1,111 @@
+"""
+Deterministic synthetic data for the benchmark suite.
+
+Each scale profile fixes how many users, projects, memberships, friend
+requests and reactions to generate; the same scale and seed always produce
+the same records. Records are bulk_service.import_records() dicts, streamed
+so the 10m profile never has to fit in memory:
+
+    python -m benchmarks.datagen --scale 100k --output data.ndjson
+"""
+
+import argparse
+import json
+import random
+import sys
+from datetime import datetime, timedelta
+
+# Rows per kind; each profile totals roughly its name
+SCALES = {
+    '1k': {'users': 100, 'projects': 100, 'members': 300, 'friend_requests': 200, 'reactions': 300},
+    '100k': {'users': 10000, 'projects': 10000, 'members': 30000, 'friend_requests': 20000, 'reactions': 30000},
+    '10m': {'users': 1000000, 'projects': 1000000, 'members': 3000000, 'friend_requests': 2000000, 'reactions': 3000000},
+}
+DEFAULT_SEED = 436
+
+# Fixed, so timestamps don't depend on when the data was generated
+STARTED = datetime(2025, 1, 1)
+SPAN_SECONDS = 365 * 24 * 3600
+REACTION_TYPES = ('LIKE', 'UPVOTE', 'CELEBRATE')
+PASSWORD_HASH = 'benchmark-hash'
+
+
+def _spread(total: int, buckets: int, rng: random.Random, cap: int) -> list:
+    """Splits `total` over `buckets` with a long tail (a few large, most small), each at most `cap`."""
+    weights = [rng.paretovariate(1.5) for _ in range(buckets)]
+    scale = total / sum(weights)
+    counts = [min(cap, int(weight * scale)) for weight in weights]
+    # Hand out what rounding and the cap left over, one at a time
+    shortfall = total - sum(counts)
+    index = 0
+    while shortfall > 0:
+        if counts[index % buckets] < cap:
+            counts[index % buckets] += 1
+            shortfall -= 1
+        index += 1
+    return counts
+
+
+def _timestamp(rng: random.Random) -> str:
+    return (STARTED + timedelta(seconds=rng.randrange(SPAN_SECONDS))).isoformat(sep=' ')
+
+
+def generate(scale: str, seed: int = DEFAULT_SEED):
+    """
+    Yields the records for a scale profile, parents before children. Users and
+    projects get explicit ids 1..n. Members and reactions of a project are a
+    run of consecutive uids from a random offset, and a user's friend requests
+    go to the next few uids, so no pair repeats without tracking seen pairs.
+    """
+    counts = SCALES[scale]
+    rng = random.Random(seed)
+    n_users, n_projects = counts['users'], counts['projects']
+
+    for uid in range(1, n_users + 1):
+        yield {'kind': 'user', 'uid': uid, 'email': f'user{uid}@bench.test', 'username': f'user{uid}',
+               'hashed_password': PASSWORD_HASH, 'created_at': _timestamp(rng)}
+
+    for pid in range(1, n_projects + 1):
+        yield {'kind': 'project', 'pid': pid, 'owner_uid': rng.randint(1, n_users), 'name': f'Project {pid}',
+               'description': f'Benchmark project {pid}', 'visibility': 'PUBLISHED', 'status': rng.random(),
+               'created_at': _timestamp(rng)}
+
+    # Owners are inserted with their projects; a member row that hits one is ignored
+    for pid, count in enumerate(_spread(counts['members'], n_projects, rng, n_users - 1), start=1):
+        offset = rng.randrange(n_users)
+        for j in range(count):
+            yield {'kind': 'member', 'pid': pid, 'uid': (offset + j) % n_users + 1,
+                   'role': 'EDITOR' if j % 5 == 0 else 'VIEWER'}
+
+    # Recipients stay under half the ring away, so (a, b) and (b, a) never both appear
+    per_user = _spread(counts['friend_requests'], n_users, rng, max(0, (n_users - 1) // 2))
+    for uid, count in enumerate(per_user, start=1):
+        for j in range(count):
+            yield {'kind': 'friend_request', 'requestor_uid': uid, 'recipient_uid': (uid + j) % n_users + 1,
+                   'status': 'ACCEPTED' if rng.random() < 0.6 else 'PENDING', 'created_at': _timestamp(rng)}
+
+    for pid, count in enumerate(_spread(counts['reactions'], n_projects, rng, n_users), start=1):
+        offset = rng.randrange(n_users)
+        for j in range(count):
+            yield {'kind': 'reaction', 'pid': pid, 'uid': (offset + j) % n_users + 1,
+                   'type': REACTION_TYPES[j % len(REACTION_TYPES)], 'created_at': _timestamp(rng)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scale', choices=SCALES, default='1k')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    parser.add_argument('--output', default='-', help='NDJSON file, or - for stdout')
+    args = parser.parse_args()
+
+    out = sys.stdout if args.output == '-' else open(args.output, 'w')
+    try:
+        for record in generate(args.scale, args.seed):
+            out.write(json.dumps(record) + '\n')
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""
+Mixed read/write throughput with and without the tuned SQLite profile.
+
+Each profile gets a fresh on-disk database. Worker threads then run a mix of
+feed reads, reaction-summary reads and reaction writes for a fixed time:
+
+    python -m benchmarks.db_profile_bench --threads 8 --duration 10 --write-ratio 0.2
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy.exc import OperationalError
+from app import create_app
+from extensions import db
+from services import user_service, project_service, reaction_service
+import migrations
+
+
+def seed(n_users: int, n_projects: int):
+    uids = [user_service.create_new_user(f'user{i}@test.com', f'user{i}', 'hash').uid for i in range(n_users)]
+    pids = [project_service.create_new_project(uids[i % n_users], f'Project {i}').pid for i in range(n_projects)]
+    return uids, pids
+
+
+def run_profile(profile: str, args) -> dict:
+    workdir = tempfile.mkdtemp()
+    app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + os.path.join(workdir, 'bench.db'),
+                      'DATABASE_PROFILE': profile})
+    with app.app_context():
+        migrations.upgrade()
+        uids, pids = seed(args.users, args.projects)
+
+    reads, writes, locked = [0], [0], [0]
+    counter_lock = threading.Lock()
+    stop_at = time.time() + args.duration
+
+    def worker(seed_value):
+        rng = random.Random(seed_value)
+        n_reads = n_writes = n_locked = 0
+        with app.app_context():
+            while time.time() < stop_at:
+                try:
+                    if rng.random() < args.write_ratio:
+                        reaction_service.add_reaction(rng.choice(pids), rng.choice(uids), rng.choice(['LIKE', 'UPVOTE']))
+                        n_writes += 1
+                    else:
+                        rows, _ = project_service.get_published_project_feed(limit=20)
+                        reaction_service.get_reaction_summaries(row.pid for row in rows)
+                        n_reads += 1
+                except OperationalError:
+                    db.session.rollback()
+                    n_locked += 1
+            db.session.remove()
+        with counter_lock:
+            reads[0] += n_reads
+            writes[0] += n_writes
+            locked[0] += n_locked
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(args.threads)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    return {'reads/s': reads[0] / args.duration, 'writes/s': writes[0] / args.duration, 'locked': locked[0]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--write-ratio', type=float, default=0.2)
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--projects', type=int, default=500)
+    args = parser.parse_args()
+
+    print(f"{'profile':>8} {'reads/s':>10} {'writes/s':>10} {'locked':>8}")
+    for profile in ('default', 'tuned'):
+        result = run_profile(profile, args)
+        print(f"{profile:>8} {result['reads/s']:>10.1f} {result['writes/s']:>10.1f} {result['locked']:>8}")
+
+
+if __name__ == '__main__':
+    main()
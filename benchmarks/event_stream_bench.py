@@ -0,0 +1,159 @@
+"""
+Idle-connection load test for the live update streams.
+
+Starts gunicorn with one worker, opens thousands of idle event streams on a
+project, then measures how long one reaction takes to reach every stream and
+how a normal page responds while the streams are held open:
+
+    python -m benchmarks.event_stream_bench --connections 5000
+    python -m benchmarks.event_stream_bench --worker-class gthread --threads 64 --connections 50
+
+Streams hold a greenlet each under the gevent worker class (the default here)
+and a whole thread each under gthread.
+"""
+
+import argparse
+import http.client
+import json
+import resource
+import selectors
+import socket
+import statistics
+import tempfile
+import time
+
+from benchmarks.load_test import seed_database, start_server, stop_server, login
+
+
+def raise_fd_limit(needed: int):
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < needed:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (min(needed, hard), hard))
+
+
+def open_streams(port: int, path: str, cookie: str, count: int, timeout: float) -> tuple:
+    """Opens `count` event streams; returns (sockets, seconds until all had answered)."""
+    selector = selectors.DefaultSelector()
+    request = (f'GET {path} HTTP/1.1\r\nHost: 127.0.0.1\r\nCookie: {cookie}\r\n'
+               'Accept: text/event-stream\r\n\r\n').encode()
+    started = time.perf_counter()
+    streams = []
+    for _ in range(count):
+        sock = socket.create_connection(('127.0.0.1', port))
+        sock.sendall(request)
+        sock.setblocking(False)
+        selector.register(sock, selectors.EVENT_READ)
+        streams.append(sock)
+
+    # Wait until every stream has sent its headers and retry line
+    pending = set(streams)
+    deadline = time.time() + timeout
+    while pending and time.time() < deadline:
+        for key, _ in selector.select(timeout=1):
+            data = key.fileobj.recv(65536)
+            if key.fileobj in pending:
+                if not data.startswith(b'HTTP/1.1 200'):
+                    raise RuntimeError(f'stream refused: {data[:80]!r}')
+                pending.discard(key.fileobj)
+    selector.close()
+    if pending:
+        raise RuntimeError(f'{len(pending)} of {count} streams did not open within {timeout}s')
+    return streams, time.perf_counter() - started
+
+
+def drain(streams: list):
+    """Discards anything already buffered (retry lines, heartbeats)."""
+    for sock in streams:
+        try:
+            while sock.recv(65536):
+                pass
+        except BlockingIOError:
+            pass
+
+
+def measure_fanout(port: int, pid: int, cookie: str, streams: list, timeout: float) -> list:
+    """Adds a reaction and returns, per stream, the seconds until it saw the event."""
+    drain(streams)
+    selector = selectors.DefaultSelector()
+    for sock in streams:
+        selector.register(sock, selectors.EVENT_READ)
+
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    started = time.perf_counter()
+    conn.request('PUT', f'/api/v1/projects/{pid}/reactions', json.dumps({'type': 'UPVOTE'}),
+                 {'Cookie': cookie, 'Content-Type': 'application/json'})
+    conn.getresponse().read()
+
+    latencies = []
+    deadline = time.time() + timeout
+    waiting = set(streams)
+    while waiting and time.time() < deadline:
+        for key, _ in selector.select(timeout=1):
+            if key.fileobj in waiting and b'event: reaction' in key.fileobj.recv(65536):
+                latencies.append(time.perf_counter() - started)
+                waiting.discard(key.fileobj)
+    selector.close()
+    if waiting:
+        print(f'  ({len(waiting)} streams missed the event)')
+    return latencies
+
+
+def page_latency(port: int, cookie: str, route: str, requests: int) -> list:
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    latencies = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        conn.request('GET', route, headers={'Cookie': cookie})
+        conn.getresponse().read()
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+def percentile(values: list, p: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--connections', type=int, default=2000)
+    parser.add_argument('--worker-class', default='gevent')
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--timeout', type=float, default=60.0)
+    parser.add_argument('--port', type=int, default=5056)
+    args = parser.parse_args()
+
+    raise_fd_limit(args.connections + 256)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        pid = seed_database(workdir, 10)
+        proc = start_server(workdir, args.port, 1, args.threads,
+                            WEB_WORKER_CLASS=args.worker_class,
+                            WEB_WORKER_CONNECTIONS=str(args.connections + 100),
+                            EVENT_HEARTBEAT_SECONDS='5')
+        try:
+            cookie = login(http.client.HTTPConnection('127.0.0.1', args.port, timeout=30))
+            baseline = page_latency(args.port, cookie, '/', args.requests)
+
+            streams, open_seconds = open_streams(args.port, f'/api/v1/projects/{pid}/events', cookie,
+                                                 args.connections, args.timeout)
+            try:
+                fanout = measure_fanout(args.port, pid, cookie, streams, args.timeout)
+                loaded = page_latency(args.port, cookie, '/', args.requests)
+            finally:
+                for sock in streams:
+                    sock.close()
+        finally:
+            stop_server(proc)
+
+    print(f'{args.connections} streams opened in {open_seconds:.2f}s ({args.worker_class})')
+    if fanout:
+        print(f'event fan-out: p50 {statistics.median(fanout) * 1000:.1f} ms, '
+              f'p99 {percentile(fanout, 0.99) * 1000:.1f} ms, last {max(fanout) * 1000:.1f} ms')
+    print(f"GET / idle:         p50 {statistics.median(baseline) * 1000:.1f} ms, p99 {percentile(baseline, 0.99) * 1000:.1f} ms")
+    print(f"GET / with streams: p50 {statistics.median(loaded) * 1000:.1f} ms, p99 {percentile(loaded, 0.99) * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""
+Full-page render time for / and /my_projects with the project-card fragment
+cache disabled, cold (emptied before every request) and warm:
+
+    python -m benchmarks.fragment_cache_bench --projects 100 --requests 200
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from services import user_service, project_service, reaction_service
+import fragment_cache
+import migrations
+
+
+def time_requests(client, path, n, before_each=None):
+    started = time.perf_counter()
+    for _ in range(n):
+        if before_each:
+            before_each()
+        client.get(path)
+    return (time.perf_counter() - started) / n * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--projects', type=int, default=100)
+    parser.add_argument('--requests', type=int, default=200)
+    args = parser.parse_args()
+
+    app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite://'})
+    with app.app_context():
+        migrations.upgrade()
+        owner = user_service.create_new_user('owner@test.com', 'owner', 'hash')
+        fans = [user_service.create_new_user(f'fan{i}@test.com', f'fan{i}', 'hash').uid for i in range(5)]
+        for i in range(args.projects):
+            pid = project_service.create_new_project(owner.uid, f'Project {i}', 'Benchmark project ' * 10, 0.5).pid
+            for uid in fans:
+                reaction_service.add_reaction(pid, uid, 'LIKE')
+
+        client = app.test_client()
+        with client.session_transaction() as session:
+            session['current_uid'] = owner.uid
+
+        print(f"{'page':<28} {'disabled':>10} {'cold':>10} {'warm':>10}")
+        for path in (f'/?limit={min(args.projects, project_service.FEED_MAX_LIMIT)}',
+                     f'/my_projects?limit={min(args.projects, project_service.DASHBOARD_MAX_LIMIT)}'):
+            fragment_cache.configure(None)
+            disabled = time_requests(client, path, args.requests)
+
+            cold = time_requests(client, path, args.requests,
+                                 before_each=lambda: fragment_cache.configure(fragment_cache.LocalBackend(4096)))
+
+            fragment_cache.configure(fragment_cache.LocalBackend(4096))
+            time_requests(client, path, 1)
+            warm = time_requests(client, path, args.requests)
+
+            print(f'{path:<28} {disabled:>8.2f}ms {cold:>8.2f}ms {warm:>8.2f}ms')
+
+
+if __name__ == '__main__':
+    main()
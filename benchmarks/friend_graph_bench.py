@@ -0,0 +1,92 @@
+"""
+Friend-graph lookups at scale.
+
+Bulk-loads a random graph (default: 100k users, average degree 40, which gives
+2M friendships and 4M adjacency rows) into an on-disk database, then times
+friend lookups, "are friends" checks, mutual friends and suggestions, cold
+(empty adjacency cache) and warm:
+
+    python -m benchmarks.friend_graph_bench --users 100000 --degree 40
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from extensions import db
+from services import user_service, friend_graph_service as graph
+import migrations
+
+
+def load_graph(n_users: int, degree: int, seed: int):
+    rng = random.Random(seed)
+    conn = db.session.connection()
+    conn.exec_driver_sql(
+        'INSERT INTO users (uid, email, username, hashed_password) VALUES (?, ?, ?, ?)',
+        [(uid, f'user{uid}@test.com', f'user{uid}', 'hash') for uid in range(1, n_users + 1)],
+    )
+
+    n_edges = n_users * degree // 2
+    edges = set()
+    while len(edges) < n_edges:
+        a, b = rng.randint(1, n_users), rng.randint(1, n_users)
+        if a != b:
+            edges.add((min(a, b), max(a, b)))
+
+    rows = [(a, b) for a, b in edges] + [(b, a) for a, b in edges]
+    for start in range(0, len(rows), 100000):
+        conn.exec_driver_sql('INSERT INTO friendships (uid, friend_uid) VALUES (?, ?)', rows[start:start + 100000])
+    db.session.commit()
+    return n_edges
+
+
+def timed(label, func, samples):
+    started = time.perf_counter()
+    for args in samples:
+        func(*args)
+    per_call_us = (time.perf_counter() - started) / len(samples) * 1e6
+    print(f'{label:<40} {per_call_us:>10.1f} us/call')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=100000)
+    parser.add_argument('--degree', type=int, default=40)
+    parser.add_argument('--samples', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=436)
+    args = parser.parse_args()
+
+    db_path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + db_path,
+                      'FRIEND_CACHE_SIZE': args.samples * 4})
+    with app.app_context():
+        migrations.upgrade()
+        started = time.perf_counter()
+        n_edges = load_graph(args.users, args.degree, args.seed)
+        print(f'loaded {args.users} users / {n_edges} friendships in {time.perf_counter() - started:.1f}s')
+
+        rng = random.Random(args.seed + 1)
+        singles = [(rng.randint(1, args.users),) for _ in range(args.samples)]
+        pairs = [(rng.randint(1, args.users), rng.randint(1, args.users)) for _ in range(args.samples)]
+        few = singles[:max(1, args.samples // 20)]
+
+        graph.adjacency_cache.clear()
+        timed('are_friends (cold, PK lookup)', graph.are_friends, pairs)
+        timed('get_friend_uids (cold)', graph.get_friend_uids, singles)
+        timed('get_friend_uids (warm)', graph.get_friend_uids, singles)
+        timed('are_friends (warm)', graph.are_friends, [(a, b) for (a,), (_, b) in zip(singles, pairs)])
+        timed('get_mutual_friend_uids (warm)', graph.get_mutual_friend_uids,
+              [(a, b) for (a,), (b,) in zip(singles, reversed(singles))])
+        timed('get_friends_list (User rows)', user_service.get_friends_list, few)
+        timed('suggest_friends', graph.suggest_friends, few)
+        print(graph.get_adjacency_cache_stats())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,165 @@
+"""
+Load-test harness for the production server.
+
+Seeds a throwaway database, starts gunicorn once per worker count and measures
+requests/sec on the hot routes with a pool of keep-alive clients:
+
+    python -m benchmarks.load_test --workers 1 2 4 --clients 16 --duration 10
+"""
+
+import argparse
+import http.client
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+USERNAME = 'loadtest'
+PASSWORD = 'loadtest_password'
+
+
+def seed_database(workdir: str, n_projects: int) -> int:
+    """Creates the schema and sample data under workdir, returns a project pid."""
+    os.chdir(workdir)
+    os.makedirs('db_data', exist_ok=True)
+    sys.path.insert(0, REPO_ROOT)
+
+    from werkzeug.security import generate_password_hash
+    from app import create_app
+    from services import user_service, project_service, reaction_service
+    import migrations
+
+    app = create_app()
+    with app.app_context():
+        migrations.upgrade()
+        user = user_service.create_new_user('loadtest@test.com', USERNAME, generate_password_hash(PASSWORD))
+        project = None
+        for i in range(n_projects):
+            project = project_service.create_new_project(user.uid, f'Project {i}', f'Load test project {i}', 0.5)
+            reaction_service.add_reaction(project.pid, user.uid, 'LIKE')
+        return project.pid
+
+
+def start_server(workdir: str, port: int, workers: int, threads: int, **extra_env) -> subprocess.Popen:
+    env = dict(os.environ,
+               WEB_BIND=f'127.0.0.1:{port}',
+               WEB_WORKERS=str(workers),
+               WEB_THREADS=str(threads),
+               WEB_ACCESS_LOG='',
+               **extra_env)
+    proc = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', os.path.join(REPO_ROOT, 'gunicorn.conf.py'),
+         '--pythonpath', REPO_ROOT, 'wsgi:app'],
+        cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            conn.request('GET', '/about')
+            conn.getresponse().read()
+            return proc
+        except OSError:
+            time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError('gunicorn did not start')
+
+
+def stop_server(proc: subprocess.Popen):
+    proc.send_signal(signal.SIGTERM)
+    try:
+        proc.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+
+
+def login(conn: http.client.HTTPConnection) -> str:
+    body = urllib.parse.urlencode({'username': USERNAME, 'password': PASSWORD})
+    conn.request('POST', '/submit_login', body, {'Content-Type': 'application/x-www-form-urlencoded'})
+    response = conn.getresponse()
+    response.read()
+    return response.getheader('Set-Cookie', '').split(';')[0]
+
+
+def run_scenario(port: int, route: str, clients: int, duration: float) -> float:
+    """Hammers one route from `clients` threads, returns completed requests/sec."""
+    counts = [0] * clients
+    errors = [0] * clients
+    window = {}
+
+    def open_window():
+        window['started'] = time.time()
+        window['stop_at'] = window['started'] + duration
+
+    # Logins happen before the timed window so they don't skew the GET routes;
+    # the window opens as the last client reaches the barrier
+    ready = threading.Barrier(clients + 1, action=open_window)
+
+    def client(i):
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        cookie = login(conn)
+        ready.wait()
+        while time.time() < window['stop_at']:
+            try:
+                if route == '/submit_login':
+                    login(conn)
+                else:
+                    conn.request('GET', route, headers={'Cookie': cookie})
+                    conn.getresponse().read()
+                counts[i] += 1
+            except (OSError, http.client.HTTPException):
+                errors[i] += 1
+                conn.close()
+                conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    for t in threads:
+        t.start()
+    ready.wait()
+    for t in threads:
+        t.join()
+    elapsed = time.time() - window['started']
+
+    if sum(errors):
+        print(f'  ({sum(errors)} errors on {route})')
+    return sum(counts) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--projects', type=int, default=200)
+    parser.add_argument('--port', type=int, default=5055)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        pid = seed_database(workdir, args.projects)
+        routes = ['/', f'/project/{pid}', '/submit_login']
+
+        results = {}
+        for workers in args.workers:
+            proc = start_server(workdir, args.port, workers, args.threads)
+            try:
+                for route in routes:
+                    results[(workers, route)] = run_scenario(args.port, route, args.clients, args.duration)
+            finally:
+                stop_server(proc)
+
+    header = f"{'workers':>8} " + ' '.join(f'{r:>18}' for r in routes)
+    print(header)
+    for workers in args.workers:
+        print(f'{workers:>8} ' + ' '.join(f'{results[(workers, r)]:>14.1f} r/s' for r in routes))
+
+
+if __name__ == '__main__':
+    main()
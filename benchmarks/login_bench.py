@@ -0,0 +1,113 @@
+"""
+Login latency under concurrent load, inline hashing vs. the process pool.
+
+Login threads post to /submit_login while page threads request /about. The
+benchmark reports p50/p99 latency for both, plus how many logins were shed
+with a 503:
+
+    python -m benchmarks.login_bench --login-threads 16 --page-threads 4 --duration 10
+"""
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from services import user_service, password_service
+import migrations
+
+
+def percentile(samples, pct):
+    if not samples:
+        return float('nan')
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * pct / 100))]
+
+
+def run_mode(workers: int, args) -> dict:
+    db_path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + db_path,
+        'PASSWORD_HASH_METHOD': args.method,
+        'PASSWORD_HASH_WORKERS': workers,
+        'PASSWORD_HASH_QUEUE': args.queue,
+    })
+    with app.app_context():
+        migrations.upgrade()
+        for i in range(args.login_threads):
+            user_service.create_new_user(f'user{i}@test.com', f'user{i}', password_service.hash_password('password'))
+
+    login_latencies, page_latencies, rejected = [], [], [0]
+    lock = threading.Lock()
+    stop_at = time.time() + args.duration
+
+    def login_worker(i):
+        client = app.test_client()
+        local, shed = [], 0
+        while time.time() < stop_at:
+            started = time.perf_counter()
+            response = client.post('/submit_login', data={'username': f'user{i}', 'password': 'password'})
+            if response.status_code == 503:
+                shed += 1
+            else:
+                local.append((time.perf_counter() - started) * 1000)
+        with lock:
+            login_latencies.extend(local)
+            rejected[0] += shed
+
+    def page_worker():
+        client = app.test_client()
+        local = []
+        while time.time() < stop_at:
+            started = time.perf_counter()
+            client.get('/about')
+            local.append((time.perf_counter() - started) * 1000)
+        with lock:
+            page_latencies.extend(local)
+
+    threads = [threading.Thread(target=login_worker, args=(i,)) for i in range(args.login_threads)]
+    threads += [threading.Thread(target=page_worker) for _ in range(args.page_threads)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    password_service.configure(args.method, workers=0)
+    return {
+        'logins': len(login_latencies),
+        'login_p50': percentile(login_latencies, 50),
+        'login_p99': percentile(login_latencies, 99),
+        'page_p50': percentile(page_latencies, 50),
+        'page_p99': percentile(page_latencies, 99),
+        'rejected': rejected[0],
+    }
+
+
+def main():
+    # Every login is a "slow request"; keep the report readable
+    logging.getLogger('communal_grounds.sql').disabled = True
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--login-threads', type=int, default=16)
+    parser.add_argument('--page-threads', type=int, default=4)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--pool-workers', type=int, default=os.cpu_count() or 2)
+    parser.add_argument('--queue', type=int, default=32)
+    parser.add_argument('--method', default=password_service.DEFAULT_METHOD)
+    args = parser.parse_args()
+
+    print(f"{'mode':>8} {'logins':>7} {'login p50':>10} {'login p99':>10} {'page p50':>9} {'page p99':>9} {'503s':>6}")
+    for label, workers in (('inline', 0), ('pool', args.pool_workers)):
+        r = run_mode(workers, args)
+        print(f"{label:>8} {r['logins']:>7} {r['login_p50']:>8.1f}ms {r['login_p99']:>8.1f}ms "
+              f"{r['page_p50']:>7.1f}ms {r['page_p99']:>7.1f}ms {r['rejected']:>6}")
+
+
+if __name__ == '__main__':
+    main()
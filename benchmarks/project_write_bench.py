@@ -0,0 +1,83 @@
+"""
+Project creation write path: commits per project and latency under
+concurrent writers on an on-disk database (tuned SQLite profile):
+
+    python -m benchmarks.project_write_bench --writers 1 4 8 --projects 200
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event
+from app import create_app
+from extensions import db
+from services import user_service, project_service
+import migrations
+
+
+def percentile(samples, pct):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * pct / 100))]
+
+
+def run(writers: int, per_writer: int, profile: str) -> dict:
+    db_path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + db_path, 'DATABASE_PROFILE': profile})
+    with app.app_context():
+        migrations.upgrade()
+        uids = [user_service.create_new_user(f'u{i}@test.com', f'u{i}', 'hash').uid for i in range(writers)]
+        commits = [0]
+        event.listen(db.engine, 'commit', lambda conn: commits.__setitem__(0, commits[0] + 1))
+
+    latencies = []
+    lock = threading.Lock()
+
+    def writer(uid):
+        local = []
+        with app.app_context():
+            for i in range(per_writer):
+                started = time.perf_counter()
+                project_service.create_new_project(uid, f'Project {uid}-{i}', 'Benchmark project')
+                local.append((time.perf_counter() - started) * 1000)
+            db.session.remove()
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=writer, args=(uid,)) for uid in uids]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    return {
+        'projects/s': len(latencies) / elapsed,
+        'commits/project': commits[0] / len(latencies),
+        'p50': percentile(latencies, 50),
+        'p99': percentile(latencies, 99),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--writers', type=int, nargs='+', default=[1, 4, 8])
+    parser.add_argument('--projects', type=int, default=200, help='projects created per writer')
+    parser.add_argument('--profile', default='tuned')
+    args = parser.parse_args()
+
+    print(f"{'writers':>8} {'projects/s':>11} {'commits/proj':>13} {'p50':>9} {'p99':>9}")
+    for writers in args.writers:
+        r = run(writers, args.projects, args.profile)
+        print(f"{writers:>8} {r['projects/s']:>11.1f} {r['commits/project']:>13.2f} "
+              f"{r['p50']:>7.2f}ms {r['p99']:>7.2f}ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""
+Reaction write throughput with per-call commits and with the write queue.
+
+Each mode gets a fresh on-disk database. Writer threads then toggle reactions
+on a handful of hot projects for a fixed time, and committed reactions/sec
+are reported with the queue's mean batch size, flush time and the p99 from
+submit to commit:
+
+    python -m benchmarks.reaction_write_bench --threads 16 --duration 10 --profile default
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy.exc import OperationalError
+from app import create_app
+from extensions import db
+from services import user_service, project_service, reaction_service
+from services.write_queue import MODES
+import migrations
+
+
+def run_mode(mode: str, args) -> dict:
+    workdir = tempfile.mkdtemp()
+    app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + os.path.join(workdir, 'bench.db'),
+                      'DATABASE_PROFILE': args.profile, 'REACTION_WRITE_MODE': mode,
+                      'REACTION_FLUSH_MS': args.flush_ms, 'REACTION_BATCH_SIZE': args.batch_size,
+                      'REACTION_QUEUE_LIMIT': args.queue_limit})
+    with app.app_context():
+        migrations.upgrade()
+        uids = [user_service.create_new_user(f'user{i}@test.com', f'user{i}', 'hash').uid for i in range(args.users)]
+        pids = [project_service.create_new_project(uids[0], f'Project {i}').pid for i in range(args.projects)]
+        db.session.remove()
+
+    writes, locked = [0], [0]
+    counter_lock = threading.Lock()
+    started = time.time()
+    stop_at = started + args.duration
+
+    def worker(seed_value):
+        rng = random.Random(seed_value)
+        n_writes = n_locked = 0
+        with app.app_context():
+            while time.time() < stop_at:
+                try:
+                    reaction_service.toggle_reaction(rng.choice(pids), rng.choice(uids), rng.choice(['LIKE', 'UPVOTE']))
+                    n_writes += 1
+                except OperationalError:
+                    db.session.rollback()
+                    n_locked += 1
+            db.session.remove()
+        with counter_lock:
+            writes[0] += n_writes
+            locked[0] += n_locked
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(args.threads)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    # 'async' callers are acknowledged before their write commits, so count
+    # committed writes over the time it took to drain the queue
+    reaction_service.write_queue.close()
+    elapsed = time.time() - started
+
+    stats = reaction_service.get_write_queue_stats()
+    committed = writes[0] if mode == 'immediate' else stats['written']
+    return {'writes/s': committed / elapsed, 'locked': locked[0], 'batch': stats['mean_batch'],
+            'flush p99': stats['flush_ms_p99'], 'wait p99': stats['wait_ms_p99']}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--profile', choices=('default', 'tuned'), default='default',
+                        help="SQLite profile; 'default' fsyncs every commit")
+    parser.add_argument('--users', type=int, default=2000)
+    parser.add_argument('--projects', type=int, default=5, help='hot projects the reactions go to')
+    parser.add_argument('--flush-ms', type=float, default=5.0)
+    parser.add_argument('--batch-size', type=int, default=256)
+    parser.add_argument('--queue-limit', type=int, default=1000, help="bounds the 'async' backlog left to drain")
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=list(MODES))
+    args = parser.parse_args()
+
+    print(f"{'mode':>10} {'writes/s':>10} {'locked':>8} {'batch':>8} {'flush p99':>10} {'wait p99':>10}   (ms)")
+    for mode in args.modes:
+        result = run_mode(mode, args)
+        print(f"{mode:>10} {result['writes/s']:>10.1f} {result['locked']:>8} {result['batch']:>8.1f} "
+              f"{result['flush p99']:>10.2f} {result['wait p99']:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""
+Project search latency on an on-disk SQLite database.
+
+Bulk-imports synthetic projects (which also fills the FTS index), then times
+ranked searches and autocomplete lookups for common, rare and missing terms,
+next to the LIKE '%term%' scan the index replaces:
+
+    python -m benchmarks.search_bench --projects 1000000
+"""
+
+import argparse
+import itertools
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from extensions import db
+from models.project import Project
+from services import bulk_service, search_service
+import migrations
+
+# Topic words lead a Zipf-distributed vocabulary padded with made-up words, so
+# the first few terms match a large share of projects and most are rare
+TOPICS = ('garden community repair bike library mural compost tutoring river cleanup food pantry '
+          'coding club chess workshop theater choir makerspace recycling tree planting shelter '
+          'soccer literacy seniors youth ceramics radio podcast archive orchard beekeeping solar '
+          'kayak trail mentoring translation quilting robotics astronomy birding pottery').split()
+
+QUERIES = {
+    'common term': 'garden',
+    'two terms': 'community garden',
+    'rare term': 'astronomy birding',
+    'no match': 'zeppelin',
+}
+PREFIXES = {'2 chars': 'ga', '4 chars': 'comm', 'two words': 'community ga'}
+
+
+def vocabulary(size: int, rng: random.Random) -> tuple:
+    syllables = ['ka', 'lo', 'mi', 'ten', 'ra', 'vu', 'sel', 'do', 'pin', 'ar', 'qu', 'bex']
+    words = list(TOPICS)
+    while len(words) < size:
+        words.append(''.join(rng.choices(syllables, k=rng.randint(2, 4))))
+    return words, list(itertools.accumulate(1 / (rank + 20) for rank in range(len(words))))
+
+
+def generate(n_projects: int, seed: int):
+    rng = random.Random(seed)
+    words, cum_weights = vocabulary(20000, rng)
+    yield {'kind': 'user', 'uid': 1, 'email': 'bench@test.com', 'username': 'bench', 'hashed_password': 'hash'}
+    for pid in range(1, n_projects + 1):
+        name = ' '.join(rng.choices(words, cum_weights=cum_weights, k=2)).title()
+        description = ' '.join(rng.choices(words, cum_weights=cum_weights, k=rng.randint(8, 30)))
+        yield {'kind': 'project', 'pid': pid, 'name': f'{name} {pid}', 'description': description,
+               'visibility': 'PUBLISHED', 'status': rng.random(), 'owner_uid': 1}
+
+
+def timed(fn, repeat: int) -> list:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def report(label: str, timings: list):
+    timings.sort()
+    print(f'  {label:<28} p50 {statistics.median(timings):8.2f} ms   p99 {timings[int(len(timings) * 0.99)]:8.2f} ms')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--projects', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--like-repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=436)
+    args = parser.parse_args()
+
+    db_path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + db_path})
+    with app.app_context():
+        migrations.upgrade()
+
+        started = time.perf_counter()
+        bulk_service.import_records(generate(args.projects, args.seed))
+        print(f'imported and indexed {args.projects} projects in {time.perf_counter() - started:.1f}s')
+
+        print('search (page 1, 20 results):')
+        for label, query in QUERIES.items():
+            report(label, timed(lambda: search_service.search_projects(query), args.repeat))
+        report('common term, page 10', timed(lambda: search_service.search_projects('garden', page=10), args.repeat))
+
+        print('autocomplete (10 names):')
+        for label, prefix in PREFIXES.items():
+            report(label, timed(lambda: search_service.autocomplete_project_names(prefix), args.repeat))
+
+        print("LIKE '%term%' scan (20 results):")
+        for label, query in QUERIES.items():
+            term = query.split()[-1]
+            scan = (db.select(Project.pid, Project.name)
+                    .where(Project.name.like(f'%{term}%') | Project.description.like(f'%{term}%'))
+                    .limit(20))
+            report(label, timed(lambda: db.session.execute(scan).all(), args.like_repeat))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,536 @@
+"""
+Benchmark suite: every public function in user_service, project_service and
+reaction_service, plus the main routes through the Flask test client, timed
+against a database generated by benchmarks.datagen at a chosen scale.
+
+    python -m benchmarks.suite --scale 100k --output results.json
+    python -m benchmarks.suite --scale 100k --compare baseline.json --threshold 0.25
+
+Every scenario runs --repeat times per round, over --rounds rounds of the
+whole suite. Results are JSON: run metadata plus min/p50/p95/max/mean
+milliseconds per scenario, where p50 is the best round's median. With --compare, scenarios whose p50 grew by more than --threshold
+(and by more than --min-delta-ms) are reported as regressions and the run
+exits with status 1. Pass --db to keep the generated database between runs;
+write scenarios add a few rows to it each run.
+"""
+
+import argparse
+import fnmatch
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from extensions import db
+from models.project import Project
+from services import bulk_service, user_service, project_service, reaction_service, access_service
+from benchmarks import datagen
+import migrations
+
+FORMAT_VERSION = 1
+DEFAULT_REPEAT = 20
+DEFAULT_ROUNDS = 3
+DEFAULT_THRESHOLD = 0.25
+DEFAULT_MIN_DELTA_MS = 0.05
+
+# name -> fn(ctx) returning the zero-argument callable to time
+SCENARIOS = {}
+
+
+def scenario(name: str):
+    def register(fn):
+        SCENARIOS[name] = fn
+        return fn
+    return register
+
+
+class Context:
+    """What scenarios need to pick their inputs: row counts, a seeded RNG and helpers for fresh rows."""
+
+    def __init__(self, app, counts: dict, calls: int, seed: int, run_id: str):
+        self.app = app
+        self.seed = seed
+        self.counts = counts
+        self.calls = calls
+        self.rng = random.Random(seed)
+        self.run_id = run_id
+        self._made = 0
+
+    def uid(self) -> int:
+        return self.rng.randint(1, self.counts['users'])
+
+    def pid(self) -> int:
+        return self.rng.randint(1, self.counts['projects'])
+
+    def name(self, prefix: str) -> str:
+        self._made += 1
+        return f'{prefix}-{self.run_id}-{self.seed}-{self._made}'
+
+    def new_users(self, n: int) -> list:
+        """Creates `n` users nobody else references, so write scenarios never collide with generated rows."""
+        return [user_service.create_new_user(f'{name}@bench.test', name, datagen.PASSWORD_HASH).uid
+                for name in (self.name('bench') for _ in range(n))]
+
+    def owned_projects(self, n: int) -> list:
+        """(pid, owner_uid) for `n` random generated projects."""
+        pids = [self.pid() for _ in range(n)]
+        owners = dict(db.session.execute(db.select(Project.pid, Project.owner_uid).where(Project.pid.in_(pids))).all())
+        return [(pid, owners[pid]) for pid in pids]
+
+    def client(self, uid: int = None):
+        client = self.app.test_client()
+        if uid is not None:
+            with client.session_transaction() as session:
+                session['current_uid'] = uid
+        return client
+
+
+def _calls(fn, items):
+    """Returns a callable that applies `fn` to the next item on each call."""
+    items = iter(items)
+    return lambda: fn(*next(items))
+
+# --- user_service ---
+
+@scenario('user_service.get_user_record')
+def _(ctx):
+    return lambda: user_service.get_user_record(ctx.uid())
+
+@scenario('user_service.get_user_record_by_username')
+def _(ctx):
+    return lambda: user_service.get_user_record_by_username(f'user{ctx.uid()}')
+
+@scenario('user_service.get_login_credentials')
+def _(ctx):
+    return lambda: user_service.get_login_credentials(f'user{ctx.uid()}')
+
+@scenario('user_service.invalidate_user')
+def _(ctx):
+    return lambda: user_service.invalidate_user(ctx.uid())
+
+@scenario('user_service.get_identity_cache_stats')
+def _(ctx):
+    return user_service.get_identity_cache_stats
+
+@scenario('user_service.create_new_user')
+def _(ctx):
+    names = [ctx.name('new') for _ in range(ctx.calls)]
+    return _calls(user_service.create_new_user, [(f'{name}@bench.test', name, datagen.PASSWORD_HASH) for name in names])
+
+@scenario('user_service.change_username')
+def _(ctx):
+    return _calls(user_service.change_username, [(uid, ctx.name('renamed')) for uid in ctx.new_users(ctx.calls)])
+
+@scenario('user_service.change_user_password')
+def _(ctx):
+    return _calls(user_service.change_user_password, [(uid, 'changed-hash') for uid in ctx.new_users(ctx.calls)])
+
+@scenario('user_service.get_user_by_id')
+def _(ctx):
+    return lambda: user_service.get_user_by_id(ctx.uid())
+
+@scenario('user_service.get_all_users')
+def _(ctx):
+    return user_service.get_all_users
+
+@scenario('user_service.get_friends_list')
+def _(ctx):
+    return lambda: user_service.get_friends_list(ctx.uid())
+
+@scenario('user_service.send_friend_request')
+def _(ctx):
+    uids = ctx.new_users(ctx.calls + 1)
+    return _calls(user_service.send_friend_request, zip(uids, uids[1:]))
+
+@scenario('user_service.accept_friend_request')
+def _(ctx):
+    uids = ctx.new_users(ctx.calls + 1)
+    pairs = list(zip(uids, uids[1:]))
+    for requestor, recipient in pairs:
+        user_service.send_friend_request(requestor, recipient)
+    return _calls(user_service.accept_friend_request, pairs)
+
+@scenario('user_service.get_friend_requests')
+def _(ctx):
+    return lambda: user_service.get_friend_requests(ctx.uid())
+
+@scenario('user_service.find_user_with_username')
+def _(ctx):
+    return lambda: user_service.find_user_with_username(f'user{ctx.uid()}')
+
+# --- project_service ---
+
+@scenario('project_service.bump_project_version')
+def _(ctx):
+    def bump():
+        project_service.bump_project_version(ctx.pid())
+        db.session.commit()
+    return bump
+
+@scenario('project_service.create_new_project')
+def _(ctx):
+    owner = ctx.new_users(1)[0]
+    return _calls(project_service.create_new_project, [(owner, ctx.name('Project'), 'Benchmark project') for _ in range(ctx.calls)])
+
+@scenario('project_service.get_project_details')
+def _(ctx):
+    return lambda: project_service.get_project_details(ctx.pid())
+
+@scenario('project_service.get_all_published_projects')
+def _(ctx):
+    return project_service.get_all_published_projects
+
+@scenario('project_service.get_owned_projects')
+def _(ctx):
+    return lambda: project_service.get_owned_projects(ctx.uid())
+
+@scenario('project_service.get_joined_projects')
+def _(ctx):
+    return lambda: project_service.get_joined_projects(ctx.uid())
+
+@scenario('project_service.get_project_validator')
+def _(ctx):
+    return lambda: project_service.get_project_validator(ctx.pid(), ctx.uid())
+
+@scenario('project_service.get_membership_versions')
+def _(ctx):
+    return lambda: project_service.get_membership_versions(ctx.uid())
+
+@scenario('project_service.get_project_with_related_data')
+def _(ctx):
+    return lambda: project_service.get_project_with_related_data(ctx.pid())
+
+@scenario('project_service.get_project_members')
+def _(ctx):
+    return lambda: project_service.get_project_members(ctx.pid())
+
+@scenario('project_service.get_project_page')
+def _(ctx):
+    return _calls(project_service.get_project_page, ctx.owned_projects(ctx.calls))
+
+@scenario('project_service.encode_feed_cursor')
+def _(ctx):
+    return lambda: project_service.encode_feed_cursor('2025-06-01 12:00:00.000000', ctx.pid())
+
+@scenario('project_service.decode_feed_cursor')
+def _(ctx):
+    cursor = project_service.encode_feed_cursor('2025-06-01 12:00:00.000000', 1)
+    return lambda: project_service.decode_feed_cursor(cursor)
+
+@scenario('project_service.get_published_project_feed')
+def _(ctx):
+    return project_service.get_published_project_feed
+
+@scenario('project_service.get_available_projects')
+def _(ctx):
+    return lambda: project_service.get_available_projects(ctx.uid())
+
+@scenario('project_service.get_available_cache_stats')
+def _(ctx):
+    return project_service.get_available_cache_stats
+
+@scenario('project_service.get_dashboard')
+def _(ctx):
+    return lambda: project_service.get_dashboard(ctx.uid())
+
+@scenario('project_service.add_project_member')
+def _(ctx):
+    pid = project_service.create_new_project(ctx.new_users(1)[0], ctx.name('Project')).pid
+    return _calls(project_service.add_project_member, [(pid, uid, 'VIEWER') for uid in ctx.new_users(ctx.calls)])
+
+@scenario('project_service.remove_project_member')
+def _(ctx):
+    pid = project_service.create_new_project(ctx.new_users(1)[0], ctx.name('Project')).pid
+    uids = ctx.new_users(ctx.calls)
+    for uid in uids:
+        project_service.add_project_member(pid, uid)
+    return _calls(project_service.remove_project_member, [(pid, uid) for uid in uids])
+
+@scenario('project_service.update_project_member')
+def _(ctx):
+    pid = project_service.create_new_project(ctx.new_users(1)[0], ctx.name('Project')).pid
+    return _calls(project_service.update_project_member, [(pid, uid, 'EDITOR') for uid in ctx.new_users(ctx.calls)])
+
+@scenario('project_service.update_project')
+def _(ctx):
+    pid = project_service.create_new_project(ctx.new_users(1)[0], ctx.name('Project')).pid
+    return _calls(project_service.update_project, [(pid, ctx.name('Renamed'), 'Updated', 0.5) for _ in range(ctx.calls)])
+
+@scenario('project_service.change_project_description')
+def _(ctx):
+    pid = project_service.create_new_project(ctx.new_users(1)[0], ctx.name('Project')).pid
+    return _calls(project_service.change_project_description, [(pid, ctx.name('Description')) for _ in range(ctx.calls)])
+
+# --- reaction_service ---
+
+@scenario('reaction_service.get_reaction_count_by_type')
+def _(ctx):
+    return lambda: reaction_service.get_reaction_count_by_type(ctx.pid(), 'LIKE')
+
+@scenario('reaction_service.get_total_reactions')
+def _(ctx):
+    return lambda: reaction_service.get_total_reactions(ctx.pid())
+
+@scenario('reaction_service.get_reaction_summaries')
+def _(ctx):
+    return lambda: reaction_service.get_reaction_summaries([ctx.pid() for _ in range(project_service.FEED_DEFAULT_LIMIT)])
+
+@scenario('reaction_service.get_reaction_summary')
+def _(ctx):
+    return lambda: reaction_service.get_reaction_summary(ctx.pid())
+
+@scenario('reaction_service.get_user_reaction_type')
+def _(ctx):
+    return lambda: reaction_service.get_user_reaction_type(ctx.pid(), ctx.uid())
+
+@scenario('reaction_service.add_reaction')
+def _(ctx):
+    uid = ctx.new_users(1)[0]
+    pids = ctx.rng.sample(range(1, ctx.counts['projects'] + 1), min(ctx.calls, ctx.counts['projects']))
+    return _calls(reaction_service.add_reaction, [(pid, uid, 'LIKE') for pid in pids])
+
+@scenario('reaction_service.remove_reaction')
+def _(ctx):
+    uid = ctx.new_users(1)[0]
+    pids = ctx.rng.sample(range(1, ctx.counts['projects'] + 1), min(ctx.calls, ctx.counts['projects']))
+    for pid in pids:
+        reaction_service.add_reaction(pid, uid, 'LIKE')
+    return _calls(reaction_service.remove_reaction, [(pid, uid) for pid in pids])
+
+@scenario('reaction_service.toggle_reaction')
+def _(ctx):
+    uid = ctx.new_users(1)[0]
+    pid = ctx.pid()
+    return lambda: reaction_service.toggle_reaction(pid, uid, 'LIKE')
+
+@scenario('reaction_service.get_write_queue_stats')
+def _(ctx):
+    return reaction_service.get_write_queue_stats
+
+# --- access_service ---
+
+@scenario('access_service.get_role')
+def _(ctx):
+    return lambda: access_service.get_role(ctx.pid(), ctx.uid())
+
+# --- routes ---
+
+def _get(client, path: str):
+    response = client.get(path)
+    if response.status_code >= 500:
+        raise RuntimeError(f'GET {path} returned {response.status_code}')
+    return response
+
+@scenario('route GET /')
+def _(ctx):
+    client = ctx.client()
+    return lambda: _get(client, '/')
+
+@scenario('route GET /trending')
+def _(ctx):
+    client = ctx.client()
+    return lambda: _get(client, '/trending')
+
+@scenario('route GET /search')
+def _(ctx):
+    client = ctx.client()
+    return lambda: _get(client, '/search?q=benchmark project')
+
+@scenario('route GET /my_projects')
+def _(ctx):
+    clients = [ctx.client(ctx.uid()) for _ in range(ctx.calls)]
+    return _calls(_get, [(client, '/my_projects') for client in clients])
+
+@scenario('route GET /profile')
+def _(ctx):
+    clients = [ctx.client(ctx.uid()) for _ in range(ctx.calls)]
+    return _calls(_get, [(client, '/profile') for client in clients])
+
+@scenario('route GET /project/<pid>')
+def _(ctx):
+    return _calls(_get, [(ctx.client(owner), f'/project/{pid}') for pid, owner in ctx.owned_projects(ctx.calls)])
+
+@scenario('route GET /api/v1/projects')
+def _(ctx):
+    client = ctx.client(ctx.uid())
+    return lambda: _get(client, '/api/v1/projects')
+
+@scenario('route GET /api/v1/projects/<pid>')
+def _(ctx):
+    return _calls(_get, [(ctx.client(owner), f'/api/v1/projects/{pid}') for pid, owner in ctx.owned_projects(ctx.calls)])
+
+@scenario('route GET /api/v1/projects/available')
+def _(ctx):
+    clients = [ctx.client(ctx.uid()) for _ in range(ctx.calls)]
+    return _calls(_get, [(client, '/api/v1/projects/available') for client in clients])
+
+# --- RUNNING ---
+
+def load(scale: str, seed: int) -> float:
+    """Imports a scale profile into the current app's database; returns the seconds it took."""
+    started = time.perf_counter()
+    bulk_service.import_records(datagen.generate(scale, seed))
+    return time.perf_counter() - started
+
+
+def summarize(rounds: list) -> dict:
+    """
+    Stats over every timed call, except p50_ms: that is the lowest per-round
+    median, which shrugs off a round that shared the machine with something else.
+    """
+    timings = sorted(t for timings in rounds for t in timings)
+    return {
+        'n': len(timings),
+        'min_ms': round(timings[0], 4),
+        'p50_ms': round(min(statistics.median(timings) for timings in rounds), 4),
+        'p95_ms': round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 4),
+        'max_ms': round(timings[-1], 4),
+        'mean_ms': round(statistics.fmean(timings), 4),
+    }
+
+
+def run(app, counts: dict, repeat: int = DEFAULT_REPEAT, rounds: int = DEFAULT_ROUNDS, warmup: int = 1,
+        seed: int = datagen.DEFAULT_SEED, only: list = None, run_id: str = None) -> dict:
+    """
+    Times each scenario (those matching any `only` glob) `repeat` times after
+    `warmup` untimed calls, inside the current app context, and does that
+    `rounds` times over the whole suite. Each scenario gets its own RNG seed,
+    so its inputs don't depend on which other scenarios ran.
+    """
+    run_id = run_id or str(int(time.time() * 1000))
+    selected = [(index, name, make) for index, (name, make) in enumerate(SCENARIOS.items())
+                if not only or any(fnmatch.fnmatchcase(name, pattern) for pattern in only)]
+    timings = {name: [] for _, name, _ in selected}
+
+    for round_number in range(rounds):
+        for index, name, make in selected:
+            ctx = Context(app, counts, warmup + repeat, seed + index, f'{run_id}r{round_number}')
+            fn = make(ctx)
+            for _ in range(warmup):
+                fn()
+            round_timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                fn()
+                round_timings.append((time.perf_counter() - started) * 1000)
+            db.session.rollback()
+            timings[name].append(round_timings)
+
+    return {name: summarize(rounds) for name, rounds in timings.items()}
+
+
+def compare(results: dict, baseline: dict, threshold: float = DEFAULT_THRESHOLD,
+            min_delta_ms: float = DEFAULT_MIN_DELTA_MS) -> list:
+    """
+    Returns (name, baseline p50, current p50, status) rows, where status is
+    'regression', 'improved', 'ok', 'new' or 'missing'. A change counts only
+    if p50 moved by more than `threshold` (a fraction) and `min_delta_ms`.
+    """
+    rows = []
+    for name in sorted(set(results) | set(baseline)):
+        if name not in baseline:
+            rows.append((name, None, results[name]['p50_ms'], 'new'))
+            continue
+        if name not in results:
+            rows.append((name, baseline[name]['p50_ms'], None, 'missing'))
+            continue
+        before, after = baseline[name]['p50_ms'], results[name]['p50_ms']
+        status = 'ok'
+        if abs(after - before) > min_delta_ms:
+            if after > before * (1 + threshold):
+                status = 'regression'
+            elif after * (1 + threshold) < before:
+                status = 'improved'
+        rows.append((name, before, after, status))
+    return rows
+
+
+def _format_ms(value) -> str:
+    return '-' if value is None else f'{value:.3f}'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scale', choices=datagen.SCALES, default='1k')
+    parser.add_argument('--seed', type=int, default=datagen.DEFAULT_SEED)
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT)
+    parser.add_argument('--rounds', type=int, default=DEFAULT_ROUNDS)
+    parser.add_argument('--warmup', type=int, default=1)
+    parser.add_argument('--only', action='append', help='glob over scenario names; may be repeated')
+    parser.add_argument('--db', help='SQLite file to generate into, or reuse if it already holds this scale')
+    parser.add_argument('--output', help='write results JSON here')
+    parser.add_argument('--compare', metavar='BASELINE', help='results JSON to compare against')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument('--min-delta-ms', type=float, default=DEFAULT_MIN_DELTA_MS)
+    parser.add_argument('--list', action='store_true', help='list scenario names and exit')
+    args = parser.parse_args()
+
+    if args.list:
+        print('\n'.join(SCENARIOS))
+        return
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline['meta']['scale'] != args.scale:
+            parser.error(f"baseline was run at scale {baseline['meta']['scale']}, not {args.scale}")
+
+    db_path = args.db or os.path.join(tempfile.mkdtemp(), 'bench.db')
+    marker = db_path + '.scale'
+    app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + db_path})
+    with app.app_context():
+        migrations.upgrade()
+        generated = f'{args.scale}:{args.seed}'
+        if not (os.path.exists(marker) and open(marker).read() == generated):
+            print(f'generating {args.scale} data ...', file=sys.stderr)
+            print(f'  imported in {load(args.scale, args.seed):.1f}s', file=sys.stderr)
+            with open(marker, 'w') as f:
+                f.write(generated)
+        results = run(app, datagen.SCALES[args.scale], args.repeat, args.rounds, args.warmup, args.seed, args.only)
+
+    report = {
+        'meta': {
+            'format': FORMAT_VERSION,
+            'scale': args.scale,
+            'seed': args.seed,
+            'repeat': args.repeat,
+            'rounds': args.rounds,
+            'rows': datagen.SCALES[args.scale],
+            'started_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'platform': platform.platform(),
+        },
+        'scenarios': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if baseline is None:
+        print(f"{'scenario':<52} {'p50 ms':>10} {'p95 ms':>10}")
+        for name, stats in results.items():
+            print(f"{name:<52} {stats['p50_ms']:>10.3f} {stats['p95_ms']:>10.3f}")
+        return
+
+    rows = compare(results, baseline['scenarios'], args.threshold, args.min_delta_ms)
+    print(f"{'scenario':<52} {'baseline':>10} {'current':>10}  status")
+    for name, before, after, status in rows:
+        print(f'{name:<52} {_format_ms(before):>10} {_format_ms(after):>10}  {status}')
+    regressions = [row for row in rows if row[3] == 'regression']
+    if regressions:
+        print(f'{len(regressions)} regression(s) over {args.threshold:.0%}', file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+"""
+Trending feed latency on an on-disk SQLite database.
+
+Bulk-imports projects and a week of reactions (which also fills the hourly
+buckets and scores), then times a page of get_trending_projects (an index scan
+over project_trending) against ranking by a GROUP BY over the last day of
+reactions, and the cost of a reaction write including its score update:
+
+    python -m benchmarks.trending_bench --projects 100000 --reactions 2000000
+"""
+
+import argparse
+import itertools
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from extensions import db
+from models.reaction import Reaction
+from services import bulk_service, reaction_service, trending_service
+import migrations
+
+
+def generate(n_projects: int, n_reactions: int, n_users: int, seed: int):
+    """Reactions land on projects with a Zipf-like skew and spread over the last week."""
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    for uid in range(1, n_users + 1):
+        yield {'kind': 'user', 'uid': uid, 'email': f'user{uid}@test.com', 'username': f'user{uid}', 'hashed_password': 'hash'}
+    for pid in range(1, n_projects + 1):
+        yield {'kind': 'project', 'pid': pid, 'name': f'Project {pid}', 'visibility': 'PUBLISHED',
+               'status': 0, 'owner_uid': 1}
+
+    cum_weights = list(itertools.accumulate(1 / (rank + 10) for rank in range(n_projects)))
+    seen = set()
+    while len(seen) < n_reactions:
+        pid = rng.choices(range(1, n_projects + 1), cum_weights=cum_weights)[0]
+        uid = rng.randint(1, n_users)
+        if (pid, uid) in seen:
+            continue
+        seen.add((pid, uid))
+        created_at = now - timedelta(seconds=rng.randint(0, 7 * 24 * 3600))
+        yield {'kind': 'reaction', 'pid': pid, 'uid': uid, 'type': 'LIKE', 'created_at': created_at.isoformat()}
+
+
+def windowed_counts(limit: int) -> list:
+    """Ranks by reactions in the last 24 hours, aggregating the reactions table on every request."""
+    since = datetime.utcnow() - timedelta(days=1)
+    return db.session.execute(
+        db.select(Reaction.pid, db.func.count().label('reactions'))
+        .where(Reaction.created_at > since)
+        .group_by(Reaction.pid)
+        .order_by(db.text('reactions DESC'))
+        .limit(limit)
+    ).all()
+
+
+def timed(fn, repeat: int) -> list:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def report(label: str, timings: list):
+    timings.sort()
+    print(f'  {label:<32} p50 {statistics.median(timings):8.2f} ms   p99 {timings[int(len(timings) * 0.99)]:8.2f} ms')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--projects', type=int, default=100000)
+    parser.add_argument('--reactions', type=int, default=1000000)
+    parser.add_argument('--users', type=int, default=50000)
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--scan-repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=436)
+    args = parser.parse_args()
+
+    db_path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + db_path})
+    with app.app_context():
+        migrations.upgrade()
+
+        started = time.perf_counter()
+        bulk_service.import_records(generate(args.projects, args.reactions, args.users, args.seed))
+        print(f'imported {args.reactions} reactions on {args.projects} projects in {time.perf_counter() - started:.1f}s')
+
+        started = time.perf_counter()
+        trending_service.rebuild_scores()
+        db.session.commit()
+        print(f'rebuild_scores over every project: {time.perf_counter() - started:.1f}s')
+
+        _, cursor = trending_service.get_trending_projects()
+        for _ in range(8):
+            _, cursor = trending_service.get_trending_projects(cursor)
+
+        print('trending page (20 projects):')
+        report('hot score index, page 1', timed(trending_service.get_trending_projects, args.repeat))
+        report('hot score index, page 10', timed(lambda: trending_service.get_trending_projects(cursor), args.repeat))
+        report('GROUP BY last 24h of reactions', timed(lambda: windowed_counts(20), args.scan_repeat))
+
+        # A fresh user reacting to popular projects, then taking the reactions back
+        uid = args.users + 1
+        bulk_service.import_records([{'kind': 'user', 'uid': uid, 'email': 'bench@test.com',
+                                      'username': 'bench', 'hashed_password': 'hash'}])
+        pids = iter(range(1, args.repeat + 1))
+        print('reaction writes:')
+        report('add_reaction', timed(lambda: reaction_service.add_reaction(next(pids), uid, 'LIKE'), args.repeat))
+        pids = iter(range(1, args.repeat + 1))
+        report('remove_reaction (rescores)', timed(lambda: reaction_service.remove_reaction(next(pids), uid), args.repeat))
+
+
+if __name__ == '__main__':
+    main()
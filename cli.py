@@ -0,0 +1,96 @@
+# Flask CLI commands for managing the database, e.g.
+#   flask --app app init-db
+#   flask --app app seed-db --reset
+#   flask --app app import-data community.ndjson
+#   flask --app app export-data --format csv --kind user users.csv
+#   flask --app app rebuild-trending
+
+import click
+from extensions import db
+from services import bulk_service, trending_service
+import migrations
+
+
+def seed_sample_data():
+    """Populates the database with a few users, projects, reactions and friends."""
+    from services import user_service, project_service, reaction_service, password_service
+
+    alice = user_service.create_new_user('alice@test.com', 'Alice', password_service.hash_password('alice_password'))
+    bob = user_service.create_new_user('bob@test.com', 'Bob', password_service.hash_password('bob_password'))
+    charlie = user_service.create_new_user('charlie@test.com', 'Charlie', password_service.hash_password('charlie_password'))
+
+    alice_project = project_service.create_new_project(alice.uid, "Alice's Project", "This is Alice's project", 0.5)
+    project_service.create_new_project(bob.uid, "Bob's Project", "This is Bob's project")
+    project_service.add_project_member(alice_project.pid, bob.uid, role='PETITION')
+
+    reaction_service.add_reaction(alice_project.pid, alice.uid, 'LIKE')
+    reaction_service.add_reaction(alice_project.pid, bob.uid, 'UPVOTE')
+    reaction_service.add_reaction(alice_project.pid, charlie.uid, 'LIKE')
+
+    user_service.send_friend_request(alice.uid, bob.uid)
+    user_service.accept_friend_request(alice.uid, bob.uid)
+
+
+def register_commands(app):
+    @app.cli.command('init-db')
+    def init_db():
+        """Creates or upgrades the database schema."""
+        applied = migrations.upgrade()
+        click.echo(f'Applied {applied} migration(s); schema is at version {migrations.LATEST_VERSION}.')
+
+    @app.cli.command('seed-db')
+    @click.option('--reset', is_flag=True, help='Drop all existing data before seeding.')
+    def seed_db(reset):
+        """Loads sample users and projects for local development."""
+        if reset:
+            db.drop_all()
+            with db.engine.begin() as conn:
+                conn.exec_driver_sql('DROP TABLE IF EXISTS projects_fts')
+                conn.exec_driver_sql('PRAGMA user_version = 0')
+        migrations.upgrade()
+        seed_sample_data()
+        click.echo('Sample data loaded.')
+
+    @app.cli.command('import-data')
+    @click.argument('source', type=click.File('r'))
+    @click.option('--format', 'fmt', type=click.Choice(['ndjson', 'csv']), default='ndjson')
+    @click.option('--kind', type=click.Choice(list(bulk_service.KINDS)), help='Record kind (required for CSV).')
+    @click.option('--batch-size', type=int, default=bulk_service.DEFAULT_BATCH_SIZE, help='Rows per transaction.')
+    def import_data(source, fmt, kind, batch_size):
+        """Bulk-loads records from an NDJSON or CSV file ('-' for stdin)."""
+        if fmt == 'csv':
+            if not kind:
+                raise click.UsageError('--kind is required for CSV imports.')
+            records = bulk_service.read_csv(source, kind)
+        else:
+            records = bulk_service.read_ndjson(source)
+
+        migrations.upgrade()
+        counts = bulk_service.import_records(records, batch_size)
+        click.echo(', '.join(f'{count} {kind}(s)' for kind, count in counts.items() if count) or 'Nothing imported.')
+
+    @app.cli.command('export-data')
+    @click.argument('target', type=click.File('w'))
+    @click.option('--format', 'fmt', type=click.Choice(['ndjson', 'csv']), default='ndjson')
+    @click.option('--kind', type=click.Choice(list(bulk_service.KINDS)), help='Record kind (required for CSV).')
+    def export_data(target, fmt, kind):
+        """Streams records to an NDJSON or CSV file ('-' for stdout)."""
+        kinds = [kind] if kind else None
+        if fmt == 'csv':
+            if not kind:
+                raise click.UsageError('--kind is required for CSV exports.')
+            count = bulk_service.write_csv(bulk_service.export_records(kinds), target, kind)
+        else:
+            count = bulk_service.write_ndjson(bulk_service.export_records(kinds), target)
+        click.echo(f'Exported {count} record(s).', err=True)
+
+    @app.cli.command('rebuild-trending')
+    @click.option('--prune-hours', type=int, help='Also drop hourly reaction buckets older than this.')
+    def rebuild_trending(prune_hours):
+        """Recomputes trending scores from the reactions table (needed after changing TRENDING_HALF_LIFE_HOURS)."""
+        migrations.upgrade()
+        trending_service.rebuild_scores()
+        db.session.commit()
+        click.echo('Trending scores rebuilt.')
+        if prune_hours is not None:
+            click.echo(f'Pruned {trending_service.prune_buckets(prune_hours)} bucket(s).')
@@ -2,7 +2,7 @@
 from services import project_service
 from services import reaction_service
 from services import user_service
-from werkzeug.security import generate_password_hash, check_password_hash
+from services import password_service
 from flask import session
 
 # DB FUNCTIONS FOR USER INTERACTIVITY
@@ -27,20 +27,7 @@ def change_user_email(uid: int, new_email: str):
 
 def change_project_description(pid: int, new_description: str):
     """Updates a project's description"""
-
-    proj = db.session.execute(
-        db.select(Project).where(
-            (Project.pid == pid)
-        )
-    ).scalar_one_or_none()
-
-    if not proj:
-        raise ValueError("Project not found")
-
-    proj.description = new_description
-
-    db.session.commit()
-    return proj
+    return project_service.change_project_description(pid, new_description)
 
 def change_project_status(pid: int, new_status: str):
     """Updates a project's status"""
@@ -98,7 +85,7 @@ def handle_account_creation(form):
     """
     based on given account creation form, instantiate account by calling appropriate service procedures
     """
-    hashed_password = generate_password_hash(form.get("password"))
+    hashed_password = password_service.hash_password(form.get("password"))
     return user_service.create_new_user(form.get("email"), form.get("username"), hashed_password)
 
 def handle_update_username(uid: int, form):
@@ -115,7 +102,7 @@ def handle_update_password(uid: int, form):
     form is expected to have an attribute form.new_password
     '''
     new_password = form.get("new_password")
-    new_hashed_password = generate_password_hash(new_password)
+    new_hashed_password = password_service.hash_password(new_password)
     return user_service.change_user_password(uid, new_hashed_password)
 
 def handle_remove_member(pid: int, uid: int):
@@ -124,12 +111,19 @@ def handle_remove_member(pid: int, uid: int):
     '''
     return project_service.remove_project_member(pid,uid)
 
-def get_available_projects():
+def get_available_projects(cursor: str = None, limit: int = project_service.FEED_DEFAULT_LIMIT):
     '''
-    Retrieves all PUBLISHED projects which the current user
-    is not already a part of
+    Retrieves one page of PUBLISHED projects which the current user
+    is not already a part of, as (projects, next_cursor)
     '''
-    ...
+    return project_service.get_available_projects(session.get('current_uid'), cursor, limit)
+
+def get_current_user():
+    '''
+    Returns the logged in user's UserRecord (from the identity cache),
+    or None if nobody is logged in or the user no longer exists
+    '''
+    return user_service.get_user_record(session.get('current_uid'))
 
 def handle_login(form):
     '''
@@ -138,9 +132,13 @@ def handle_login(form):
     '''
     username = form.get("username")
     password = form.get("password")
-    user = user_service.find_user_with_username(username)
+    # Not the identity cache: another worker may have changed the password or username
+    user = user_service.get_login_credentials(username)
     if not user:
         return None
-    if not check_password_hash(user.hashed_password, password):
+    if not password_service.verify_password(user.hashed_password, password):
         return None
+    # Upgrade hashes made with an older work factor while we have the plaintext
+    if password_service.needs_rehash(user.hashed_password):
+        user_service.change_user_password(user.uid, password_service.hash_password(password))
     return user.uid
@@ -2,5 +2,36 @@
 # November 2025
 
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
 
 db = SQLAlchemy()
+
+# SQLite pragmas applied to every new connection, selected by the
+# DATABASE_PROFILE config value.
+SQLITE_PROFILES = {
+    # Stock SQLite behaviour (rollback journal, full fsync on every commit)
+    'default': {},
+    # WAL lets readers run alongside the single writer; NORMAL sync is still
+    # crash-safe in WAL mode. busy_timeout makes writers wait instead of
+    # failing with "database is locked".
+    'tuned': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': 5000,        # ms
+        'cache_size': -20000,        # negative = KiB, so ~20 MB per connection
+        'mmap_size': 268435456,      # 256 MB
+        'temp_store': 'MEMORY',
+    },
+}
+
+def configure_sqlite(engine, pragmas: dict):
+    """Runs the given PRAGMA settings on every connection the engine opens."""
+    if engine.dialect.name != 'sqlite' or not pragmas:
+        return
+
+    @event.listens_for(engine, 'connect')
+    def _apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+        cursor.close()
@@ -0,0 +1,92 @@
+# Rendered-fragment cache for project cards.
+#
+# Cards are cached per project under (template, version, vary...) where
+# `version` is Project.version, bumped by every service write that changes
+# what a card shows. A bumped version simply misses; the service writes also
+# call invalidate_project() so superseded HTML is dropped right away.
+#
+# The default backend is a bounded in-process LRU. FRAGMENT_CACHE_BACKEND may
+# name a factory ("package.module:function") that returns an object with
+# get(pid), set(pid, fragments) and delete(pid) -- e.g. one backed by a shared
+# store so workers reuse each other's renders.
+
+import importlib
+from flask import render_template
+from markupsafe import Markup
+from services.cache import LRUCache
+
+
+class LocalBackend:
+    """Per-process LRU of pid -> {fragment key: html}."""
+
+    def __init__(self, maxsize: int):
+        self._cache = LRUCache(maxsize=maxsize)
+
+    def get(self, pid):
+        return self._cache.get(pid)
+
+    def set(self, pid, fragments: dict):
+        self._cache.set(pid, fragments)
+
+    def delete(self, pid):
+        self._cache.delete(pid)
+
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+
+_backend = None
+
+
+def configure(backend):
+    """Sets the backend (None disables caching)."""
+    global _backend
+    _backend = backend
+
+
+def invalidate_project(*pids: int):
+    if _backend is not None:
+        for pid in pids:
+            _backend.delete(int(pid))
+
+
+def render_fragment(template: str, pid: int, version: int, vary: tuple = (), **context) -> Markup:
+    """Renders `template` with `context`, reusing the cached HTML for the same (pid, version, vary)."""
+    if _backend is None:
+        return Markup(render_template(template, **context))
+
+    key = (template, version) + tuple(vary)
+    fragments = _backend.get(pid) or {}
+    html = fragments.get(key)
+    if html is None:
+        html = render_template(template, **context)
+        # Older versions can't be requested again; keep only current entries
+        fragments = {k: v for k, v in fragments.items() if k[1] == version}
+        fragments[key] = html
+        _backend.set(pid, fragments)
+    return Markup(html)
+
+
+def get_stats() -> dict:
+    if _backend is None or not hasattr(_backend, 'stats'):
+        return {'enabled': _backend is not None}
+    return dict(_backend.stats(), enabled=True)
+
+
+def _load_factory(path: str):
+    module_name, _, attr = path.partition(':')
+    return getattr(importlib.import_module(module_name), attr)
+
+
+def init_app(app):
+    app.config.setdefault('FRAGMENT_CACHE_SIZE', 2048)
+    app.config.setdefault('FRAGMENT_CACHE_BACKEND', None)
+
+    if app.config['FRAGMENT_CACHE_BACKEND']:
+        configure(_load_factory(app.config['FRAGMENT_CACHE_BACKEND'])(app))
+    elif app.config['FRAGMENT_CACHE_SIZE'] > 0:
+        configure(LocalBackend(app.config['FRAGMENT_CACHE_SIZE']))
+    else:
+        configure(None)
+
+    app.jinja_env.globals['render_fragment'] = render_fragment
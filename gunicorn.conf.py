@@ -0,0 +1,50 @@
+# Gunicorn settings for the production server. Every value can be overridden
+# through the environment so docker-compose can tune it without a rebuild.
+#
+# Graceful reload: `kill -HUP <master pid>` starts new workers and lets the old
+# ones finish their in-flight requests (bounded by graceful_timeout).
+
+import multiprocessing
+import os
+
+bind = os.environ.get('WEB_BIND', '0.0.0.0:5001')
+
+# Pre-fork worker pool
+workers = int(os.environ.get('WEB_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+worker_class = os.environ.get('WEB_WORKER_CLASS', 'gthread')
+threads = int(os.environ.get('WEB_THREADS', 4))
+# Used by the gevent worker class: each connection is a greenlet, so slow
+# clients and long-lived API/stream requests don't hold an OS thread
+worker_connections = int(os.environ.get('WEB_WORKER_CONNECTIONS', 1000))
+# Live update streams stay open for minutes; on gthread workers a few open
+# project pages would take every thread, so only gevent workers serve them
+os.environ.setdefault('EVENT_STREAMS', '1' if worker_class == 'gevent' else '0')
+if worker_class == 'gevent':
+    # sqlite3 is a blocking C driver: every query, and every wait for the
+    # write lock, stalls all greenlets in the worker. Keep lock waits short
+    # so a busy writer costs the worker milliseconds, not seconds.
+    os.environ.setdefault('DB_BUSY_TIMEOUT_MS', '250')
+
+# Connection handling
+keepalive = int(os.environ.get('WEB_KEEPALIVE', 5))
+timeout = int(os.environ.get('WEB_TIMEOUT', 30))
+graceful_timeout = int(os.environ.get('WEB_GRACEFUL_TIMEOUT', 30))
+
+# Recycle workers periodically; jitter keeps them from restarting together
+max_requests = int(os.environ.get('WEB_MAX_REQUESTS', 10000))
+max_requests_jitter = int(os.environ.get('WEB_MAX_REQUESTS_JITTER', 1000))
+
+# Import the app (and create the schema) once in the master, then fork
+preload_app = os.environ.get('WEB_PRELOAD', '1') == '1'
+
+accesslog = os.environ.get('WEB_ACCESS_LOG', '-') or None
+errorlog = '-'
+
+
+def post_fork(server, worker):
+    # SQLite connections must not cross a fork; give each worker a fresh pool.
+    if preload_app:
+        from wsgi import app
+        from extensions import db
+        with app.app_context():
+            db.engine.dispose(close=False)
@@ -0,0 +1,85 @@
+# HTTP caching helpers: ETag validators for dynamic pages and long-lived,
+# content-hashed URLs for static files.
+#
+# Pages build their ETag from cheap version data (Project.version, roles,
+# the viewer) and call not_modified() *before* loading anything else or
+# rendering, so a client that already has the page gets an empty 304.
+
+import hashlib
+import os
+from flask import Response, request, session, url_for, current_app
+
+STATIC_MAX_AGE = 365 * 24 * 3600
+
+_static_hashes = {}
+
+
+def _hash_tree(*paths: str) -> str:
+    digest = hashlib.sha1()
+    for root, dirs, files in (entry for path in paths for entry in sorted(os.walk(path))):
+        dirs.sort()
+        for name in sorted(files):
+            with open(os.path.join(root, name), 'rb') as fp:
+                digest.update(name.encode())
+                digest.update(fp.read())
+    return digest.hexdigest()
+
+
+def _deploy_salt(app) -> str:
+    # Pages link static files by content hash, so a deploy that only changes
+    # CSS/JS must still change page ETags or clients keep the old asset URLs
+    return _hash_tree(os.path.join(app.root_path, app.template_folder), app.static_folder)
+
+
+def page_etag(*parts) -> str:
+    """
+    ETag for a dynamic page. Mixes in the viewer (the header differs when
+    logged in) and the templates and static files, so a deploy invalidates
+    old validators.
+    """
+    digest = hashlib.sha1(current_app.config['ETAG_SALT'].encode())
+    digest.update(repr((session.get('current_uid'),) + parts).encode())
+    return digest.hexdigest()
+
+
+def not_modified(etag: str):
+    """Returns a 304 response if the client already has `etag`, else None."""
+    # Pending flash messages are rendered into the page, so it must be sent
+    if '_flashes' in session or etag not in request.if_none_match:
+        return None
+    response = Response(status=304)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def with_etag(response, etag: str):
+    """Marks a freshly rendered page with its validator; clients must revalidate."""
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def static_url(filename: str) -> str:
+    """url_for('static') with a content hash, so the file can be cached forever."""
+    file_hash = _static_hashes.get(filename)
+    if file_hash is None:
+        with open(os.path.join(current_app.static_folder, filename), 'rb') as fp:
+            file_hash = _static_hashes[filename] = hashlib.sha1(fp.read()).hexdigest()[:12]
+    return url_for('static', filename=filename, v=file_hash)
+
+
+def _static_cache_headers(response):
+    if request.endpoint == 'static' and request.args.get('v') and response.status_code == 200:
+        response.cache_control.public = True
+        response.cache_control.max_age = STATIC_MAX_AGE
+        response.cache_control.immutable = True
+        response.cache_control.no_cache = None
+    return response
+
+
+def init_app(app):
+    app.config.setdefault('ETAG_SALT', _deploy_salt(app))
+    _static_hashes.clear()
+    app.jinja_env.globals['static_url'] = static_url
+    app.after_request(_static_cache_headers)
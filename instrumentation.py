@@ -0,0 +1,157 @@
+# Request-scoped SQL instrumentation.
+#
+# Hooks SQLAlchemy's cursor events and Flask's request lifecycle to record,
+# for every request: the endpoint, how many statements it ran, total time
+# spent in the database and the slowest statements (with parameters).
+# Requests over the configured thresholds are logged as one JSON line each,
+# and per-endpoint histograms are kept in memory for /_debug/metrics.
+
+import bisect
+import json
+import logging
+import threading
+import time
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from extensions import db
+
+logger = logging.getLogger('communal_grounds.sql')
+
+DURATION_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100)
+SLOWEST_KEPT = 5
+
+_lock = threading.Lock()
+_endpoints = {}
+_sources = {}
+
+
+class RequestStats:
+    """SQL activity for the current request, stored on flask.g."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.statements = 0
+        self.db_time_ms = 0.0
+        self.slowest = []  # (duration_ms, statement, parameters), slowest first
+
+    def record(self, statement, parameters, duration_ms):
+        self.statements += 1
+        self.db_time_ms += duration_ms
+        if len(self.slowest) < SLOWEST_KEPT or duration_ms > self.slowest[-1][0]:
+            self.slowest.append((duration_ms, statement, parameters))
+            self.slowest.sort(key=lambda s: s[0], reverse=True)
+            del self.slowest[SLOWEST_KEPT:]
+
+
+def _new_histogram(buckets):
+    return {'buckets': list(buckets), 'counts': [0] * (len(buckets) + 1), 'sum': 0.0}
+
+
+def _observe(histogram, value):
+    histogram['counts'][bisect.bisect_left(histogram['buckets'], value)] += 1
+    histogram['sum'] += value
+
+
+def _record_endpoint(endpoint, duration_ms, stats):
+    with _lock:
+        entry = _endpoints.get(endpoint)
+        if entry is None:
+            entry = _endpoints[endpoint] = {
+                'requests': 0,
+                'duration_ms': _new_histogram(DURATION_BUCKETS_MS),
+                'db_time_ms': _new_histogram(DURATION_BUCKETS_MS),
+                'statements': _new_histogram(QUERY_COUNT_BUCKETS),
+            }
+        entry['requests'] += 1
+        _observe(entry['duration_ms'], duration_ms)
+        _observe(entry['db_time_ms'], stats.db_time_ms)
+        _observe(entry['statements'], stats.statements)
+
+
+def register_metrics_source(name: str, source):
+    """Adds a callable whose dict result is included in get_metrics() under `name`."""
+    _sources[name] = source
+
+
+def get_metrics() -> dict:
+    with _lock:
+        metrics = {'endpoints': json.loads(json.dumps(_endpoints))}
+    for name, source in _sources.items():
+        metrics[name] = source()
+    return metrics
+
+
+def reset_metrics():
+    with _lock:
+        _endpoints.clear()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info['query_start'].pop()
+    stats = g.get('sql_stats') if has_request_context() else None
+    if stats is not None:
+        stats.record(statement, parameters, (time.perf_counter() - started) * 1000)
+
+
+def _handle_error(exception_context):
+    starts = exception_context.connection.info.get('query_start') if exception_context.connection else None
+    if starts:
+        starts.pop()
+
+
+def _start_request():
+    g.sql_stats = RequestStats()
+
+
+def _finish_request(response):
+    stats = g.pop('sql_stats', None)
+    if stats is None:
+        return response
+
+    config = current_app.config
+    duration_ms = (time.perf_counter() - stats.started) * 1000
+    endpoint = request.endpoint or 'unmatched'
+    _record_endpoint(endpoint, duration_ms, stats)
+
+    slow_query = stats.slowest and stats.slowest[0][0] >= config['SLOW_QUERY_MS']
+    if (duration_ms >= config['SLOW_REQUEST_MS']
+            or stats.statements > config['MAX_QUERIES_PER_REQUEST']
+            or slow_query):
+        logger.warning(json.dumps({
+            'event': 'slow_request',
+            'endpoint': endpoint,
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'duration_ms': round(duration_ms, 2),
+            'statements': stats.statements,
+            'db_time_ms': round(stats.db_time_ms, 2),
+            'slowest': [
+                {'duration_ms': round(ms, 2), 'statement': statement, 'parameters': repr(parameters)}
+                for ms, statement, parameters in stats.slowest
+            ],
+        }))
+    return response
+
+
+def init_app(app):
+    app.config.setdefault('SQL_METRICS_ENABLED', True)
+    app.config.setdefault('SLOW_REQUEST_MS', 500)
+    app.config.setdefault('SLOW_QUERY_MS', 100)
+    app.config.setdefault('MAX_QUERIES_PER_REQUEST', 20)
+
+    if not app.config['SQL_METRICS_ENABLED']:
+        return
+
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(db.engine, 'after_cursor_execute', _after_cursor_execute)
+        event.listen(db.engine, 'handle_error', _handle_error)
+
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
@@ -0,0 +1,102 @@
+# Schema migrations, tracked with SQLite's PRAGMA user_version.
+#
+# Each entry in MIGRATIONS upgrades the schema by one version and must be safe
+# to run against a database that already has the change (databases created
+# before migrations existed report version 0). upgrade() only reads a pragma
+# when the schema is current, so it is cheap enough to call on every start.
+
+from extensions import db
+
+
+def _create_tables(conn):
+    db.metadata.create_all(conn)
+
+
+def _create_friendships(conn):
+    # New table, backfilled from already accepted requests (both directions)
+    db.metadata.tables['friendships'].create(conn, checkfirst=True)
+    conn.exec_driver_sql(
+        "INSERT OR IGNORE INTO friendships (uid, friend_uid) "
+        "SELECT requestor_uid, recipient_uid FROM friend_requests WHERE status = 'ACCEPTED' "
+        "UNION ALL "
+        "SELECT recipient_uid, requestor_uid FROM friend_requests WHERE status = 'ACCEPTED'"
+    )
+
+
+def _create_project_search(conn):
+    # External-content FTS5 index over project text, see services/search_service.py.
+    # Names rank above descriptions; 2 and 3 character prefixes get their own index.
+    conn.exec_driver_sql(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS projects_fts USING fts5("
+        "name, description, content='projects', content_rowid='pid', "
+        "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+    )
+    conn.exec_driver_sql("INSERT INTO projects_fts (projects_fts, rank) VALUES ('rank', 'bm25(10.0, 1.0)')")
+    conn.exec_driver_sql("INSERT INTO projects_fts (projects_fts) VALUES ('rebuild')")
+
+
+def _create_trending(conn):
+    # Hourly reaction buckets and decayed scores, backfilled from existing reactions
+    from services import trending_service
+    for name in ('reaction_buckets', 'project_trending'):
+        db.metadata.tables[name].create(conn, checkfirst=True)
+    trending_service.rebuild_scores(conn=conn)
+
+
+def _replace_member_uid_index(conn):
+    # (uid) -> (uid, pid, role): the dashboard pages a user's memberships by pid
+    conn.exec_driver_sql('DROP INDEX IF EXISTS ix_project_members_uid')
+    _create_indexes('ix_project_members_uid_pid')(conn)
+
+
+def _add_column(table, column_ddl):
+    def migration(conn):
+        name = column_ddl.split()[0]
+        columns = {row[1] for row in conn.exec_driver_sql(f'PRAGMA table_info({table})')}
+        if name not in columns:
+            conn.exec_driver_sql(f'ALTER TABLE {table} ADD COLUMN {column_ddl}')
+    return migration
+
+
+def _create_indexes(*names):
+    def migration(conn):
+        indexes = {index.name: index for table in db.metadata.tables.values() for index in table.indexes}
+        for name in names:
+            # Indexes a later migration replaced are no longer in the models
+            if name in indexes:
+                indexes[name].create(conn, checkfirst=True)
+    return migration
+
+
+MIGRATIONS = [
+    _create_tables,
+    # Secondary indexes for the service-layer lookups
+    _create_indexes(
+        'ix_projects_feed',
+        'ix_projects_owner_uid',
+        'ix_project_members_uid',
+        'ix_friend_requests_recipient_status',
+        'ix_reactions_pid_type',
+    ),
+    _create_friendships,
+    _add_column('projects', 'version INTEGER NOT NULL DEFAULT 1'),
+    _create_project_search,
+    _create_trending,
+    _replace_member_uid_index,
+]
+
+LATEST_VERSION = len(MIGRATIONS)
+
+
+def get_version(conn) -> int:
+    return conn.exec_driver_sql('PRAGMA user_version').scalar()
+
+
+def upgrade() -> int:
+    """Applies any pending migrations and returns the number applied."""
+    with db.engine.begin() as conn:
+        version = get_version(conn)
+        for target in range(version + 1, LATEST_VERSION + 1):
+            MIGRATIONS[target - 1](conn)
+            conn.exec_driver_sql(f'PRAGMA user_version = {target}')
+    return max(LATEST_VERSION - version, 0)
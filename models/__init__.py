@@ -5,5 +5,6 @@
 from .user import User
 from .project import Project, ProjectMember
 from .reaction import Reaction
-from .friend import FriendRequest
+from .friend import FriendRequest, Friendship
+from .trending import ReactionBucket, ProjectTrending
 
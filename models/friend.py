@@ -19,5 +19,22 @@ class FriendRequest(db.Model):
     requestor = db.relationship('User', primaryjoin="User.uid == FriendRequest.requestor_uid", back_populates='requested_friends')
     recipient = db.relationship('User', primaryjoin="User.uid == FriendRequest.recipient_uid", back_populates='received_requests')
     
+    # The primary key covers lookups by requestor; this covers the recipient side
+    __table_args__ = (
+        db.Index('ix_friend_requests_recipient_status', 'recipient_uid', 'status'),
+    )
+
     def __repr__(self):
         return f'<FriendRequest {self.requestor_uid} -> {self.recipient_uid} ({self.status})>'
+
+class Friendship(db.Model):
+    __tablename__ = 'friendships'
+
+    # Symmetric adjacency list: an accepted friendship between A and B is stored
+    # as both (A, B) and (B, A), so "friends of X" is a primary-key range scan.
+    uid = db.Column(db.Integer, db.ForeignKey('users.uid'), primary_key=True)
+    friend_uid = db.Column(db.Integer, db.ForeignKey('users.uid'), primary_key=True)
+    created_at = db.Column(db.DateTime, nullable=False, server_default=func.now())
+
+    def __repr__(self):
+        return f'<Friendship {self.uid} <-> {self.friend_uid}>'
@@ -11,10 +11,12 @@ class Project(db.Model):
     description = db.Column(db.Text)
     visibility = db.Column(db.String(20), nullable=False, default='DRAFT')
     status = db.Column(db.Float, nullable=False, default=0.0)
+    # Incremented by every write that changes how the project renders (see project_service.bump_project_version)
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
     created_at = db.Column(db.DateTime, nullable=False, server_default=func.now())
     
     # ForeignKey for the owner (Many-to-One)
-    owner_uid = db.Column(db.Integer, db.ForeignKey('users.uid'), nullable=False)
+    owner_uid = db.Column(db.Integer, db.ForeignKey('users.uid'), nullable=False, index=True)
 
     # --- Relationships ---
     # Many-to-One: Projects to Owner User
@@ -25,6 +27,11 @@ class Project(db.Model):
 
     # One-to-Many: Projects to Reactions
     reactions = db.relationship('Reaction', back_populates='project', lazy=True, cascade="all, delete-orphan")
+
+    # Serves the keyset-paginated home feed (visibility filter + newest first)
+    __table_args__ = (
+        db.Index('ix_projects_feed', 'visibility', 'created_at', 'pid'),
+    )
     
     def __repr__(self):
         return f'<Project {self.name}>'
@@ -42,6 +49,11 @@ class ProjectMember(db.Model):
     # Bi-directional relationships to access the related objects
     project = db.relationship('Project', back_populates='members', viewonly=True)
     member = db.relationship('User')
+
+    # A user's memberships in pid order, with the role, without touching the table
+    __table_args__ = (
+        db.Index('ix_project_members_uid_pid', 'uid', 'pid', 'role'),
+    )
     
     def __repr__(self):
         return f'<ProjectMember PID:{self.pid} UID:{self.uid} Role:{self.role}>'
@@ -21,6 +21,7 @@ class Reaction(db.Model):
     # Enforce one reaction per user per project
     __table_args__ = (
         db.UniqueConstraint('pid', 'uid', name='_user_project_uc'),
+        db.Index('ix_reactions_pid_type', 'pid', 'type'),
     )
 
     def __repr__(self):
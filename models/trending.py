@@ -0,0 +1,32 @@
+# Trending aggregates maintained by services/trending_service.py
+
+from extensions import db
+from sqlalchemy import func
+
+class ReactionBucket(db.Model):
+    __tablename__ = 'reaction_buckets'
+
+    # Reactions added to a project per hour; `bucket` is hours since the Unix epoch
+    pid = db.Column(db.Integer, db.ForeignKey('projects.pid'), primary_key=True)
+    bucket = db.Column(db.Integer, primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<ReactionBucket Project:{self.pid} @{self.bucket}: {self.count}>'
+
+class ProjectTrending(db.Model):
+    __tablename__ = 'project_trending'
+
+    # Natural log of the project's time-decayed reaction count, measured at a
+    # fixed epoch. Every project decays at the same rate, so sorting by it
+    # never goes stale and the trending feed is an index scan.
+    pid = db.Column(db.Integer, db.ForeignKey('projects.pid'), primary_key=True)
+    hot_score = db.Column(db.Float, nullable=False)
+    updated_at = db.Column(db.DateTime, nullable=False, server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        db.Index('ix_project_trending_hot', 'hot_score', 'pid'),
+    )
+
+    def __repr__(self):
+        return f'<ProjectTrending Project:{self.pid} {self.hot_score:.3f}>'
@@ -0,0 +1,434 @@
+# JSON API for the project feed, project pages, reactions and friend requests.
+#
+# Versioned under /api/v1 so the templates' form routes can keep evolving
+# without breaking clients. Serializers build small dicts from the column-only
+# rows the services return; nothing here loads full ORM objects.
+
+import json
+import time
+from flask import Blueprint, Response, jsonify, request, session, make_response, current_app
+from controller import controller
+from http_cache import page_etag, not_modified, with_etag
+from services import user_service, project_service, reaction_service, search_service, trending_service, event_bus
+
+api_bp = Blueprint('api', __name__, url_prefix='/api/v1')
+
+REACTION_TYPE_MAX_LENGTH = 50
+MEMBER_ROLES = ('EDITOR', 'VIEWER', 'PETITION')
+
+# --- SERIALIZERS ---
+
+def _timestamp(value):
+    return value.isoformat() if value is not None else None
+
+def serialize_project_summary(row, reactions: dict) -> dict:
+    return {
+        'pid': row.pid,
+        'name': row.name,
+        'description': row.description,
+        'status': row.status,
+        'version': row.version,
+        'created_at': _timestamp(row.created_at),
+        'reactions': reactions,
+    }
+
+def serialize_project(row) -> dict:
+    return {
+        'pid': row.pid,
+        'name': row.name,
+        'description': row.description,
+        'status': row.status,
+        'visibility': row.visibility,
+        'owner_uid': row.owner_uid,
+        'version': row.version,
+    }
+
+def serialize_member(row) -> dict:
+    return {'uid': row.uid, 'username': row.username, 'role': row.role}
+
+def serialize_friend_request(row) -> dict:
+    return {'uid': row.uid, 'username': row.username, 'status': row.status, 'created_at': _timestamp(row.created_at)}
+
+# --- HELPERS ---
+
+def _error(message: str, status: int):
+    return jsonify({'error': message}), status
+
+def _json_body() -> dict:
+    body = request.get_json(silent=True)
+    return body if isinstance(body, dict) else {}
+
+def _current_uid():
+    return session.get('current_uid')
+
+def _load_project(pid: int, uid: int):
+    """
+    Returns (validator, error_response). The validator carries the project's
+    columns and the viewer's role; members that haven't been accepted yet are
+    treated like outsiders, as on the HTML project page.
+    """
+    validator = project_service.get_project_validator(pid, uid)
+    if validator is None:
+        return None, _error('Project not found.', 404)
+    if validator.role in (None, 'PETITION'):
+        return None, _error('You are not a member of this project.', 403)
+    return validator, None
+
+# --- PROJECTS ---
+
+@api_bp.route('/projects')
+def list_projects():
+    cursor = request.args.get('cursor')
+    limit = request.args.get('limit', project_service.FEED_DEFAULT_LIMIT, type=int)
+
+    try:
+        projects, next_cursor = project_service.get_published_project_feed(cursor, limit)
+    except ValueError as e:
+        return _error(str(e), 400)
+
+    etag = page_etag('api_projects', cursor, limit, [(p.pid, p.version) for p in projects])
+    cached = not_modified(etag)
+    if cached:
+        return cached
+
+    summaries = reaction_service.get_reaction_summaries(p.pid for p in projects)
+    return with_etag(make_response(jsonify({
+        'projects': [serialize_project_summary(p, summaries[p.pid]) for p in projects],
+        'next_cursor': next_cursor,
+    })), etag)
+
+@api_bp.route('/projects/available')
+def list_available_projects():
+    """Like /projects, without the ones the current user is already part of."""
+    uid = _current_uid()
+    if not uid:
+        return _error('Please log in first.', 401)
+
+    try:
+        projects, next_cursor = controller.get_available_projects(
+            request.args.get('cursor'), request.args.get('limit', project_service.FEED_DEFAULT_LIMIT, type=int))
+    except ValueError as e:
+        return _error(str(e), 400)
+
+    summaries = reaction_service.get_reaction_summaries(p.pid for p in projects)
+    return jsonify({
+        'projects': [serialize_project_summary(p, summaries[p.pid]) for p in projects],
+        'next_cursor': next_cursor,
+    })
+
+@api_bp.route('/projects/trending')
+def list_trending_projects():
+    cursor = request.args.get('cursor')
+    limit = request.args.get('limit', trending_service.TRENDING_DEFAULT_LIMIT, type=int)
+    try:
+        projects, next_cursor = trending_service.get_trending_projects(cursor, limit)
+    except ValueError as e:
+        return _error(str(e), 400)
+
+    summaries = reaction_service.get_reaction_summaries(p.pid for p in projects)
+    body = []
+    for p in projects:
+        project = serialize_project_summary(p, summaries[p.pid])
+        project['heat'] = round(trending_service.heat(p.hot_score), 3)
+        body.append(project)
+    return jsonify({'projects': body, 'next_cursor': next_cursor})
+
+@api_bp.route('/projects/search')
+def search_projects():
+    page = request.args.get('page', 1, type=int)
+    limit = request.args.get('limit', search_service.SEARCH_DEFAULT_LIMIT, type=int)
+    projects, has_more = search_service.search_projects(request.args.get('q', ''), page, limit)
+
+    summaries = reaction_service.get_reaction_summaries(p.pid for p in projects)
+    return jsonify({
+        'projects': [serialize_project_summary(p, summaries[p.pid]) for p in projects],
+        'next_page': page + 1 if has_more else None,
+    })
+
+@api_bp.route('/projects/autocomplete')
+def autocomplete_projects():
+    rows = search_service.autocomplete_project_names(request.args.get('q', ''))
+    return jsonify({'projects': [{'pid': row.pid, 'name': row.name} for row in rows]})
+
+@api_bp.route('/projects/<int:pid>')
+def get_project(pid):
+    uid = _current_uid()
+    if not uid:
+        return _error('Please log in first.', 401)
+
+    project, error = _load_project(pid, uid)
+    if error:
+        return error
+
+    etag = page_etag('api_project', project.pid, project.version, project.role)
+    cached = not_modified(etag)
+    if cached:
+        return cached
+
+    page = project_service.get_project_page(pid, uid, project=project)
+    body = serialize_project(page.project)
+    body['viewer_role'] = page.viewer_role
+    body['members'] = [serialize_member(m) for m in page.members]
+    body['reactions'] = page.reaction_counts
+    return with_etag(make_response(jsonify(body)), etag)
+
+# --- MEMBERS ---
+
+@api_bp.route('/projects/<int:pid>/members')
+def list_members(pid):
+    uid = _current_uid()
+    if not uid:
+        return _error('Please log in first.', 401)
+
+    _, error = _load_project(pid, uid)
+    if error:
+        return error
+
+    return jsonify({'members': [serialize_member(m) for m in project_service.get_project_members(pid)]})
+
+@api_bp.route('/projects/<int:pid>/members', methods=['POST'])
+def set_member(pid):
+    """Adds a member or changes their role. Owner only."""
+    uid = _current_uid()
+    if not uid:
+        return _error('Please log in first.', 401)
+
+    project, error = _load_project(pid, uid)
+    if error:
+        return error
+    if project.role != 'OWNER':
+        return _error('Only the project owner can manage members.', 403)
+
+    body = _json_body()
+    member_uid = body.get('uid')
+    role = body.get('role', 'VIEWER')
+    if not isinstance(member_uid, int) or role not in MEMBER_ROLES:
+        return _error(f"Expected an integer 'uid' and a 'role' in {', '.join(MEMBER_ROLES)}.", 400)
+    if member_uid == project.owner_uid:
+        return _error("The owner's role cannot be changed.", 400)
+    if user_service.get_user_record(member_uid) is None:
+        return _error('User not found.', 404)
+
+    project_service.update_project_member(pid, member_uid, role)
+    return jsonify({'members': [serialize_member(m) for m in project_service.get_project_members(pid)]})
+
+@api_bp.route('/projects/<int:pid>/members/<int:member_uid>', methods=['DELETE'])
+def delete_member(pid, member_uid):
+    """Removes a member. Owners can remove anyone but themselves; members can leave."""
+    uid = _current_uid()
+    if not uid:
+        return _error('Please log in first.', 401)
+
+    project, error = _load_project(pid, uid)
+    if error:
+        return error
+    if member_uid == project.owner_uid:
+        return _error('The owner cannot be removed.', 400)
+    if project.role != 'OWNER' and member_uid != uid:
+        return _error('Only the project owner can manage members.', 403)
+
+    try:
+        project_service.remove_project_member(pid, member_uid)
+    except ValueError as e:
+        return _error(str(e), 404)
+    return '', 204
+
+# --- REACTIONS ---
+
+def _reactions_body(pid: int, uid: int) -> dict:
+    return {
+        'reactions': reaction_service.get_reaction_summary(pid),
+        'mine': reaction_service.get_user_reaction_type(pid, uid),
+    }
+
+def _load_reactable_project(pid: int, uid: int):
+    """Published projects can be reacted to by anyone; others only by their members."""
+    project = project_service.get_project_validator(pid, uid)
+    if project is None:
+        return _error('Project not found.', 404)
+    if project.visibility != 'PUBLISHED' and project.role in (None, 'PETITION'):
+        return _error('You are not a member of this project.', 403)
+    return None
+
+@api_bp.route('/projects/<int:pid>/reactions')
+def get_reactions(pid):
+    uid = _current_uid()
+    if not uid:
+        return _error('Please log in first.', 401)
+
+    error = _load_reactable_project(pid, uid)
+    if error:
+        return error
+    return jsonify(_reactions_body(pid, uid))
+
+def _reaction_type():
+    """The normalized 'type' from the JSON body, or None if it's missing or invalid."""
+    reaction_type = _json_body().get('type')
+    if not isinstance(reaction_type, str) or not reaction_type.strip() or len(reaction_type) > REACTION_TYPE_MAX_LENGTH:
+        return None
+    return reaction_type.strip().upper()
+
+@api_bp.route('/projects/<int:pid>/reactions', methods=['PUT'])
+def put_reaction(pid):
+    """Adds the viewer's reaction, or changes its type."""
+    uid = _current_uid()
+    if not uid:
+        return _error('Please log in first.', 401)
+
+    reaction_type = _reaction_type()
+    if reaction_type is None:
+        return _error(f"Expected a 'type' of at most {REACTION_TYPE_MAX_LENGTH} characters.", 400)
+
+    error = _load_reactable_project(pid, uid)
+    if error:
+        return error
+
+    reaction_service.add_reaction(pid, uid, reaction_type)
+    return jsonify(_reactions_body(pid, uid))
+
+@api_bp.route('/projects/<int:pid>/reactions/toggle', methods=['POST'])
+def toggle_reaction(pid):
+    """Removes the viewer's reaction if it has this type, otherwise sets it."""
+    uid = _current_uid()
+    if not uid:
+        return _error('Please log in first.', 401)
+
+    reaction_type = _reaction_type()
+    if reaction_type is None:
+        return _error(f"Expected a 'type' of at most {REACTION_TYPE_MAX_LENGTH} characters.", 400)
+
+    error = _load_reactable_project(pid, uid)
+    if error:
+        return error
+
+    reaction_service.toggle_reaction(pid, uid, reaction_type)
+    return jsonify(_reactions_body(pid, uid))
+
+@api_bp.route('/projects/<int:pid>/reactions', methods=['DELETE'])
+def delete_reaction(pid):
+    uid = _current_uid()
+    if not uid:
+        return _error('Please log in first.', 401)
+
+    error = _load_reactable_project(pid, uid)
+    if error:
+        return error
+
+    if not reaction_service.remove_reaction(pid, uid):
+        return _error('You have not reacted to this project.', 404)
+    return jsonify(_reactions_body(pid, uid))
+
+# --- FRIEND REQUESTS ---
+
+@api_bp.route('/friend_requests')
+def list_friend_requests():
+    uid = _current_uid()
+    if not uid:
+        return _error('Please log in first.', 401)
+
+    incoming, outgoing = user_service.get_friend_requests(uid)
+    return jsonify({
+        'incoming': [serialize_friend_request(r) for r in incoming],
+        'outgoing': [serialize_friend_request(r) for r in outgoing],
+    })
+
+@api_bp.route('/friend_requests', methods=['POST'])
+def create_friend_request():
+    uid = _current_uid()
+    if not uid:
+        return _error('Please log in first.', 401)
+
+    recipient_uid = _json_body().get('uid')
+    if not isinstance(recipient_uid, int):
+        return _error("Expected an integer 'uid'.", 400)
+    if user_service.get_user_record(recipient_uid) is None:
+        return _error('User not found.', 404)
+
+    try:
+        user_service.send_friend_request(uid, recipient_uid)
+    except ValueError as e:
+        return _error(str(e), 409)
+    return jsonify({'uid': recipient_uid, 'status': 'PENDING'}), 201
+
+@api_bp.route('/friend_requests/<int:requestor_uid>/accept', methods=['POST'])
+def accept_friend_request(requestor_uid):
+    uid = _current_uid()
+    if not uid:
+        return _error('Please log in first.', 401)
+
+    try:
+        user_service.accept_friend_request(requestor_uid, uid)
+    except ValueError as e:
+        return _error(str(e), 404)
+    return jsonify({'uid': requestor_uid, 'status': 'ACCEPTED'})
+
+# --- EVENT STREAMS ---
+
+def _last_event_id():
+    """EventSource resends the last id it saw as a header; a query arg works for the first connect."""
+    value = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    try:
+        return int(value) if value else None
+    except ValueError:
+        return None
+
+def _event_stream(topic: str) -> Response:
+    """
+    A text/event-stream response for one bus topic. It sends a comment as a
+    heartbeat when idle, and ends after EVENT_STREAM_MAX_SECONDS so clients
+    reconnect (resuming from their last id) and re-check access. A client
+    that fell behind its buffer gets a `reset` event and should reload.
+    The generator holds no database session, only its bus subscription.
+    """
+    if not current_app.config['EVENT_STREAMS']:
+        # 204 tells EventSource to stop reconnecting
+        return Response(status=204)
+
+    heartbeat = current_app.config['EVENT_HEARTBEAT_SECONDS']
+    lifetime = current_app.config['EVENT_STREAM_MAX_SECONDS']
+    last_event_id = _last_event_id()
+
+    def stream():
+        subscription = event_bus.bus.subscribe(topic, last_event_id)
+        deadline = time.monotonic() + lifetime
+        try:
+            yield f'retry: {int(heartbeat * 1000)}\n\n'
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return
+                events = subscription.get(min(heartbeat, remaining))
+                if subscription.lagged:
+                    yield 'event: reset\ndata: {}\n\n'
+                    return
+                if not events:
+                    yield ': heartbeat\n\n'
+                for event in events:
+                    yield f'id: {event.id}\nevent: {event.type}\ndata: {json.dumps(event.data)}\n\n'
+        finally:
+            event_bus.bus.unsubscribe(subscription)
+
+    response = Response(stream(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+@api_bp.route('/projects/<int:pid>/events')
+def project_events(pid):
+    """Reaction and membership changes on a project (members only)."""
+    uid = _current_uid()
+    if not uid:
+        return _error('Please log in first.', 401)
+
+    _, error = _load_project(pid, uid)
+    if error:
+        return error
+    return _event_stream(event_bus.project_topic(pid))
+
+@api_bp.route('/events')
+def user_events():
+    """The current user's membership and friend request changes."""
+    uid = _current_uid()
+    if not uid:
+        return _error('Please log in first.', 401)
+    return _event_stream(event_bus.user_topic(uid))
@@ -0,0 +1,11 @@
+from flask import Blueprint, jsonify, current_app, abort
+import instrumentation
+
+debug_bp = Blueprint('debug', __name__, url_prefix='/_debug')
+
+@debug_bp.route('/metrics')
+def metrics():
+    """Per-endpoint request/SQL histograms for this worker process."""
+    if not current_app.config.get('DEBUG_METRICS_ENDPOINT'):
+        abort(404)
+    return jsonify(instrumentation.get_metrics())
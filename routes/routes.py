@@ -2,9 +2,10 @@
 # November 2025
 
 from flask import Blueprint
-from flask import Flask, render_template, session, request, redirect, url_for, flash
+from flask import Flask, render_template, session, request, redirect, url_for, flash, make_response
 from controller import controller
-from services import user_service, project_service
+from http_cache import page_etag, not_modified, with_etag
+from services import user_service, project_service, reaction_service, search_service, trending_service, access_service
 from models.project import Project
 from models.user import User
 from models.project import Project
@@ -13,8 +14,48 @@ main_bp = Blueprint('main', __name__)
 
 @main_bp.route("/")
 def home():
-    all_projects = Project.query.all()
-    return render_template('home.html',all_projects=all_projects)
+    cursor = request.args.get('cursor')
+    limit = request.args.get('limit', project_service.FEED_DEFAULT_LIMIT, type=int)
+
+    try:
+        projects, next_cursor = project_service.get_published_project_feed(cursor, limit)
+    except ValueError as e:
+        print(f'Error loading project feed: {e}', flush=True)
+        return render_template('something_went_wrong.html')
+
+    etag = page_etag('home', cursor, limit, [(p.pid, p.version) for p in projects])
+    cached = not_modified(etag)
+    if cached:
+        return cached
+
+    reaction_summaries = reaction_service.get_reaction_summaries(p.pid for p in projects)
+    return with_etag(make_response(render_template('home.html', all_projects=projects, reaction_summaries=reaction_summaries,
+                                                   next_cursor=next_cursor, limit=limit)), etag)
+
+@main_bp.route("/trending")
+def trending():
+    cursor = request.args.get('cursor')
+    limit = request.args.get('limit', trending_service.TRENDING_DEFAULT_LIMIT, type=int)
+
+    try:
+        projects, next_cursor = trending_service.get_trending_projects(cursor, limit)
+    except ValueError as e:
+        print(f'Error loading trending projects: {e}', flush=True)
+        return render_template('something_went_wrong.html')
+
+    reaction_summaries = reaction_service.get_reaction_summaries(p.pid for p in projects)
+    return render_template('trending.html', projects=projects, reaction_summaries=reaction_summaries,
+                           next_cursor=next_cursor, limit=limit)
+
+@main_bp.route("/search")
+def search():
+    query = request.args.get('q', '').strip()
+    page = max(1, request.args.get('page', 1, type=int))
+
+    projects, has_more = search_service.search_projects(query, page)
+    reaction_summaries = reaction_service.get_reaction_summaries(p.pid for p in projects)
+    return render_template('search.html', query=query, page=page, has_more=has_more,
+                           projects=projects, reaction_summaries=reaction_summaries)
 
 @main_bp.route("/about")
 def about():
@@ -26,19 +67,22 @@ def profile_creation():
 
 @main_bp.route("/my_projects")
 def my_projects():
-    uid = session.get('current_uid')
-    if not uid:
+    user = controller.get_current_user()
+    if not user:
         flash("Please log in first.", 'warning')
         return redirect(url_for('main.login'))
     else:
-        user = User.query.get(uid)
+        before = request.args.get('before', type=int)
+        limit = request.args.get('limit', project_service.DASHBOARD_DEFAULT_LIMIT, type=int)
+        projects, next_before = project_service.get_dashboard(user.uid, before, limit)
 
-        if not user:
-            flash("Please log in first.", 'warning')
-            return redirect(url_for('main.login'))
-        print(f'Joined Projects: {user.joined_projects}', flush=True)
+        etag = page_etag('my_projects', before, limit, [tuple(p) for p in projects])
+        cached = not_modified(etag)
+        if cached:
+            return cached
 
-        return render_template('my_projects.html',my_projects=user.owned_projects,joined_projects=user.joined_projects)
+        return with_etag(make_response(render_template('my_projects.html', projects=projects,
+                                                       next_before=next_before, limit=limit)), etag)
 
 @main_bp.route("/submit_profile_creation", methods=['POST'])
 def submit_profile_creation():
@@ -55,14 +99,13 @@ def submit_profile_creation():
 
 @main_bp.route("/profile")
 def profile():
-    curr_uid = session.get('current_uid')
-    user = User.query.filter_by(uid=curr_uid).first()
+    user = controller.get_current_user()
 
-    if not curr_uid or not user:
+    if not user:
         flash("Please log in first.", 'warning')
         return redirect(url_for('main.login'))
 
-    return render_template('profile.html', friends_list=user_service.get_friends_list(curr_uid),username=user.username)
+    return render_template('profile.html', friends_list=user_service.get_friends_list(user.uid),username=user.username)
 
 @main_bp.route("/login", methods=['GET', 'POST'])
 def login():
@@ -81,32 +124,31 @@ def project(pid):
         flash("Please log in first.", 'warning')
         return redirect(url_for('main.login'))
 
-    project = None
+    # Only pages the viewer may see are cacheable; everyone else gets redirected below
+    etag = None
+    validator = project_service.get_project_validator(pid, uid)
+    if validator and validator.role not in (None, 'PETITION'):
+        etag = page_etag('project', validator.pid, validator.version, validator.role)
+        cached = not_modified(etag)
+        if cached:
+            return cached
+
+    page = None
     try:
-        project = project_service.get_project_with_related_data(pid) 
+        page = project_service.get_project_page(pid, uid, project=validator)
     except Exception as e:
         print(f'Error grabing project: {e}', flush=True)
         return render_template('something_went_wrong.html')
 
-    member_uids = [pm.member.uid for pm in project.members]
-    member_roles = [pm.role for pm in project.members]
-    member_dict = dict(zip(member_uids, member_roles))
-    is_owner = uid == project.owner.uid
-    is_member = uid in member_uids
-    has_joined = is_member and member_dict[uid] != 'PETITION'
-    can_view = is_owner or (is_member and has_joined) 
-
-    if not is_member:
+    if not page.is_member:
         flash('You are not part of this project, send a petition and wait for approval to view.', 'warning')
         return redirect(url_for('main.home'))
-    elif not has_joined:
+    elif not page.has_joined:
         flash('Your petition is pending, wait for approval to view.', 'warning')
         return redirect(url_for('main.my_projects'))
 
-
-    selected_project = Project.query.filter_by(pid=pid).first()
-    
-    return render_template('project.html',project=selected_project, is_owner=is_owner)
+    response = make_response(render_template('project.html', page=page))
+    return with_etag(response, etag) if etag else response
 
 @main_bp.route('/project/<pid>/edit')
 def edit_project(pid):
@@ -116,19 +158,18 @@ def edit_project(pid):
         flash("Please log in first.", 'warning')
         return redirect(url_for('main.login'))
 
-    project = None
+    if not access_service.is_owner(pid, uid):
+        flash("You are not the owner of that project!", 'error')
+        return redirect(url_for('main.my_projects'))
+
+    page = None
     try:
-        project = project_service.get_project_with_related_data(pid) 
+        page = project_service.get_project_page(pid, uid)
     except Exception as e:
         print(f'Error grabing project: {e}', flush=True)
         return render_template('something_went_wrong.html')
 
-    is_owner = uid == project.owner.uid
-    if not is_owner:
-        flash("You are not the owner of that project!", 'error')
-        return redirect(url_for('main.my_projects'))
-
-    return render_template('project_edit.html', project=project)
+    return render_template('project_edit.html', page=page)
 
 @main_bp.route("/create_project")
 def create_project():
@@ -156,37 +197,45 @@ def submit_update_password():
 
 @main_bp.route("/addmember", methods=['POST'])
 def add_member():
-    pid = request.form.get('pid')
-    uid = request.form.get('uid')
+    pid = request.form.get('pid', type=int)
+    uid = request.form.get('uid', type=int)
     role = request.form.get('role')
 
     if not pid:
         flash("Please log in first.", 'warning')
         return redirect(url_for('main.login'))
 
+    if not access_service.is_owner(pid, session.get('current_uid')):
+        flash("You are not the owner of that project!", 'error')
+        return redirect(url_for('main.my_projects'))
+
     if pid and uid and role:
-        selected_project = Project.query.filter_by(pid=pid).first()
         project_service.update_project_member(pid, uid, role)
-        return render_template('project.html', project=selected_project)
+        page = project_service.get_project_page(pid, session.get('current_uid'))
+        return render_template('project.html', page=page)
     else:
-        print(f'Error adding member: {e}', flush=True)
+        print('Error adding member: missing pid, uid or role', flush=True)
         return render_template('something_went_wrong.html')
 
 @main_bp.route("/remove_member", methods=['POST'])
 def remove_member():
-    pid = request.form.get('pid')
-    uid = request.form.get('uid')
+    pid = request.form.get('pid', type=int)
+    uid = request.form.get('uid', type=int)
 
     if not pid:
         flash("Please log in first.", 'warning')
         return redirect(url_for('main.login'))
 
+    if not access_service.is_owner(pid, session.get('current_uid')):
+        flash("You are not the owner of that project!", 'error')
+        return redirect(url_for('main.my_projects'))
+
     if pid and uid:
-        selected_project = Project.query.filter_by(pid=pid).first()
         controller.handle_remove_member(pid,uid)
-        return render_template('project_edit.html', project=selected_project)
+        page = project_service.get_project_page(pid, session.get('current_uid'))
+        return render_template('project_edit.html', page=page)
     else:
-        print(f'Error removing member: {e}', flush=True)
+        print('Error removing member: missing pid or uid', flush=True)
         return render_template('something_went_wrong.html')
 
 @main_bp.route("/project_application/<pid>", methods=['GET', 'POST'])
@@ -203,31 +252,31 @@ def project_application(pid):
         return redirect(url_for('main.login'))
 
 
-    project = None
+    role = access_service.get_role(pid, uid)
+    if role == 'PETITION':
+        flash('Your petition is pending, wait for approval to view.', 'warning')
+        return redirect(url_for('main.my_projects'))
+
+    page = None
     try:
-        project = project_service.get_project_with_related_data(pid) 
+        if role is not None:
+            page = project_service.get_project_page(pid, uid)
+        else:
+            project_service.get_project_details(pid)
     except Exception as e:
         print(f'Error grabing project: {e}', flush=True)
         return render_template('something_went_wrong.html')
 
-    if project is None:
-        return render_template('something_went_wrong.html')
+    if page:
+        return render_template('project.html', page=page)
 
-    member_uids = [pm.member.uid for pm in project.members]
-    member_roles = [pm.role for pm in project.members]
-    member_dict = dict(zip(member_uids, member_roles))
-    is_owner = uid == project.owner.uid
-    is_member = uid in member_uids
-    has_joined = is_member and member_dict[uid] != 'PETITION'
-    can_view = is_owner or (is_member and has_joined) 
-
-    if can_view:
-        return render_template('project.html', project=project, is_owner=is_owner)
-    elif is_member:
-        flash('Your petition is pending, wait for approval to view.', 'warning')
+    try:
+        project_service.add_project_member(pid, uid, role="PETITION")
+    except ValueError:
+        # The cached role was stale: another worker (or a double submit) added them first
+        access_service.invalidate(pid, uid)
+        flash('You have already applied to this project.', 'warning')
         return redirect(url_for('main.my_projects'))
-    
-    project_service.add_project_member(pid, uid, role="PETITION")
 
     flash('Petetion for project submitted!', 'success')
     return redirect(url_for('main.my_projects'))
@@ -244,6 +293,10 @@ def process_project_edit():
         flash('Edits not committed.', 'warning')
         return redirect(url_for('main.project', pid=pid))
 
+    if not access_service.is_owner(pid, session.get('current_uid')):
+        flash("You are not the owner of that project!", 'error')
+        return redirect(url_for('main.my_projects'))
+
     project_service.update_project(pid, name, description, status)
     flash('Project information updated.', 'success')
     return redirect(url_for('main.project', pid=pid))
@@ -4,3 +4,5 @@
 from . import user_service
 from . import project_service
 from . import reaction_service
+from . import friend_graph_service
+from . import bulk_service
@@ -0,0 +1,44 @@
+# Project access decisions: a user's role on a project.
+#
+# Each process keeps an LRU of (pid, uid) -> role ('' when the user isn't a
+# member), so a permission check is a dict lookup for active users and one
+# primary-key read on project_members otherwise, whatever the member count.
+# project_service calls invalidate() after every membership write commits;
+# other workers see the change within the TTL.
+
+from extensions import db
+from models.project import ProjectMember
+from services.cache import LRUCache
+
+# Configured by create_app
+access_cache = LRUCache(maxsize=50000, ttl=60)
+
+# Roles that may see a project; PETITION is a pending request to join
+VIEWING_ROLES = ('OWNER', 'EDITOR', 'VIEWER')
+
+def invalidate(pid: int, uid: int):
+    access_cache.delete((int(pid), int(uid)))
+
+def get_role(pid: int, uid: int):
+    """Returns uid's ProjectMember role on pid, or None if not a member (or not logged in)."""
+    try:
+        key = (int(pid), int(uid))
+    except (TypeError, ValueError):
+        # Not logged in, or a pid that can't name a project
+        return None
+    role = access_cache.get(key)
+    if role is None:
+        role = db.session.execute(
+            db.select(ProjectMember.role).where((ProjectMember.pid == key[0]) & (ProjectMember.uid == key[1]))
+        ).scalar() or ''
+        access_cache.set(key, role)
+    return role or None
+
+def can_view(pid: int, uid: int) -> bool:
+    return get_role(pid, uid) in VIEWING_ROLES
+
+def is_owner(pid: int, uid: int) -> bool:
+    return get_role(pid, uid) == 'OWNER'
+
+def get_access_cache_stats() -> dict:
+    return access_cache.stats()
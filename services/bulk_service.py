@@ -0,0 +1,210 @@
+# Bulk import/export of users, projects, memberships, reactions and friend
+# requests.
+#
+# Records are plain dicts tagged with a `kind`. Imports are streamed: records
+# are buffered per kind and written with executemany in chunked transactions
+# (one commit per `batch_size` records). Exports stream rows out of the
+# database the same way. NDJSON carries every kind in one file; CSV files hold
+# a single kind each.
+
+import csv
+import json
+from datetime import datetime
+from extensions import db
+from models.user import User
+from models.project import Project, ProjectMember
+from models.reaction import Reaction
+from models.friend import FriendRequest, Friendship
+from services import user_service, project_service, friend_graph_service, search_service, trending_service, access_service
+from sqlalchemy import DateTime, Float, Integer
+
+DEFAULT_BATCH_SIZE = 5000
+
+# Dependency order: parents before the rows that reference them
+KINDS = {
+    'user': User.__table__,
+    'project': Project.__table__,
+    'member': ProjectMember.__table__,
+    'reaction': Reaction.__table__,
+    'friend_request': FriendRequest.__table__,
+}
+
+def _coerce(table, record: dict) -> dict:
+    """Keeps only the table's columns and converts CSV/JSON strings to column types."""
+    row = {}
+    for column in table.c:
+        if column.name not in record:
+            continue
+        value = record[column.name]
+        if value == '' or value is None:
+            value = None
+        elif isinstance(column.type, DateTime) and isinstance(value, str):
+            value = datetime.fromisoformat(value)
+        elif isinstance(column.type, Integer):
+            value = int(value)
+        elif isinstance(column.type, Float):
+            value = float(value)
+        if value is not None or column.nullable:
+            row[column.name] = value
+    return row
+
+# --- IMPORT ---
+
+def _by_columns(rows: list):
+    """
+    Groups rows by their set of keys. _coerce drops missing optional fields so
+    column defaults apply, but an executemany needs the same keys in every row.
+    """
+    groups = {}
+    for row in rows:
+        groups.setdefault(frozenset(row), []).append(row)
+    return groups.values()
+
+def _insert(conn, table, rows: list, prefix: str = None):
+    stmt = table.insert()
+    if prefix:
+        stmt = stmt.prefix_with(prefix)
+    for group in _by_columns(rows):
+        conn.execute(stmt, group)
+
+def _insert_projects(conn, rows: list):
+    """Inserts projects, their OWNER memberships and search index entries in the same transaction."""
+    table = KINDS['project']
+    for group in _by_columns(rows):
+        if 'pid' in group[0]:
+            conn.execute(table.insert(), group)
+            continue
+        result = conn.execute(table.insert().returning(table.c.pid, sort_by_parameter_order=True), group)
+        for row, pid in zip(group, result.scalars()):
+            row['pid'] = pid
+
+    conn.execute(
+        KINDS['member'].insert().prefix_with('OR IGNORE'),
+        [{'pid': row['pid'], 'uid': row['owner_uid'], 'role': 'OWNER'} for row in rows],
+    )
+    search_service.index_projects(rows, conn)
+
+def _insert_friend_requests(conn, rows: list):
+    """Inserts friend requests and the adjacency rows for accepted ones."""
+    _insert(conn, KINDS['friend_request'], rows)
+    accepted = [row for row in rows if row.get('status') == 'ACCEPTED']
+    if accepted:
+        conn.execute(
+            Friendship.__table__.insert().prefix_with('OR IGNORE'),
+            [{'uid': a, 'friend_uid': b}
+             for row in accepted
+             for a, b in ((row['requestor_uid'], row['recipient_uid']), (row['recipient_uid'], row['requestor_uid']))],
+        )
+
+def _bump_versions(conn, pids: set):
+    """
+    Bumps Project.version for projects that gained imported members or
+    reactions, so cached cards and ETags built from the version go stale.
+    """
+    pids = sorted(pids)
+    table = KINDS['project']
+    for i in range(0, len(pids), 500):
+        conn.execute(table.update().where(table.c.pid.in_(pids[i:i + 500])).values(version=table.c.version + 1))
+
+def _flush(buffers: dict, counts: dict):
+    conn = db.session.connection()
+    for kind, rows in buffers.items():
+        if not rows:
+            continue
+        if kind == 'project':
+            _insert_projects(conn, rows)
+        elif kind == 'friend_request':
+            _insert_friend_requests(conn, rows)
+        elif kind == 'member':
+            # Owner memberships may already exist from the project rows
+            _insert(conn, KINDS[kind], rows, 'OR IGNORE')
+            _bump_versions(conn, {row['pid'] for row in rows})
+        elif kind == 'reaction':
+            _insert(conn, KINDS[kind], rows)
+            trending_service.rebuild_scores({row['pid'] for row in rows}, conn)
+            _bump_versions(conn, {row['pid'] for row in rows})
+        else:
+            _insert(conn, KINDS[kind], rows)
+        counts[kind] += len(rows)
+        rows.clear()
+    db.session.commit()
+
+def import_records(records, batch_size: int = DEFAULT_BATCH_SIZE) -> dict:
+    """
+    Imports an iterable of {'kind': ..., <column>: ...} dicts and returns the
+    number of rows written per kind. Each batch is one transaction; an error
+    rolls back only the batch being written.
+    """
+    buffers = {kind: [] for kind in KINDS}
+    counts = {kind: 0 for kind in KINDS}
+    pending = 0
+
+    try:
+        for record in records:
+            kind = record.get('kind')
+            if kind not in KINDS:
+                raise ValueError(f"Unknown record kind: {kind!r}")
+            buffers[kind].append(_coerce(KINDS[kind], record))
+            pending += 1
+            if pending >= batch_size:
+                _flush(buffers, counts)
+                pending = 0
+        _flush(buffers, counts)
+    except Exception:
+        db.session.rollback()
+        raise
+    finally:
+        # Imported rows bypass the service writes that normally invalidate these
+        user_service.identity_cache.clear()
+        friend_graph_service.adjacency_cache.clear()
+        project_service.available_cache.clear()
+        access_service.access_cache.clear()
+
+    return counts
+
+def read_ndjson(lines):
+    """Yields records from NDJSON lines, skipping blanks."""
+    for line in lines:
+        if line.strip():
+            yield json.loads(line)
+
+def read_csv(lines, kind: str):
+    """Yields records of a single kind from CSV lines with a header row."""
+    for row in csv.DictReader(lines):
+        row['kind'] = kind
+        yield row
+
+# --- EXPORT ---
+
+def _serialize(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+def export_records(kinds=None, batch_size: int = DEFAULT_BATCH_SIZE):
+    """Streams every row of the given kinds (default: all) as tagged dicts."""
+    for kind in (kinds or KINDS):
+        table = KINDS[kind]
+        result = db.session.execute(
+            db.select(table).order_by(*table.primary_key.columns),
+            execution_options={'yield_per': batch_size},
+        )
+        for partition in result.mappings().partitions():
+            for row in partition:
+                record = {'kind': kind}
+                record.update((key, _serialize(value)) for key, value in row.items())
+                yield record
+
+def write_ndjson(records, fp) -> int:
+    count = 0
+    for record in records:
+        fp.write(json.dumps(record) + '\n')
+        count += 1
+    return count
+
+def write_csv(records, fp, kind: str) -> int:
+    writer = csv.DictWriter(fp, fieldnames=[column.name for column in KINDS[kind].c], extrasaction='ignore')
+    writer.writeheader()
+    count = 0
+    for record in records:
+        writer.writerow(record)
+        count += 1
+    return count
@@ -0,0 +1,210 @@
+# In-process publish/subscribe for live page updates.
+#
+# Services publish small events after their transaction commits, on topics
+# such as 'project:<pid>' and 'user:<uid>'; the event stream endpoints
+# subscribe to them. Every event gets an increasing id and the last few per
+# topic are kept, so a reconnecting client can resume from Last-Event-ID.
+#
+# History is kept only for topics that have subscribers or were published to
+# within the resume window (EVENT_HISTORY_SECONDS); the rest is dropped so a
+# worker doesn't keep a deque for every project and user it ever saw.
+#
+# The bus lives in one process: with several gunicorn workers, a stream only
+# sees events published by its own worker.
+
+import itertools
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+
+DEFAULT_BUFFER_SIZE = 256
+DEFAULT_HISTORY_SIZE = 128
+DEFAULT_HISTORY_SECONDS = 300.0
+
+
+def project_topic(pid) -> str:
+    return f'project:{int(pid)}'
+
+
+def user_topic(uid) -> str:
+    return f'user:{int(uid)}'
+
+
+@dataclass(frozen=True)
+class Event:
+    id: int
+    topic: str
+    type: str
+    data: dict
+    published_at: float = field(default=0.0, compare=False)  # time.monotonic()
+
+
+@dataclass(eq=False)
+class Subscription:
+    """
+    One stream's view of a topic. Events queue up to `buffer_size`; if the
+    client can't keep up the oldest are dropped and `lagged` is set, telling
+    the stream to ask the client to reload instead of showing a partial state.
+    """
+    topic: str
+    buffer_size: int
+    events: deque = field(init=False)
+    lagged: bool = False
+    closed: bool = False
+    _ready: threading.Condition = field(init=False, default_factory=threading.Condition)
+
+    def __post_init__(self):
+        self.events = deque(maxlen=self.buffer_size)
+
+    def _push(self, event: Event):
+        with self._ready:
+            if len(self.events) == self.buffer_size:
+                self.lagged = True
+            self.events.append(event)
+            self._ready.notify()
+
+    def get(self, timeout: float) -> list:
+        """Waits up to `timeout` seconds and returns the queued events (possibly none)."""
+        with self._ready:
+            if not self.events and not self.closed:
+                self._ready.wait(timeout)
+            events = list(self.events)
+            self.events.clear()
+            return events
+
+    def close(self):
+        with self._ready:
+            self.closed = True
+            self._ready.notify()
+
+
+class EventBus:
+    def __init__(self, buffer_size: int = DEFAULT_BUFFER_SIZE, history_size: int = DEFAULT_HISTORY_SIZE,
+                 history_seconds: float = DEFAULT_HISTORY_SECONDS):
+        self.buffer_size = buffer_size
+        self.history_size = history_size
+        self.history_seconds = history_seconds
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._subscribers = {}
+        # Least recently published topic first, for _prune()
+        self._history = OrderedDict()
+        self._evicted = {}
+        # Newest event id whose topic history was pruned
+        self._pruned_through = 0
+        self._published = 0
+        self._dropped = 0
+
+    def configure(self, buffer_size: int = None, history_size: int = None, history_seconds: float = None):
+        with self._lock:
+            if buffer_size is not None:
+                self.buffer_size = buffer_size
+            if history_seconds is not None:
+                self.history_seconds = history_seconds
+            if history_size is not None:
+                self.history_size = history_size
+                self._history = OrderedDict(
+                    (topic, deque(events, maxlen=history_size)) for topic, events in self._history.items()
+                )
+                self._evicted.clear()
+
+    def _prune(self, cutoff: float):
+        """
+        Drops the history of topics with no subscribers and nothing published
+        since `cutoff`. Topics are in publish order, so this stops at the first
+        recent one; subscribed topics are kept and moved to the back.
+        """
+        for _ in range(len(self._history)):
+            topic, history = next(iter(self._history.items()))
+            if history[-1].published_at >= cutoff:
+                break
+            if topic in self._subscribers:
+                self._history.move_to_end(topic)
+                continue
+            del self._history[topic]
+            self._evicted.pop(topic, None)
+            self._pruned_through = max(self._pruned_through, history[-1].id)
+
+    def publish(self, topic: str, event_type: str, data: dict) -> Event:
+        with self._lock:
+            event = Event(next(self._ids), topic, event_type, data, time.monotonic())
+            history = self._history.get(topic)
+            if history is None:
+                history = self._history[topic] = deque(maxlen=self.history_size)
+            else:
+                self._history.move_to_end(topic)
+            if len(history) == history.maxlen:
+                self._evicted[topic] = history[0].id
+            history.append(event)
+            subscribers = list(self._subscribers.get(topic, ()))
+            self._published += 1
+            self._prune(event.published_at - self.history_seconds)
+
+        for subscription in subscribers:
+            if not subscription.lagged:
+                subscription._push(event)
+                if subscription.lagged:
+                    with self._lock:
+                        self._dropped += 1
+        return event
+
+    def subscribe(self, topic: str, last_event_id: int = None) -> Subscription:
+        """
+        Subscribes to `topic`. With `last_event_id`, events published after it
+        are replayed first; if some have already left the history (or the
+        topic's history was pruned after it) the subscription starts out lagged.
+        """
+        subscription = Subscription(topic, self.buffer_size)
+        with self._lock:
+            self._subscribers.setdefault(topic, set()).add(subscription)
+            if last_event_id is not None:
+                if self._evicted.get(topic, 0) > last_event_id:
+                    subscription.lagged = True
+                elif topic not in self._history and self._pruned_through > last_event_id:
+                    # Can't tell whether this topic's pruned events came after it
+                    subscription.lagged = True
+                for event in self._history.get(topic, ()):
+                    if event.id > last_event_id:
+                        subscription._push(event)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        subscription.close()
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.topic)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.topic]
+
+    def clear(self):
+        with self._lock:
+            for subscribers in self._subscribers.values():
+                for subscription in subscribers:
+                    subscription.close()
+            self._subscribers.clear()
+            self._history.clear()
+            self._evicted.clear()
+            self._pruned_through = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'topics': len(self._subscribers),
+                'history_topics': len(self._history),
+                'subscribers': sum(len(s) for s in self._subscribers.values()),
+                'published': self._published,
+                'dropped': self._dropped,
+            }
+
+
+bus = EventBus()
+
+
+def publish(topic: str, event_type: str, **data) -> Event:
+    return bus.publish(topic, event_type, data)
+
+
+def get_stats() -> dict:
+    return bus.stats()
@@ -0,0 +1,76 @@
+# Friendship graph backed by the symmetric `friendships` adjacency table.
+#
+# Each process keeps an LRU of uid -> frozenset(friend uids), so repeated
+# friend/mutual-friend checks for active users are set operations in memory.
+# accept_friend_request (user_service) maintains both the table and the cache.
+
+from extensions import db
+from models.friend import Friendship
+from services.cache import LRUCache
+from sqlalchemy import func
+
+# Configured by create_app
+adjacency_cache = LRUCache(maxsize=10000, ttl=300)
+
+# --- WRITE OPERATIONS ---
+
+def add_friendship(uid: int, friend_uid: int):
+    """Stages both directions of a friendship; the caller commits."""
+    for a, b in ((uid, friend_uid), (friend_uid, uid)):
+        if not db.session.get(Friendship, (a, b)):
+            db.session.add(Friendship(uid=a, friend_uid=b))
+
+def invalidate(*uids: int):
+    adjacency_cache.delete(*uids)
+
+# --- READ OPERATIONS ---
+
+def get_friend_uids(uid: int) -> frozenset:
+    """Returns the set of a user's friends' uids."""
+    friends = adjacency_cache.get(uid)
+    if friends is None:
+        friends = frozenset(db.session.execute(
+            db.select(Friendship.friend_uid).where(Friendship.uid == uid)
+        ).scalars())
+        adjacency_cache.set(uid, friends)
+    return friends
+
+def are_friends(uid: int, other_uid: int) -> bool:
+    """Checks a single friendship: a set lookup if cached, else one primary-key read."""
+    friends = adjacency_cache.get(uid)
+    if friends is not None:
+        return other_uid in friends
+    return db.session.get(Friendship, (uid, other_uid)) is not None
+
+def get_mutual_friend_uids(uid: int, other_uid: int) -> frozenset:
+    """Returns the uids of users who are friends with both users."""
+    return get_friend_uids(uid) & get_friend_uids(other_uid)
+
+def suggest_friends(uid: int, limit: int = 10) -> list:
+    """
+    Friend-of-friend suggestions as (uid, mutual_friend_count) pairs, most
+    mutual friends first. Excludes the user and their existing friends; both
+    the exclusion (a primary-key probe per candidate) and the limit run in
+    SQL, so only `limit` rows come back however many friends-of-friends there are.
+    """
+    mine = db.aliased(Friendship)
+    theirs = db.aliased(Friendship)
+    existing = db.aliased(Friendship)
+    mutual = func.count().label('mutual')
+
+    rows = db.session.execute(
+        db.select(theirs.friend_uid, mutual)
+        .join(mine, mine.friend_uid == theirs.uid)
+        .where(
+            mine.uid == uid,
+            theirs.friend_uid != uid,
+            ~db.select(existing.uid).where(existing.uid == uid, existing.friend_uid == theirs.friend_uid).exists(),
+        )
+        .group_by(theirs.friend_uid)
+        .order_by(mutual.desc(), theirs.friend_uid)
+        .limit(limit)
+    ).all()
+    return [(row.friend_uid, row.mutual) for row in rows]
+
+def get_adjacency_cache_stats() -> dict:
+    return adjacency_cache.stats()
@@ -0,0 +1,115 @@
+# Password hashing, offloaded to a bounded process pool.
+#
+# Hashing is deliberately slow CPU work. Running it on request threads lets a
+# burst of logins occupy every worker thread (and, through the GIL, starve the
+# rest of the process). Here hashes are computed in a separate process pool
+# with a hard cap on outstanding jobs: when the cap is reached callers get
+# HashingPoolFull immediately, which the app turns into a 503.
+#
+# If a pool process dies (OOM kill, crash) the executor is broken for good,
+# so it is replaced and the job retried once on the new pool; a job that
+# breaks that one too is hashed inline rather than failing the login.
+
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from werkzeug.security import generate_password_hash, check_password_hash
+
+logger = logging.getLogger('communal_grounds.passwords')
+
+DEFAULT_METHOD = 'scrypt:32768:8:1'
+
+class HashingPoolFull(Exception):
+    """Raised when too many hashing jobs are already queued or running."""
+
+_settings = {'method': DEFAULT_METHOD, 'workers': 2, 'queue_limit': 32, 'timeout': 10.0}
+# The configured method as werkzeug writes it into hashes; see _stored_method()
+_stored_prefix = None
+# Jobs queued or running, across configure() calls
+_in_flight = 0
+_in_flight_lock = threading.Lock()
+_pool = None
+_pool_lock = threading.Lock()
+
+def configure(method: str = DEFAULT_METHOD, workers: int = 2, queue_limit: int = 32, timeout: float = 10.0):
+    """
+    Sets the work factor (a werkzeug method string such as 'scrypt:32768:8:1'),
+    pool size (0 hashes inline on the calling thread), the maximum number of
+    queued + running jobs, and how long a caller waits for a result.
+    """
+    global _pool, _stored_prefix
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False)
+            _pool = None
+        _settings.update(method=method, workers=workers, queue_limit=queue_limit, timeout=timeout)
+        _stored_prefix = None
+
+def _get_pool() -> ProcessPoolExecutor:
+    # Created lazily so each (forked) server worker gets its own pool. 'spawn'
+    # avoids forking a process that already has threads running.
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=_settings['workers'],
+                                        mp_context=multiprocessing.get_context('spawn'))
+        return _pool
+
+def _discard_pool(pool: ProcessPoolExecutor):
+    # Only the first caller to see a broken pool replaces it
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False)
+
+def _run(func, *args):
+    global _in_flight
+    with _in_flight_lock:
+        if _in_flight >= _settings['queue_limit']:
+            raise HashingPoolFull("Password hashing queue is full.")
+        _in_flight += 1
+    try:
+        if _settings['workers'] <= 0:
+            return func(*args)
+        for _ in range(2):
+            pool = _get_pool()
+            try:
+                return pool.submit(func, *args).result(timeout=_settings['timeout'])
+            except FutureTimeout:
+                raise HashingPoolFull("Password hashing timed out.")
+            except BrokenProcessPool:
+                logger.warning('Password hashing pool broke; starting a new one')
+                _discard_pool(pool)
+        return func(*args)
+    finally:
+        with _in_flight_lock:
+            _in_flight -= 1
+
+# --- HASHING OPERATIONS ---
+
+def hash_password(password: str) -> str:
+    """Hashes a password with the configured method."""
+    return _run(generate_password_hash, password, _settings['method'])
+
+def verify_password(hashed_password: str, password: str) -> bool:
+    """Checks a password against a stored hash."""
+    return _run(check_password_hash, hashed_password, password)
+
+def _stored_method() -> str:
+    # werkzeug fills in defaults ('scrypt' is stored as 'scrypt:32768:8:1'),
+    # so compare against the prefix of a real hash. Computed once per
+    # configure(), on first use, so startup doesn't pay for a hash.
+    global _stored_prefix
+    if _stored_prefix is None:
+        _stored_prefix = generate_password_hash('', _settings['method']).split('$', 1)[0]
+    return _stored_prefix
+
+def needs_rehash(hashed_password: str) -> bool:
+    """True if the stored hash was made with different parameters than the configured method."""
+    return hashed_password.split('$', 1)[0] != _stored_method()
+
+def get_stats() -> dict:
+    return dict(_settings, in_flight=_in_flight)
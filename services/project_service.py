@@ -1,14 +1,52 @@
 # Nicholas J Uhlhorn
 # November 2025
 
+import base64
+import json
+from dataclasses import dataclass
 from extensions import db
 from models.project import Project, ProjectMember
-from sqlalchemy.orm import selectinload
+from models.reaction import Reaction
+from models.user import User
+from services import reaction_service, user_service, event_bus, search_service, access_service
+from services.cache import LRUCache
+import fragment_cache
+from sqlalchemy import String, func, tuple_, type_coerce
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import aliased, selectinload
+
+FEED_DEFAULT_LIMIT = 20
+FEED_MAX_LIMIT = 100
+DASHBOARD_DEFAULT_LIMIT = 20
+DASHBOARD_MAX_LIMIT = 100
+
+# uid -> {(cursor, limit): page} of projects the user hasn't joined; configured by create_app.
+# Membership writes drop the user's entry; other changes show up within the TTL.
+available_cache = LRUCache(maxsize=4096, ttl=30)
+AVAILABLE_PAGES_PER_USER = 16
 
 # --- PROJECT CRUD ---
 
+def bump_project_version(pid: int):
+    """Stages a version increment for a project; the caller commits."""
+    db.session.execute(db.update(Project).where(Project.pid == pid).values(version=Project.version + 1))
+
+def _project_changed(pid: int):
+    """Post-commit hook for writes that changed how a project renders."""
+    fragment_cache.invalidate_project(pid)
+
+def _member_changed(pid: int, uid: int, role: str, previous: str):
+    """Post-commit hook for membership writes; `role` is None once removed."""
+    _project_changed(pid)
+    available_cache.delete(uid)
+    access_service.invalidate(pid, uid)
+    user = user_service.get_user_record(uid)
+    event_bus.publish(event_bus.project_topic(pid), 'member', pid=int(pid), uid=int(uid),
+                      username=user.username if user else None, role=role, previous=previous)
+    event_bus.publish(event_bus.user_topic(uid), 'membership', pid=int(pid), role=role, previous=previous)
+
 def create_new_project(owner_uid: int, name: str, description: str = None, status = 0.0) -> Project:
-    """Creates a new project and sets the owner."""
+    """Creates a new project and its OWNER membership in a single transaction."""
     project = Project(
         owner_uid=owner_uid,
         name=name,
@@ -16,13 +54,20 @@ def create_new_project(owner_uid: int, name: str, description: str = None, statu
         visibility='PUBLISHED',
         status=status,
     )
-    db.session.add(project)
-    db.session.commit()
+    try:
+        db.session.add(project)
+        db.session.flush()  # assigns project.pid without committing
 
-    owner_member = ProjectMember(pid=project.pid, uid=owner_uid, role='OWNER')
-    db.session.add(owner_member)
-    db.session.commit() 
+        owner_member = ProjectMember(pid=project.pid, uid=owner_uid, role='OWNER')
+        db.session.add(owner_member)
+        search_service.index_project(project.pid, name, description)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
 
+    available_cache.delete(owner_uid)
+    access_service.invalidate(project.pid, owner_uid)
     return project
 
 def get_project_details(pid: int) -> Project:
@@ -37,6 +82,39 @@ def get_all_published_projects() -> list[Project]:
     return db.session.execute(db.select(Project).where(Project.visibility == 'PUBLISHED')).scalars().all()
 
 
+def get_owned_projects(uid: int) -> list[Project]:
+    """Retrieves the projects a user owns."""
+    return db.session.execute(db.select(Project).where(Project.owner_uid == uid)).scalars().all()
+
+def get_joined_projects(uid: int) -> list[Project]:
+    """Retrieves every project a user has a membership row in (any role)."""
+    return db.session.execute(
+        db.select(Project)
+        .join(ProjectMember, ProjectMember.pid == Project.pid)
+        .where(ProjectMember.uid == uid)
+    ).scalars().all()
+
+def get_project_validator(pid: int, viewer_uid: int = None):
+    """
+    Returns the project's columns plus `role`, the viewer's membership role
+    (None if not a member), in one query; None if the project doesn't exist.
+    Enough to answer a conditional request, and reusable by get_project_page.
+    """
+    return db.session.execute(
+        db.select(*_page_columns, ProjectMember.role)
+        .outerjoin(ProjectMember, (ProjectMember.pid == Project.pid) & (ProjectMember.uid == viewer_uid))
+        .where(Project.pid == pid)
+    ).one_or_none()
+
+def get_membership_versions(uid: int) -> list:
+    """Returns (pid, version, role) for every project a user is a member of."""
+    return [tuple(row) for row in db.session.execute(
+        db.select(ProjectMember.pid, Project.version, ProjectMember.role)
+        .join(Project, Project.pid == ProjectMember.pid)
+        .where(ProjectMember.uid == uid)
+        .order_by(ProjectMember.pid)
+    )]
+
 def get_project_with_related_data(pid: int) -> Project:
     """
     Retrieves a project and eagerly loads (joins) its members and owner data 
@@ -55,57 +133,282 @@ def get_project_with_related_data(pid: int) -> Project:
         raise ValueError(f"Project with ID {pid} not found.")
     return project
 
-# --- MEMBERSHIP MANAGEMENT ---
+# --- PROJECT PAGE ---
+
+@dataclass
+class ProjectPage:
+    """Everything the project pages render, loaded by get_project_page."""
+    project: object          # row: pid, name, description, status, visibility, owner_uid
+    members: list            # rows: uid, username, role
+    reaction_counts: dict    # {reaction_type: count}
+    viewer_uid: int = None
+    viewer_role: str = None  # the viewer's ProjectMember role, None if not a member
+
+    @property
+    def is_owner(self) -> bool:
+        return self.viewer_uid is not None and self.viewer_uid == self.project.owner_uid
+
+    @property
+    def is_member(self) -> bool:
+        return self.viewer_role is not None
+
+    @property
+    def has_joined(self) -> bool:
+        return self.is_member and self.viewer_role != 'PETITION'
+
+    @property
+    def can_view(self) -> bool:
+        return self.is_owner or self.has_joined
+
+_page_columns = (
+    Project.pid,
+    Project.name,
+    Project.description,
+    Project.status,
+    Project.visibility,
+    Project.owner_uid,
+    Project.version,
+)
 
-def add_project_member(pid: int, uid: int, role: str = 'VIEWER') -> ProjectMember:
-    """Adds a user to a project with a specified role."""
-    # Check if a user and project exists (implicitly done by FK constraints, but good practice)
-    # Check for duplicates
-    existing_member = db.session.execute(
-        db.select(ProjectMember).where(
-            (ProjectMember.pid == pid) & (ProjectMember.uid == uid)
+def get_project_members(pid: int) -> list:
+    """Returns (uid, username, role) rows for every member of a project, ordered by uid."""
+    return db.session.execute(
+        db.select(ProjectMember.uid, User.username, ProjectMember.role)
+        .join(User, User.uid == ProjectMember.uid)
+        .where(ProjectMember.pid == pid)
+        .order_by(ProjectMember.uid)
+    ).all()
+
+def get_project_page(pid: int, viewer_uid: int = None, project=None) -> ProjectPage:
+    """
+    Loads a project, its members (with usernames and roles), its reaction counts
+    and the viewer's access in three queries, regardless of the member count.
+    `project` may be a row already loaded by get_project_validator.
+    """
+    if project is None:
+        project = db.session.execute(db.select(*_page_columns).where(Project.pid == pid)).one_or_none()
+
+    if not project:
+        raise ValueError(f"Project with ID {pid} not found.")
+
+    members = get_project_members(project.pid)
+
+    viewer_role = next((m.role for m in members if m.uid == viewer_uid), None)
+
+    return ProjectPage(
+        project=project,
+        members=members,
+        reaction_counts=reaction_service.get_reaction_summary(project.pid),
+        viewer_uid=viewer_uid,
+        viewer_role=viewer_role,
+    )
+
+# --- PROJECT FEED ---
+
+# created_at is compared as the raw stored text so the cursor matches rows
+# written by the server default (no microseconds) and by Python alike.
+_feed_created_key = type_coerce(Project.created_at, String)
+
+def encode_feed_cursor(created_key: str, pid: int) -> str:
+    """Encodes a (created_at, pid) keyset position as an opaque URL-safe token."""
+    raw = json.dumps([created_key, pid]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+def decode_feed_cursor(cursor: str) -> tuple:
+    """Decodes a token made by encode_feed_cursor, raising ValueError if malformed."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_key, pid = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return str(created_key), int(pid)
+    except Exception:
+        raise ValueError("Invalid feed cursor.")
+
+def _published_feed_query():
+    return (
+        db.select(
+            Project.pid,
+            Project.name,
+            Project.description,
+            Project.status,
+            Project.version,
+            Project.created_at,
+            _feed_created_key.label('created_key'),
         )
-    ).scalar_one_or_none()
+        .where(Project.visibility == 'PUBLISHED')
+        .order_by(_feed_created_key.desc(), Project.pid.desc())
+    )
+
+def _feed_page(query, cursor: str, limit: int):
+    """Runs a feed query from the keyset position in `cursor`; returns (rows, next_cursor)."""
+    query = query.limit(limit + 1)
+    if cursor:
+        query = query.where(tuple_(_feed_created_key, Project.pid) < decode_feed_cursor(cursor))
+
+    rows = db.session.execute(query).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_feed_cursor(last.created_key, last.pid)
+
+    return rows, next_cursor
 
-    if existing_member:
+def get_published_project_feed(cursor: str = None, limit: int = FEED_DEFAULT_LIMIT):
+    """
+    Returns one page of PUBLISHED projects, newest first, and the cursor for the
+    next page (None on the last page). Uses a keyset on (created_at, pid) so each
+    page costs the same no matter how deep into the feed it is, and only selects
+    the columns a project card renders.
+    """
+    limit = max(1, min(int(limit), FEED_MAX_LIMIT))
+    return _feed_page(_published_feed_query(), cursor, limit)
+
+def get_available_projects(uid: int, cursor: str = None, limit: int = FEED_DEFAULT_LIMIT):
+    """
+    Like get_published_project_feed, but without the projects `uid` is a member
+    of (in any role, including PETITION). The exclusion is a NOT EXISTS probe
+    on the project_members primary key for each feed row, so the cost doesn't
+    depend on how many projects the user has joined. Pages are cached per user.
+    """
+    limit = max(1, min(int(limit), FEED_MAX_LIMIT))
+    key = (cursor, limit)
+    pages = available_cache.get(uid)
+    if pages is not None and key in pages:
+        return pages[key]
+
+    is_member = db.select(ProjectMember.pid).where((ProjectMember.pid == Project.pid) & (ProjectMember.uid == uid))
+    page = _feed_page(_published_feed_query().where(~is_member.exists()), cursor, limit)
+
+    if pages is None or len(pages) >= AVAILABLE_PAGES_PER_USER:
+        pages = {}
+        available_cache.set(uid, pages)
+    pages[key] = page
+    return page
+
+def get_available_cache_stats() -> dict:
+    return available_cache.stats()
+
+# --- DASHBOARD ---
+
+def get_dashboard(uid: int, before: int = None, limit: int = DASHBOARD_DEFAULT_LIMIT):
+    """
+    Returns one page of the projects a user owns or is a member of (any role,
+    including pending petitions), highest pid first, and the pid to pass as
+    `before` for the next page (None on the last page). Rows carry the card
+    columns plus `role`, `member_count` (joined members) and `reaction_count`.
+
+    One query: it walks ix_project_members_uid_pid from `before` and counts
+    members and reactions for the page's rows only, so a page costs the same
+    for a user in 5 projects and a user in 5,000.
+    """
+    limit = max(1, min(int(limit), DASHBOARD_MAX_LIMIT))
+    others = aliased(ProjectMember)
+    member_count = (
+        db.select(func.count())
+        .where((others.pid == ProjectMember.pid) & (others.role != 'PETITION'))
+        .scalar_subquery()
+    )
+    reaction_count = db.select(func.count()).where(Reaction.pid == ProjectMember.pid).scalar_subquery()
+
+    query = (
+        db.select(
+            Project.pid,
+            Project.name,
+            Project.description,
+            Project.status,
+            Project.visibility,
+            Project.version,
+            ProjectMember.role,
+            member_count.label('member_count'),
+            reaction_count.label('reaction_count'),
+        )
+        .join(Project, Project.pid == ProjectMember.pid)
+        .where(ProjectMember.uid == uid)
+        .order_by(ProjectMember.pid.desc())
+        .limit(limit + 1)
+    )
+    if before is not None:
+        query = query.where(ProjectMember.pid < before)
+
+    rows = db.session.execute(query).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, rows[-1].pid
+    return rows, None
+
+# --- MEMBERSHIP MANAGEMENT ---
+
+_member_columns = (ProjectMember.pid, ProjectMember.uid, ProjectMember.role)
+
+def _insert_member(pid: int, uid: int, role: str):
+    """
+    INSERT ... ON CONFLICT DO NOTHING: returns the new (pid, uid, role) row, or
+    None if the user is already a member. Takes the write lock either way.
+    """
+    stmt = sqlite_insert(ProjectMember).values(pid=pid, uid=uid, role=role)
+    return db.session.execute(
+        stmt.on_conflict_do_nothing(index_elements=[ProjectMember.pid, ProjectMember.uid]).returning(*_member_columns)
+    ).one_or_none()
+
+def add_project_member(pid: int, uid: int, role: str = 'VIEWER'):
+    """Adds a user to a project with a specified role; returns the (pid, uid, role) row."""
+    # Form values arrive as strings; the caches these writes invalidate are keyed by int
+    pid, uid = int(pid), int(uid)
+    member = _insert_member(pid, uid, role)
+    if member is None:
+        db.session.rollback()
         raise ValueError("User is already a member of this project.")
 
-    member = ProjectMember(pid=pid, uid=uid, role=role)
-    db.session.add(member)
+    bump_project_version(pid)
     db.session.commit()
+    _member_changed(pid, uid, role, None)
     return member
 
 def remove_project_member(pid: int, uid: int) -> None:
     """Removes a user from a project."""
-    # Check if the membership exists
-    member = db.session.execute(
-        db.select(ProjectMember).where(
-            (ProjectMember.pid == pid) & (ProjectMember.uid == uid)
-        )
-    ).scalar_one_or_none()
+    pid, uid = int(pid), int(uid)
+    removed = db.session.execute(
+        db.delete(ProjectMember).where((ProjectMember.pid == pid) & (ProjectMember.uid == uid))
+        .returning(ProjectMember.role)
+    ).one_or_none()
 
-    if not member:
+    if removed is None:
+        db.session.rollback()
         raise ValueError("User is not a member of this project.")
 
-    db.session.delete(member)
+    bump_project_version(pid)
     db.session.commit()
+    _member_changed(pid, uid, None, removed.role)
 
-def update_project_member(pid: int, uid: int, role: str) -> ProjectMember:
-    """Update a user in a project with a new role, adds user if they are not present on the project already"""
-    existing_member = db.session.execute(
-        db.select(ProjectMember).where(
-            (ProjectMember.pid == pid) & (ProjectMember.uid == uid)
-        )
-    ).scalar_one_or_none()
-
-    if not existing_member:
-        return add_project_member(pid, uid, role)
+def update_project_member(pid: int, uid: int, role: str):
+    """
+    Sets a user's role on a project, adding them if they are not a member yet;
+    returns the (pid, uid, role) row. The insert takes the write lock first,
+    so the previous role read for an existing member can't change before the
+    update commits.
+    """
+    pid, uid = int(pid), int(uid)
+    member = _insert_member(pid, uid, role)
+    if member is not None:
+        previous = None
+    else:
+        existing = db.session.execute(
+            db.select(*_member_columns).where((ProjectMember.pid == pid) & (ProjectMember.uid == uid))
+        ).one()
+        if existing.role == role:
+            db.session.rollback()  # unchanged; releases the write lock
+            return existing
+        previous = existing.role
+        member = db.session.execute(
+            db.update(ProjectMember).where((ProjectMember.pid == pid) & (ProjectMember.uid == uid))
+            .values(role=role).returning(*_member_columns)
+        ).one()
 
-    existing_member.role = role
+    bump_project_version(pid)
     db.session.commit()
-    return existing_member
-
-    project_service.update_project(pid, name, description, status)
+    _member_changed(pid, uid, role, previous)
+    return member
 
 def update_project(pid: int, name: str, description: str, status: float):
     existing_project = db.session.execute(
@@ -117,8 +420,28 @@ def update_project(pid: int, name: str, description: str, status: float):
     if not existing_project:
         return None
 
+    if (name, description) != (existing_project.name, existing_project.description):
+        search_service.unindex_project(pid, existing_project.name, existing_project.description)
+        search_service.index_project(pid, name, description)
     existing_project.name = name
     existing_project.description = description 
     existing_project.status = status
+    existing_project.version = Project.version + 1
     db.session.commit()
+    _project_changed(pid)
     return existing_project
+
+def change_project_description(pid: int, new_description: str) -> Project:
+    """Updates a project's description"""
+    project = db.session.get(Project, pid)
+
+    if not project:
+        raise ValueError("Project not found")
+
+    search_service.unindex_project(pid, project.name, project.description)
+    search_service.index_project(pid, project.name, new_description)
+    project.description = new_description
+    project.version = Project.version + 1
+    db.session.commit()
+    _project_changed(pid)
+    return project
@@ -1,9 +1,13 @@
 # Nicholas J Uhlhorn
 # November 2025
 
+from functools import partial
 from extensions import db
 from models.reaction import Reaction
+from services import project_service, event_bus, trending_service
+from services.write_queue import WriteQueue
 from sqlalchemy import func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
 # --- READ/CALCULATION OPERATIONS ---
 
@@ -30,35 +34,156 @@ def get_total_reactions(pid: int) -> int:
     
     return count
 
+def get_reaction_summaries(pids) -> dict:
+    """
+    Returns {pid: {reaction_type: count}} for a batch of projects using a single
+    grouped query. Projects without reactions map to an empty dict.
+    """
+    pids = list(pids)
+    summaries = {pid: {} for pid in pids}
+    if not pids:
+        return summaries
+
+    rows = db.session.execute(
+        db.select(Reaction.pid, Reaction.type, func.count(Reaction.rid))
+        .where(Reaction.pid.in_(pids))
+        .group_by(Reaction.pid, Reaction.type)
+    ).all()
+
+    for pid, reaction_type, count in rows:
+        summaries[pid][reaction_type] = count
+    return summaries
+
+def get_reaction_summary(pid: int) -> dict:
+    """Returns {reaction_type: count} for one project."""
+    return get_reaction_summaries([pid])[pid]
+
+def get_user_reaction_type(pid: int, uid: int):
+    """Returns the type of the user's reaction on a project, or None."""
+    return db.session.execute(
+        db.select(Reaction.type).where((Reaction.pid == pid) & (Reaction.uid == uid))
+    ).scalar_one_or_none()
+
 # --- WRITE OPERATIONS ---
 
-def add_reaction(pid: int, uid: int, reaction_type: str) -> Reaction:
+# Configured by create_app; disabled ('immediate') unless REACTION_WRITE_MODE says otherwise
+write_queue = WriteQueue()
+
+_reaction_columns = (Reaction.rid, Reaction.pid, Reaction.uid, Reaction.type, Reaction.created_at)
+
+def _reaction_changed(pid: int, uid: int, reaction_type: str, previous: str):
     """
-    Adds a reaction or updates an existing one if the user has already reacted.
-    The unique constraint on (pid, uid) prevents duplicates.
+    Post-commit hook. Publishes the change as a delta (`previous` -> `type`,
+    either may be None) so live pages can adjust their counts without a query.
     """
-    
-    # Check if a reaction already exists (due to the unique constraint)
-    existing_reaction = db.session.execute(
-        db.select(Reaction).where(
-            (Reaction.pid == pid) & 
-            (Reaction.uid == uid)
-        )
-    ).scalar_one_or_none()
+    project_service._project_changed(pid)
+    event_bus.publish(event_bus.project_topic(pid), 'reaction', pid=int(pid), uid=int(uid),
+                      type=reaction_type, previous=previous)
+
+def _insert_reaction(pid: int, uid: int, reaction_type: str):
+    """
+    INSERT ... ON CONFLICT DO NOTHING: returns the new row, or None if the user
+    already has a reaction here. Takes the write lock either way.
+    """
+    stmt = sqlite_insert(Reaction).values(pid=pid, uid=uid, type=reaction_type)
+    return db.session.execute(
+        stmt.on_conflict_do_nothing(index_elements=[Reaction.pid, Reaction.uid]).returning(*_reaction_columns)
+    ).one_or_none()
+
+def _apply(stage, *args, pending=None):
+    """
+    Runs a write's stage function: through the write queue when it's enabled,
+    otherwise in the caller's own transaction. `pending` is what the write
+    returns when the queue acknowledges it before it commits ('async').
+    """
+    if write_queue.enabled:
+        return write_queue.submit(stage, args, pending)
+
+    result, hook = stage(*args)
+    if hook is None:
+        db.session.rollback()  # nothing changed; releases the write lock
+    else:
+        db.session.commit()
+        hook()
+    return result
+
+def _stage_add(pid: int, uid: int, reaction_type: str):
+    """
+    Stages add_reaction's writes; returns (row, post-commit hook), the hook
+    None if the user already had this reaction.
+
+    A new reaction is one upsert. For an existing one the upsert has already
+    taken the write lock, so the type read next can't change before the
+    update commits; concurrent calls for the same (pid, uid) queue up instead
+    of racing between a check and an insert.
+    """
+    inserted = _insert_reaction(pid, uid, reaction_type)
+    if inserted:
+        project_service.bump_project_version(pid)
+        trending_service.record_reaction(pid)
+        return inserted, partial(_reaction_changed, pid, uid, reaction_type, None)
+
+    existing = db.session.execute(
+        db.select(*_reaction_columns).where((Reaction.pid == pid) & (Reaction.uid == uid))
+    ).one()
+    if existing.type == reaction_type:
+        return existing, None
+
+    updated = db.session.execute(
+        db.update(Reaction).where((Reaction.pid == pid) & (Reaction.uid == uid))
+        .values(type=reaction_type).returning(*_reaction_columns)
+    ).one()
+    project_service.bump_project_version(pid)
+    return updated, partial(_reaction_changed, pid, uid, reaction_type, existing.type)
+
+def _delete_reaction(*conditions):
+    """Deletes the reaction matching `conditions` and stages its side effects; returns the deleted row or None."""
+    removed = db.session.execute(
+        db.delete(Reaction).where(*conditions).returning(Reaction.pid, Reaction.uid, Reaction.type, Reaction.created_at)
+    ).one_or_none()
+    if removed is None:
+        return None
+    trending_service.unrecord_reaction(removed.pid, removed.created_at)
+    project_service.bump_project_version(removed.pid)
+    return removed
+
+def _stage_remove(pid: int, uid: int):
+    removed = _delete_reaction(Reaction.pid == pid, Reaction.uid == uid)
+    if removed is None:
+        return False, None
+    return True, partial(_reaction_changed, pid, uid, None, removed.type)
+
+def _stage_toggle(pid: int, uid: int, reaction_type: str):
+    # The DELETE ... RETURNING goes first and takes the write lock, so the
+    # add that may follow sees the same state
+    removed = _delete_reaction(Reaction.pid == pid, Reaction.uid == uid, Reaction.type == reaction_type)
+    if removed is not None:
+        return None, partial(_reaction_changed, pid, uid, None, reaction_type)
+    row, hook = _stage_add(pid, uid, reaction_type)
+    return row.type, hook
+
+def add_reaction(pid: int, uid: int, reaction_type: str):
+    """
+    Adds the user's reaction, or changes its type if they already reacted.
+    Returns the resulting (rid, pid, uid, type, created_at) row, or None when
+    the write queue ('async' mode) has only accepted the write.
+    """
+    return _apply(_stage_add, pid, uid, reaction_type)
+
+def remove_reaction(pid: int, uid: int) -> bool:
+    """
+    Removes the user's reaction from a project. Returns False if there was
+    none; always True when the write queue ('async' mode) only accepted it.
+    """
+    return _apply(_stage_remove, pid, uid, pending=True)
+
+def toggle_reaction(pid: int, uid: int, reaction_type: str):
+    """
+    Removes the user's reaction if it is `reaction_type`, otherwise adds it
+    (replacing a reaction of another type). Returns the user's reaction type
+    afterwards, None if it was removed (or only queued, in 'async' mode).
+    """
+    return _apply(_stage_toggle, pid, uid, reaction_type)
 
-    if existing_reaction:
-        # Update the existing reaction type if different
-        if existing_reaction.type != reaction_type:
-            existing_reaction.type = reaction_type
-            db.session.commit()
-        return existing_reaction
-
-    # If no reaction exists, create a new one
-    new_reaction = Reaction(
-        pid=pid,
-        uid=uid,
-        type=reaction_type
-    )
-    db.session.add(new_reaction)
-    db.session.commit()
-    return new_reaction
+def get_write_queue_stats() -> dict:
+    return write_queue.stats()
@@ -0,0 +1,126 @@
+# Full-text project search over an SQLite FTS5 index.
+#
+# projects_fts is an external-content FTS5 table over projects.name and
+# projects.description (created in migrations.py): it stores only the index
+# and reads the text back from projects. It is not kept in sync by triggers;
+# every service that writes a project's name or description calls
+# index_project()/unindex_project() in the same transaction.
+
+import re
+from extensions import db
+from models.project import Project
+from sqlalchemy import column, table, text
+
+SEARCH_DEFAULT_LIMIT = 20
+SEARCH_MAX_LIMIT = 100
+# Deep offsets get slower the further they go; nobody pages this far
+SEARCH_MAX_OFFSET = 1000
+# Ranking costs a bm25 score per match, so a very common term is ranked over
+# its newest matches only; rarer queries are ranked over every match
+SEARCH_MAX_CANDIDATES = 5000
+AUTOCOMPLETE_LIMIT = 10
+MAX_TERMS = 8
+
+projects_fts = table('projects_fts', column('rowid'), column('rank'), column('projects_fts'))
+
+_term = re.compile(r'\w+')
+
+def build_match_query(query: str, column_name: str = None):
+    """
+    Turns free text into an FTS5 MATCH expression, or None if it has no
+    searchable terms. Every term is quoted (so user input can't inject FTS
+    syntax) and prefix-matched, and all terms must match.
+    """
+    terms = _term.findall(query or '')[:MAX_TERMS]
+    if not terms:
+        return None
+    expression = ' '.join(f'"{term}"*' for term in terms)
+    return f'{{{column_name}}} : ({expression})' if column_name else expression
+
+# --- INDEX MAINTENANCE ---
+
+def index_project(pid: int, name: str, description: str, conn=None):
+    """Adds a project's current text to the index. The caller commits."""
+    index_projects([{'pid': pid, 'name': name, 'description': description}], conn)
+
+def index_projects(rows: list, conn=None):
+    """Indexes many {'pid', 'name', 'description'} rows with one executemany."""
+    (conn or db.session).execute(
+        text("INSERT INTO projects_fts (rowid, name, description) VALUES (:pid, :name, :description)"),
+        [{'pid': row['pid'], 'name': row['name'], 'description': row.get('description')} for row in rows],
+    )
+
+def unindex_project(pid: int, name: str, description: str, conn=None):
+    """
+    Removes a project's text from the index. With external content FTS5 needs
+    the exact text that was indexed, so pass the values from before the update.
+    """
+    (conn or db.session).execute(
+        text("INSERT INTO projects_fts (projects_fts, rowid, name, description) "
+             "VALUES ('delete', :pid, :name, :description)"),
+        {'pid': pid, 'name': name, 'description': description},
+    )
+
+def rebuild_index(conn=None):
+    """Re-reads every project into the index."""
+    (conn or db.session).execute(text("INSERT INTO projects_fts (projects_fts) VALUES ('rebuild')"))
+
+# --- QUERIES ---
+
+def search_projects(query: str, page: int = 1, limit: int = SEARCH_DEFAULT_LIMIT):
+    """
+    Returns (rows, has_more) for one page of PUBLISHED projects matching
+    `query`, best match first (bm25, with name matches weighted above
+    description matches) among the newest SEARCH_MAX_CANDIDATES matches.
+    Rows carry the columns a project card renders.
+    """
+    limit = max(1, min(int(limit), SEARCH_MAX_LIMIT))
+    offset = (max(1, int(page)) - 1) * limit
+    match = build_match_query(query)
+    if match is None or offset >= SEARCH_MAX_OFFSET:
+        return [], False
+
+    # FTS5 walks matches in rowid order, so the LIMIT stops it early
+    candidates = (
+        db.select(projects_fts.c.rowid.label('pid'), projects_fts.c.rank.label('rank'))
+        .where(projects_fts.c.projects_fts.match(match))
+        .order_by(projects_fts.c.rowid.desc())
+        .limit(SEARCH_MAX_CANDIDATES)
+        .subquery()
+    )
+    rows = db.session.execute(
+        db.select(
+            Project.pid,
+            Project.name,
+            Project.description,
+            Project.status,
+            Project.version,
+            Project.created_at,
+        )
+        .join(candidates, candidates.c.pid == Project.pid)
+        .where(Project.visibility == 'PUBLISHED')
+        .order_by(candidates.c.rank, Project.pid.desc())
+        .limit(limit + 1)
+        .offset(offset)
+    ).all()
+
+    has_more = len(rows) > limit and offset + limit < SEARCH_MAX_OFFSET
+    return rows[:limit], has_more
+
+def autocomplete_project_names(prefix: str, limit: int = AUTOCOMPLETE_LIMIT) -> list:
+    """
+    Returns (pid, name) rows of PUBLISHED projects whose name matches what's
+    been typed so far, newest first. Unranked, so short prefixes stay cheap.
+    """
+    match = build_match_query(prefix, column_name='name')
+    if match is None:
+        return []
+
+    return db.session.execute(
+        db.select(Project.pid, Project.name)
+        .join(projects_fts, projects_fts.c.rowid == Project.pid)
+        .where(projects_fts.c.projects_fts.match(match))
+        .where(Project.visibility == 'PUBLISHED')
+        .order_by(projects_fts.c.rowid.desc())
+        .limit(max(1, min(int(limit), SEARCH_MAX_LIMIT)))
+    ).all()
@@ -0,0 +1,215 @@
+# Trending projects ranked by a time-decayed reaction count.
+#
+# A reaction added at time t is worth exp(-decay * (now - t)) at time `now`.
+# Each project stores S = ln(sum of exp(decay * (t - EPOCH)) over its
+# reactions) in project_trending.hot_score, so its current heat is
+# exp(S - decay * (now - EPOCH)). Every project decays at the same rate,
+# which makes the order by S the order by current heat at any time: adding a
+# reaction is one log-add-exp update, and the trending feed is an index scan
+# that never needs a periodic recompute.
+#
+# Reactions are also counted per hour in reaction_buckets. Reactions are
+# scored at the start of their hour, so a project's score can always be
+# recomputed from its buckets (on removal, or after a bulk import).
+
+import base64
+import calendar
+import json
+import math
+import time
+from extensions import db
+from models.project import Project
+from models.reaction import Reaction
+from models.trending import ReactionBucket, ProjectTrending
+from sqlalchemy import func, true, tuple_
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+BUCKET_SECONDS = 3600
+# 2025-01-01 UTC; keeps the stored logarithms small
+EPOCH = 1735689600
+DEFAULT_HALF_LIFE_HOURS = 24.0
+TRENDING_DEFAULT_LIMIT = 20
+TRENDING_MAX_LIMIT = 100
+
+# Per-second decay rate; set by configure() from TRENDING_HALF_LIFE_HOURS.
+# Changing it requires rebuild_scores() since stored scores depend on it.
+_decay = math.log(2) / (DEFAULT_HALF_LIFE_HOURS * 3600)
+
+def configure(half_life_hours: float):
+    global _decay
+    _decay = math.log(2) / (half_life_hours * 3600)
+
+# --- SCORE MATH ---
+
+def bucket_for(timestamp: float) -> int:
+    return int(timestamp // BUCKET_SECONDS)
+
+def bucket_for_datetime(value) -> int:
+    """Bucket of a naive UTC datetime (as stored by func.now())."""
+    return bucket_for(calendar.timegm(value.utctimetuple()))
+
+def _bucket_score(bucket: int, count: int = 1) -> float:
+    return math.log(count) + _decay * (bucket * BUCKET_SECONDS - EPOCH)
+
+def _logaddexp(a: float, b: float) -> float:
+    if a < b:
+        a, b = b, a
+    return a + math.log1p(math.exp(b - a))
+
+def score_buckets(buckets) -> float:
+    """Returns the hot score for (bucket, count) pairs, or None if there are no reactions."""
+    terms = [_bucket_score(bucket, count) for bucket, count in buckets if count > 0]
+    if not terms:
+        return None
+    top = max(terms)
+    return top + math.log(sum(math.exp(term - top) for term in terms))
+
+def heat(hot_score: float, now: float = None) -> float:
+    """A stored score's decayed reaction count as of `now`."""
+    now = time.time() if now is None else now
+    return math.exp(hot_score - _decay * (now - EPOCH))
+
+# --- WRITE OPERATIONS ---
+# These stage changes in the caller's transaction. Call them after the
+# transaction already holds SQLite's write lock (i.e. after another write),
+# so the read-modify-write of the score can't interleave with another writer.
+
+def record_reaction(pid: int, now: float = None):
+    """Counts a new reaction in the current hour's bucket and the project's score."""
+    bucket = bucket_for(time.time() if now is None else now)
+    stmt = sqlite_insert(ReactionBucket).values(pid=pid, bucket=bucket, count=1)
+    db.session.execute(stmt.on_conflict_do_update(
+        index_elements=[ReactionBucket.pid, ReactionBucket.bucket],
+        set_={'count': ReactionBucket.count + 1},
+    ))
+
+    trending = db.session.get(ProjectTrending, pid)
+    if trending is None:
+        db.session.add(ProjectTrending(pid=pid, hot_score=_bucket_score(bucket)))
+    else:
+        trending.hot_score = _logaddexp(trending.hot_score, _bucket_score(bucket))
+
+def unrecord_reaction(pid: int, created_at):
+    """Takes a removed reaction out of its bucket and rescores the project from its buckets."""
+    db.session.execute(
+        db.update(ReactionBucket)
+        .where((ReactionBucket.pid == pid) & (ReactionBucket.bucket == bucket_for_datetime(created_at)))
+        .values(count=ReactionBucket.count - 1)
+    )
+    db.session.execute(db.delete(ReactionBucket).where((ReactionBucket.pid == pid) & (ReactionBucket.count <= 0)))
+    _rescore(pid)
+
+def _rescore(pid: int):
+    buckets = db.session.execute(
+        db.select(ReactionBucket.bucket, ReactionBucket.count).where(ReactionBucket.pid == pid)
+    ).all()
+    score = score_buckets(buckets)
+    trending = db.session.get(ProjectTrending, pid)
+    if score is None:
+        if trending is not None:
+            db.session.delete(trending)
+    elif trending is None:
+        db.session.add(ProjectTrending(pid=pid, hot_score=score))
+    else:
+        trending.hot_score = score
+
+def rebuild_scores(pids=None, conn=None):
+    """
+    Recomputes buckets and scores from the reactions table, for `pids` or for
+    every project. Used by the migration, bulk import and after changing the
+    half-life. Runs on `conn` (or the session's connection); the caller commits.
+    """
+    conn = conn or db.session.connection()
+    pids = None if pids is None else list(pids)
+    chunks = [None] if pids is None else [pids[i:i + 500] for i in range(0, len(pids), 500)]
+    bucket = (func.cast(func.strftime('%s', Reaction.created_at), db.Integer) // BUCKET_SECONDS).label('bucket')
+
+    for chunk in chunks:
+        reactions_filter = true() if chunk is None else Reaction.pid.in_(chunk)
+        buckets_filter = true() if chunk is None else ReactionBucket.pid.in_(chunk)
+        trending_filter = true() if chunk is None else ProjectTrending.pid.in_(chunk)
+
+        conn.execute(db.delete(ReactionBucket).where(buckets_filter))
+        conn.execute(db.delete(ProjectTrending).where(trending_filter))
+        conn.execute(ReactionBucket.__table__.insert().from_select(
+            ['pid', 'bucket', 'count'],
+            db.select(Reaction.pid, bucket, func.count()).where(reactions_filter).group_by(Reaction.pid, bucket),
+        ))
+
+        scores = {}
+        for pid, bucket_id, count in conn.execute(
+            db.select(ReactionBucket.pid, ReactionBucket.bucket, ReactionBucket.count).where(buckets_filter)
+        ):
+            scores.setdefault(pid, []).append((bucket_id, count))
+        if scores:
+            conn.execute(ProjectTrending.__table__.insert(),
+                         [{'pid': pid, 'hot_score': score_buckets(buckets)} for pid, buckets in scores.items()])
+
+def prune_buckets(older_than_hours: int) -> int:
+    """
+    Deletes hourly buckets older than the given age and returns how many went.
+    Scores are unaffected; only rescoring after a removal loses the pruned
+    (by then negligible) contributions.
+    """
+    cutoff = bucket_for(time.time()) - older_than_hours
+    result = db.session.execute(db.delete(ReactionBucket).where(ReactionBucket.bucket < cutoff))
+    db.session.commit()
+    return result.rowcount
+
+# --- READ OPERATIONS ---
+
+def _encode_cursor(hot_score: float, pid: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps([hot_score, pid]).encode()).decode().rstrip('=')
+
+def _decode_cursor(cursor: str) -> tuple:
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        hot_score, pid = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return float(hot_score), int(pid)
+    except Exception:
+        raise ValueError("Invalid trending cursor.")
+
+def get_trending_projects(cursor: str = None, limit: int = TRENDING_DEFAULT_LIMIT):
+    """
+    Returns one page of PUBLISHED projects, hottest first, and the cursor for
+    the next page. Walks ix_project_trending_hot from the top, so a page costs
+    a primary-key lookup per row regardless of how many reactions exist.
+    """
+    limit = max(1, min(int(limit), TRENDING_MAX_LIMIT))
+
+    query = (
+        db.select(
+            Project.pid,
+            Project.name,
+            Project.description,
+            Project.status,
+            Project.version,
+            Project.created_at,
+            ProjectTrending.hot_score,
+        )
+        .join(Project, Project.pid == ProjectTrending.pid)
+        # `|| ''` keeps SQLite from starting at ix_projects_feed and sorting
+        # every published project; the page must come off the hot score index
+        .where((Project.visibility + '') == 'PUBLISHED')
+        .order_by(ProjectTrending.hot_score.desc(), ProjectTrending.pid.desc())
+        .limit(limit + 1)
+    )
+    if cursor:
+        query = query.where(tuple_(ProjectTrending.hot_score, ProjectTrending.pid) < _decode_cursor(cursor))
+
+    rows = db.session.execute(query).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_cursor(rows[-1].hot_score, rows[-1].pid)
+    return rows, next_cursor
+
+def get_reaction_timeline(pid: int, hours: int = 48) -> list:
+    """Returns (bucket, count) pairs for a project's last `hours` hours, oldest first."""
+    since = bucket_for(time.time()) - hours
+    return db.session.execute(
+        db.select(ReactionBucket.bucket, ReactionBucket.count)
+        .where((ReactionBucket.pid == pid) & (ReactionBucket.bucket > since))
+        .order_by(ReactionBucket.bucket)
+    ).all()
@@ -1,16 +1,76 @@
 # Nicholas J Uhlhorn
 # November 2025
 
+from collections import namedtuple
 from extensions import db
 from models.user import User
-from models.friend import FriendRequest
-from sqlalchemy import or_
+from models.friend import FriendRequest, Friendship
+from models.project import Project, ProjectMember
+from services.cache import LRUCache
+from services import friend_graph_service, event_bus
+
+# --- IDENTITY CACHE ---
+
+# Detached, read-only copy of a users row; safe to share between requests.
+# Leaves out the password hash: invalidation only reaches this process, and
+# logins must see a password change made in any worker.
+UserRecord = namedtuple('UserRecord', ['uid', 'email', 'username'])
+
+# Keyed by ('uid', uid) and ('username', username). Sized/configured by create_app.
+identity_cache = LRUCache(maxsize=4096, ttl=60)
+
+def _cache_user(user: User) -> UserRecord:
+    record = UserRecord(user.uid, user.email, user.username)
+    identity_cache.set(('uid', record.uid), record)
+    identity_cache.set(('username', record.username), record)
+    return record
+
+def invalidate_user(uid: int, *usernames: str):
+    """Drops a user's cached identity (and any given usernames) from this process."""
+    record = identity_cache.get(('uid', uid))
+    keys = [('uid', uid)] + [('username', name) for name in usernames]
+    if record:
+        keys.append(('username', record.username))
+    identity_cache.delete(*keys)
+
+def get_user_record(uid: int):
+    """Returns the cached UserRecord for uid, loading it on a miss; None if no such user."""
+    if uid is None:
+        return None
+    record = identity_cache.get(('uid', uid))
+    if record:
+        return record
+    user = db.session.get(User, uid)
+    return _cache_user(user) if user else None
+
+def get_user_record_by_username(username: str):
+    """Returns the cached UserRecord for username, loading it on a miss; None if no such user."""
+    record = identity_cache.get(('username', username))
+    if record:
+        return record
+    user = find_user_with_username(username)
+    return _cache_user(user) if user else None
+
+def get_login_credentials(username: str):
+    """
+    Returns (uid, hashed_password) for username, always read from the
+    database rather than the identity cache; None if no such user.
+    """
+    return db.session.execute(
+        db.select(User.uid, User.hashed_password).where(User.username == username)
+    ).one_or_none()
+
+def get_identity_cache_stats() -> dict:
+    return identity_cache.stats()
 
 # --- WRITE OPERATIONS ---
 
 def create_new_user(email: str, username: str, password_hash: str) -> User:
     """Creates a new user, handles validation, and commits to DB."""
-    if User.query.filter_by(email=email).first() or User.query.filter_by(username=username).first():
+    taken = db.session.execute(
+        db.select(User.uid).where((User.email == email) | (User.username == username)).limit(1)
+    ).first()
+    if taken:
         raise ValueError("Email or Username already in use.")
 
     new_user = User(
@@ -20,6 +80,7 @@ def create_new_user(email: str, username: str, password_hash: str) -> User:
     )
     db.session.add(new_user)
     db.session.commit()
+    invalidate_user(new_user.uid, username)
     return new_user
 
 def change_username(uid: int, new_username: str):
@@ -34,9 +95,15 @@ def change_username(uid: int, new_username: str):
     if not user:
         raise ValueError("User not found")
 
+    old_username = user.username
     user.username = new_username
 
+    # Project pages list member usernames; make their cached copies stale
+    member_of = db.select(ProjectMember.pid).where(ProjectMember.uid == uid)
+    db.session.execute(db.update(Project).where(Project.pid.in_(member_of)).values(version=Project.version + 1))
+
     db.session.commit()
+    invalidate_user(uid, old_username, new_username)
     return user
 
 def change_user_password(uid: int, new_hashed_password: str):
@@ -54,6 +121,7 @@ def change_user_password(uid: int, new_hashed_password: str):
     user.hashed_password = new_hashed_password
 
     db.session.commit()
+    invalidate_user(uid)
     return user
 
 # --- READ OPERATIONS ---
@@ -76,41 +144,29 @@ def get_friends_list(uid: int) -> list[User]:
     Returns a list of User objects who have 'ACCEPTED' the friend request
     (either sent by or received by the current user).
     """
-    # 1. Find all accepted friend requests involving the user
-    accepted_requests = db.session.execute(
-        db.select(FriendRequest.requestor_uid, FriendRequest.recipient_uid)
-        .where(
-            (FriendRequest.status == 'ACCEPTED') &
-            ((FriendRequest.requestor_uid == uid) | (FriendRequest.recipient_uid == uid))
-        )
-    ).all()
-
-    # 2. Extract unique friend UIDs
-    friend_uids = set()
-    for req, rec in accepted_requests:
-        # Add the UID that is NOT the current user's UID
-        friend_uids.add(req if req != uid else rec)
-
-    # 3. Retrieve User objects for those UIDs
-    if friend_uids:
-        return db.session.execute(db.select(User).where(User.uid.in_(friend_uids))).scalars().all()
-
-    return []
+    return db.session.execute(
+        db.select(User)
+        .join(Friendship, Friendship.friend_uid == User.uid)
+        .where(Friendship.uid == uid)
+    ).scalars().all()
+
+def _friend_request_changed(notify_uid: int, other_uid: int, status: str):
+    """Post-commit hook: tells `notify_uid` that their request with `other_uid` is now `status`."""
+    other = get_user_record(other_uid)
+    event_bus.publish(event_bus.user_topic(notify_uid), 'friend_request', uid=int(other_uid),
+                      username=other.username if other else None, status=status)
 
 def send_friend_request(requestor_id: int, recipient_id: int) -> FriendRequest:
     """Creates a new 'PENDING' friend request."""
     if requestor_id == recipient_id:
         raise ValueError("Cannot send a friend request to yourself.")
 
-    # Check for existing request (in either direction)
-    existing_request = db.session.execute(
-        db.select(FriendRequest).where(
-            or_(
-                (FriendRequest.requestor_uid == requestor_id) & (FriendRequest.recipient_uid == recipient_id),
-                (FriendRequest.requestor_uid == recipient_id) & (FriendRequest.recipient_uid == requestor_id)
-            )
-        )
-    ).scalar_one_or_none()
+    if friend_graph_service.are_friends(requestor_id, recipient_id):
+        raise ValueError("Friendship already established.")
+
+    # Check for existing request (in either direction); both are primary-key reads
+    existing_request = (db.session.get(FriendRequest, (requestor_id, recipient_id))
+                        or db.session.get(FriendRequest, (recipient_id, requestor_id)))
 
     if existing_request:
         if existing_request.status == 'ACCEPTED':
@@ -124,6 +180,7 @@ def send_friend_request(requestor_id: int, recipient_id: int) -> FriendRequest:
     )
     db.session.add(new_request)
     db.session.commit()
+    _friend_request_changed(recipient_id, requestor_id, 'PENDING')
     return new_request
 
 def accept_friend_request(requestor_id: int, recipient_id: int) -> FriendRequest:
@@ -138,9 +195,28 @@ def accept_friend_request(requestor_id: int, recipient_id: int) -> FriendRequest
         raise ValueError("Pending friend request not found.")
 
     request.status = 'ACCEPTED'
+    friend_graph_service.add_friendship(requestor_id, recipient_id)
     db.session.commit()
+    friend_graph_service.invalidate(requestor_id, recipient_id)
+    _friend_request_changed(requestor_id, recipient_id, 'ACCEPTED')
     return request
 
+def get_friend_requests(uid: int, status: str = 'PENDING') -> tuple[list, list]:
+    """
+    Returns (incoming, outgoing) friend requests for a user with the given status.
+    Each row is (uid, username, status, created_at) for the other user.
+    """
+    def requests(own_column, other_column):
+        return db.session.execute(
+            db.select(other_column.label('uid'), User.username, FriendRequest.status, FriendRequest.created_at)
+            .join(User, User.uid == other_column)
+            .where((own_column == uid) & (FriendRequest.status == status))
+            .order_by(FriendRequest.created_at.desc())
+        ).all()
+
+    return (requests(FriendRequest.recipient_uid, FriendRequest.requestor_uid),
+            requests(FriendRequest.requestor_uid, FriendRequest.recipient_uid))
+
 def find_user_with_username(username: str):
     """
     Finds and returns the User with given username;
@@ -0,0 +1,228 @@
+# Write-behind queue for small, high-volume writes (reactions).
+#
+# Every per-call write is its own transaction: it takes SQLite's write lock
+# and commits (an fsync, unless the profile relaxes synchronous). With the
+# queue enabled, callers hand the write to a background thread instead. The
+# writer collects up to `batch_size` writes, or whatever arrives within
+# `flush_ms` of the first, stages them all in one transaction and commits
+# once, so a burst of N writes costs one commit instead of N.
+#
+# The mode decides when a caller is acknowledged:
+#   'immediate'  no queue; the caller stages and commits its own write
+#   'group'      the caller waits until the batch holding its write commits
+#                and gets the write's result; as durable as 'immediate'
+#   'async'      the caller returns as soon as the write is queued; writes
+#                still queued if the process dies are lost, and the caller's
+#                next read may not see its write yet
+#
+# A write is a stage function that runs inside the batch's transaction and
+# returns (result, hook); `hook`, if not None, is called after the commit.
+# If a write raises, the batch is rolled back and redone with a savepoint
+# per write, so one failing write doesn't sink the others in its batch.
+# Like the rest of the app's in-process state, the queue is per worker
+# process.
+
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from extensions import db
+
+logger = logging.getLogger('communal_grounds.write_queue')
+
+MODES = ('immediate', 'group', 'async')
+# Flush/wait timings kept for the percentiles in stats()
+TIMINGS_KEPT = 1024
+
+class WriteQueueFull(Exception):
+    """Raised when a write can't be queued, or its batch didn't commit, within the timeout."""
+
+_STOP = object()
+
+def _percentile(values, fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(fraction * len(ordered)))], 3)
+
+class WriteQueue:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self.configure(None)
+        atexit.register(self.close)
+
+    def configure(self, app, mode: str = 'immediate', flush_ms: float = 5.0, batch_size: int = 256,
+                  limit: int = 10000, timeout: float = 10.0):
+        """
+        Sets the mode, the batching window and size, the most writes that may
+        wait in the queue, and how long a caller waits to queue a write (and,
+        in 'group' mode, for its commit). Flushes anything already queued.
+        """
+        if mode not in MODES:
+            raise ValueError(f"Unknown write queue mode {mode!r}; expected one of {', '.join(MODES)}.")
+        if mode != 'immediate' and app.config['SQLALCHEMY_DATABASE_URI'] in ('sqlite://', 'sqlite:///:memory:'):
+            # The writer would share the single in-memory connection with request threads
+            raise ValueError("The write queue needs a file-backed database.")
+        self.close()
+        with self._lock:
+            self._app = app
+            self.mode = mode
+            self.flush_ms = flush_ms
+            self.batch_size = batch_size
+            self.limit = limit
+            self.timeout = timeout
+            self._items = queue.Queue(maxsize=limit)
+            self._counts = {'queued': 0, 'written': 0, 'failed': 0, 'rejected': 0, 'batches': 0}
+            self._flush_ms = deque(maxlen=TIMINGS_KEPT)
+            self._wait_ms = deque(maxlen=TIMINGS_KEPT)
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != 'immediate'
+
+    def submit(self, stage, args=(), pending=None):
+        """
+        Queues stage(*args). In 'group' mode returns its result (or raises its
+        error) once committed; in 'async' mode returns `pending` right away.
+        """
+        items = self._ensure_writer()
+        future = Future()
+        try:
+            items.put((stage, args, future, time.perf_counter()), timeout=self.timeout)
+        except queue.Full:
+            with self._lock:
+                self._counts['rejected'] += 1
+            raise WriteQueueFull("Write queue is full.")
+        with self._lock:
+            self._counts['queued'] += 1
+
+        if self.mode == 'async':
+            return pending
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            # Still queued; it will be written, just not acknowledged
+            raise WriteQueueFull("Write queue did not commit in time.")
+
+    def close(self):
+        """Writes out everything queued so far and stops the writer thread."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None and thread.is_alive() and self._pid == os.getpid():
+            self._items.put(_STOP)
+            thread.join()
+
+    def _ensure_writer(self) -> queue.Queue:
+        # Started lazily so each (forked) server worker runs its own writer
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid():
+                if self._pid != os.getpid():
+                    self._items = queue.Queue(maxsize=self.limit)
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, args=(self._items,),
+                                                name='write-queue', daemon=True)
+                self._thread.start()
+            return self._items
+
+    def _run(self, items: queue.Queue):
+        with self._app.app_context():
+            stopping = False
+            while not stopping:
+                first = items.get()
+                if first is _STOP:
+                    break
+                batch = [first]
+                deadline = time.monotonic() + self.flush_ms / 1000
+                while len(batch) < self.batch_size:
+                    try:
+                        item = items.get(timeout=max(0.0, deadline - time.monotonic()))
+                    except queue.Empty:
+                        break
+                    if item is _STOP:
+                        stopping = True
+                        break
+                    batch.append(item)
+                self._flush(batch)
+            db.session.remove()
+
+    def _stage_all(self, batch: list):
+        """Stages the whole batch in one transaction; None (rolled back) if any write raises."""
+        staged = []
+        try:
+            for stage, args, future, queued_at in batch:
+                result, hook = stage(*args)
+                staged.append((future, result, hook, queued_at))
+        except Exception:
+            db.session.rollback()
+            return None
+        return staged
+
+    def _stage_each(self, batch: list):
+        """Stages each write in its own savepoint, failing just the writes that raise."""
+        staged, failed = [], 0
+        for stage, args, future, queued_at in batch:
+            try:
+                with db.session.begin_nested():
+                    result, hook = stage(*args)
+            except Exception as exc:
+                failed += 1
+                logger.warning('Queued write %s%r failed: %s', stage.__name__, args, exc)
+                future.set_exception(exc)
+            else:
+                staged.append((future, result, hook, queued_at))
+        return staged, failed
+
+    def _flush(self, batch: list):
+        started = time.perf_counter()
+        # Savepoints cost a flush and two statements per write, so they're
+        # only used to redo a batch in which something failed
+        staged, failed = self._stage_all(batch), 0
+        if staged is None:
+            staged, failed = self._stage_each(batch)
+
+        try:
+            db.session.commit()
+        except Exception as exc:
+            db.session.rollback()
+            logger.exception('Write queue batch of %d failed to commit', len(staged))
+            for future, _, _, _ in staged:
+                future.set_exception(exc)
+            failed, staged = len(batch), []
+
+        committed = time.perf_counter()
+        for future, result, hook, queued_at in staged:
+            if hook is not None:
+                try:
+                    hook()
+                except Exception:
+                    logger.exception('Post-commit hook for a queued write failed')
+            future.set_result(result)
+
+        with self._lock:
+            self._counts['batches'] += 1
+            self._counts['written'] += len(staged)
+            self._counts['failed'] += failed
+            self._flush_ms.append((committed - started) * 1000)
+            self._wait_ms.extend((committed - queued_at) * 1000 for _, _, _, queued_at in staged)
+
+    def stats(self) -> dict:
+        with self._lock:
+            batches = self._counts['batches']
+            return dict(
+                self._counts,
+                mode=self.mode,
+                depth=self._items.qsize(),
+                limit=self.limit,
+                mean_batch=round((self._counts['written'] + self._counts['failed']) / batches, 2) if batches else 0.0,
+                flush_ms_p50=_percentile(self._flush_ms, 0.5),
+                flush_ms_p99=_percentile(self._flush_ms, 0.99),
+                # Time from submit() to the commit that made the write durable
+                wait_ms_p50=_percentile(self._wait_ms, 0.5),
+                wait_ms_p99=_percentile(self._wait_ms, 0.99),
+            )
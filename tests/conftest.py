@@ -0,0 +1,58 @@
+import pytest
+from contextlib import contextmanager
+from sqlalchemy import event
+from app import create_app
+from extensions import db
+from services import user_service
+import migrations
+
+
+@pytest.fixture
+def app():
+    """An app bound to a fresh in-memory database with the schema applied."""
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': 'sqlite://',
+        # Hash inline with a trivial work factor to keep the suite fast
+        'PASSWORD_HASH_METHOD': 'pbkdf2:sha256:1',
+        'PASSWORD_HASH_WORKERS': 0,
+    })
+    with app.app_context():
+        migrations.upgrade()
+        yield app
+        db.session.remove()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def users(app):
+    """Alice, Bob and Charlie. Password hashes are placeholders; no hashing cost."""
+    return (
+        user_service.create_new_user('alice@test.com', 'Alice', 'alice_hash'),
+        user_service.create_new_user('bob@test.com', 'Bob', 'bob_hash'),
+        user_service.create_new_user('charlie@test.com', 'Charlie', 'charlie_hash'),
+    )
+
+
+def login_as(client, uid: int):
+    with client.session_transaction() as session:
+        session['current_uid'] = uid
+
+
+@contextmanager
+def capture_queries():
+    """Collects (sql, params) for every statement executed inside the block."""
+    queries = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        queries.append((statement, parameters))
+
+    event.listen(db.engine, 'before_cursor_execute', capture)
+    try:
+        yield queries
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', capture)
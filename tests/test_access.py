@@ -0,0 +1,88 @@
+from extensions import db
+from models.project import ProjectMember
+from services import access_service, project_service
+from tests.conftest import login_as, capture_queries
+
+
+def test_roles_are_cached_until_membership_changes(users):
+    alice, bob, charlie = users
+    pid = project_service.create_new_project(alice.uid, 'Project').pid
+    alice_uid, bob_uid, charlie_uid = alice.uid, bob.uid, charlie.uid
+
+    assert access_service.get_role(pid, alice_uid) == 'OWNER'
+    assert access_service.get_role(pid, bob_uid) is None
+    with capture_queries() as queries:
+        assert access_service.is_owner(pid, alice_uid)
+        assert not access_service.can_view(pid, bob_uid)  # a cached "not a member"
+    assert queries == []
+
+    project_service.add_project_member(pid, bob_uid, 'PETITION')
+    assert access_service.get_role(pid, bob_uid) == 'PETITION'
+    assert not access_service.can_view(pid, bob_uid)
+    project_service.update_project_member(pid, bob_uid, 'VIEWER')
+    assert access_service.can_view(pid, bob_uid)
+    project_service.remove_project_member(pid, bob_uid)
+    assert access_service.get_role(pid, bob_uid) is None
+
+    assert access_service.get_role(pid, None) is None
+    assert access_service.get_role('not-a-pid', charlie_uid) is None
+
+
+def test_lookup_cost_does_not_depend_on_member_count(users):
+    alice = users[0]
+    pid = project_service.create_new_project(alice.uid, 'Big').pid
+    db.session.add_all(ProjectMember(pid=pid, uid=1000 + i, role='VIEWER') for i in range(500))
+    db.session.commit()
+
+    with capture_queries() as queries:
+        assert access_service.get_role(pid, 1250) == 'VIEWER'
+    assert len(queries) == 1
+
+
+def test_member_routes_require_owner(client, users):
+    alice, bob, charlie = users
+    pid = project_service.create_new_project(alice.uid, 'Project').pid
+    project_service.add_project_member(pid, bob.uid, 'VIEWER')
+    bob_uid, charlie_uid = bob.uid, charlie.uid
+
+    login_as(client, bob_uid)
+    client.post('/addmember', data={'pid': pid, 'uid': charlie_uid, 'role': 'EDITOR'})
+    client.post('/remove_member', data={'pid': pid, 'uid': alice.uid})
+    client.post('/process_project_edit', data={'pid': pid, 'save-action': 'save', 'name': 'Hijacked',
+                                               'description': '', 'status': 0})
+    assert access_service.get_role(pid, charlie_uid) is None
+    assert project_service.get_project_details(pid).name == 'Project'
+
+    login_as(client, alice.uid)
+    assert client.post('/addmember', data={'pid': pid, 'uid': charlie_uid, 'role': 'EDITOR'}).status_code == 200
+    assert access_service.get_role(pid, charlie_uid) == 'EDITOR'
+
+
+def test_project_application_petitions_once(client, users):
+    alice, bob, _ = users
+    pid = project_service.create_new_project(alice.uid, 'Project').pid
+    bob_uid = bob.uid
+    login_as(client, bob_uid)
+
+    assert client.get(f'/project_application/{pid}').status_code == 302
+    assert access_service.get_role(pid, bob_uid) == 'PETITION'
+    assert client.get(f'/project_application/{pid}').status_code == 302
+
+    project_service.update_project_member(pid, bob_uid, 'VIEWER')
+    assert b'Project' in client.get(f'/project_application/{pid}').data
+    assert b'went wrong' in client.get('/project_application/999').data.lower()
+
+
+def test_project_application_with_a_stale_cached_role(client, users):
+    alice, bob, _ = users
+    pid = project_service.create_new_project(alice.uid, 'Project').pid
+    bob_uid = bob.uid
+    login_as(client, bob_uid)
+    assert access_service.get_role(pid, bob_uid) is None  # cached "not a member"
+
+    # Joined through another worker, which can't invalidate this one's cache
+    db.session.execute(db.insert(ProjectMember).values(pid=pid, uid=bob_uid, role='PETITION'))
+    db.session.commit()
+
+    assert client.get(f'/project_application/{pid}').status_code == 302
+    assert access_service.get_role(pid, bob_uid) == 'PETITION'
@@ -0,0 +1,95 @@
+from services import project_service, reaction_service, user_service
+from tests.conftest import login_as, capture_queries
+
+
+def test_projects_are_paginated(client, users):
+    alice, bob, _ = users
+    pids = [project_service.create_new_project(alice.uid, f'Project {i}').pid for i in range(3)]
+    reaction_service.add_reaction(pids[0], bob.uid, 'LIKE')
+
+    first = client.get('/api/v1/projects?limit=2').get_json()
+    assert [p['pid'] for p in first['projects']] == pids[:0:-1]
+    assert set(first['projects'][0]) == {'pid', 'name', 'description', 'status', 'version', 'created_at', 'reactions'}
+
+    second = client.get(f"/api/v1/projects?limit=2&cursor={first['next_cursor']}").get_json()
+    assert second == {'projects': [second['projects'][0]], 'next_cursor': None}
+    assert second['projects'][0]['reactions'] == {'LIKE': 1}
+
+    assert client.get('/api/v1/projects?cursor=garbage').status_code == 400
+
+
+def test_project_detail_requires_membership(client, users):
+    alice, bob, _ = users
+    pid = project_service.create_new_project(alice.uid, 'Project').pid
+
+    assert client.get(f'/api/v1/projects/{pid}').status_code == 401
+    login_as(client, bob.uid)
+    assert client.get(f'/api/v1/projects/{pid}').status_code == 403
+    assert client.get('/api/v1/projects/999').status_code == 404
+
+    login_as(client, alice.uid)
+    with capture_queries() as queries:
+        body = client.get(f'/api/v1/projects/{pid}').get_json()
+    assert len(queries) <= 3
+    assert body['viewer_role'] == 'OWNER'
+    assert body['members'] == [{'uid': alice.uid, 'username': 'Alice', 'role': 'OWNER'}]
+
+
+def test_owner_manages_members(client, users):
+    alice, bob, charlie = users
+    pid = project_service.create_new_project(alice.uid, 'Project').pid
+    project_service.add_project_member(pid, bob.uid, 'VIEWER')
+
+    login_as(client, bob.uid)
+    assert client.post(f'/api/v1/projects/{pid}/members', json={'uid': charlie.uid}).status_code == 403
+
+    login_as(client, alice.uid)
+    response = client.post(f'/api/v1/projects/{pid}/members', json={'uid': charlie.uid, 'role': 'EDITOR'})
+    assert {'uid': charlie.uid, 'username': 'Charlie', 'role': 'EDITOR'} in response.get_json()['members']
+    assert client.post(f'/api/v1/projects/{pid}/members', json={'uid': alice.uid, 'role': 'VIEWER'}).status_code == 400
+    assert client.post(f'/api/v1/projects/{pid}/members', json={'uid': 'bob'}).status_code == 400
+
+    assert client.delete(f'/api/v1/projects/{pid}/members/{charlie.uid}').status_code == 204
+    assert client.delete(f'/api/v1/projects/{pid}/members/{charlie.uid}').status_code == 404
+    assert client.delete(f'/api/v1/projects/{pid}/members/{alice.uid}').status_code == 400
+
+    # Members may leave on their own
+    login_as(client, bob.uid)
+    assert client.delete(f'/api/v1/projects/{pid}/members/{bob.uid}').status_code == 204
+
+
+def test_reactions_add_change_remove(client, users):
+    alice, bob, _ = users
+    pid = project_service.create_new_project(alice.uid, 'Project').pid
+    login_as(client, bob.uid)
+
+    body = client.put(f'/api/v1/projects/{pid}/reactions', json={'type': 'like'}).get_json()
+    assert body == {'reactions': {'LIKE': 1}, 'mine': 'LIKE'}
+
+    body = client.put(f'/api/v1/projects/{pid}/reactions', json={'type': 'UPVOTE'}).get_json()
+    assert body == {'reactions': {'UPVOTE': 1}, 'mine': 'UPVOTE'}
+
+    body = client.delete(f'/api/v1/projects/{pid}/reactions').get_json()
+    assert body == {'reactions': {}, 'mine': None}
+    assert client.delete(f'/api/v1/projects/{pid}/reactions').status_code == 404
+    assert client.put(f'/api/v1/projects/{pid}/reactions', json={}).status_code == 400
+    assert project_service.get_project_details(pid).version == 4
+
+
+def test_friend_requests(client, users):
+    alice, bob, _ = users
+    login_as(client, alice.uid)
+    assert client.post('/api/v1/friend_requests', json={'uid': bob.uid}).status_code == 201
+    assert client.post('/api/v1/friend_requests', json={'uid': bob.uid}).status_code == 409
+    assert client.post('/api/v1/friend_requests', json={'uid': 999}).status_code == 404
+
+    outgoing = client.get('/api/v1/friend_requests').get_json()['outgoing']
+    assert [(r['uid'], r['username'], r['status']) for r in outgoing] == [(bob.uid, 'Bob', 'PENDING')]
+
+    login_as(client, bob.uid)
+    incoming = client.get('/api/v1/friend_requests').get_json()['incoming']
+    assert [r['uid'] for r in incoming] == [alice.uid]
+
+    assert client.post(f'/api/v1/friend_requests/{alice.uid}/accept').get_json()['status'] == 'ACCEPTED'
+    assert [f.uid for f in user_service.get_friends_list(bob.uid)] == [alice.uid]
+    assert client.get('/api/v1/friend_requests').get_json() == {'incoming': [], 'outgoing': []}
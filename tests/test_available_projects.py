@@ -0,0 +1,92 @@
+from services import access_service, project_service, user_service
+from tests.conftest import capture_queries, login_as
+
+
+def pids(page):
+    return [row.pid for row in page[0]]
+
+
+def test_excludes_projects_the_user_is_part_of(users):
+    alice, bob, charlie = users
+    owned = project_service.create_new_project(bob.uid, 'Owned').pid
+    joined = project_service.create_new_project(alice.uid, 'Joined').pid
+    petitioned = project_service.create_new_project(alice.uid, 'Petitioned').pid
+    other = project_service.create_new_project(charlie.uid, 'Other').pid
+    project_service.add_project_member(joined, bob.uid, 'VIEWER')
+    project_service.add_project_member(petitioned, bob.uid, 'PETITION')
+
+    assert pids(project_service.get_available_projects(bob.uid)) == [other]
+    assert pids(project_service.get_available_projects(alice.uid)) == [other, owned]
+
+
+def test_keyset_pagination(users):
+    alice, bob, _ = users
+    created = [project_service.create_new_project(alice.uid, f'Project {i}').pid for i in range(5)]
+    project_service.add_project_member(created[3], bob.uid, 'VIEWER')
+
+    seen, cursor = [], None
+    while True:
+        rows, cursor = project_service.get_available_projects(bob.uid, cursor, limit=2)
+        seen += [row.pid for row in rows]
+        if not cursor:
+            break
+    assert seen == [created[4], created[2], created[1], created[0]]
+
+
+def test_cached_until_membership_changes(users):
+    alice, bob, _ = users
+    pid = project_service.create_new_project(alice.uid, 'Project').pid
+    project_service.available_cache.clear()
+
+    assert pids(project_service.get_available_projects(bob.uid)) == [pid]
+    with capture_queries() as queries:
+        assert pids(project_service.get_available_projects(bob.uid)) == [pid]
+    assert queries == []
+
+    project_service.add_project_member(pid, bob.uid, 'PETITION')
+    assert pids(project_service.get_available_projects(bob.uid)) == []
+    project_service.remove_project_member(pid, bob.uid)
+    assert pids(project_service.get_available_projects(bob.uid)) == [pid]
+
+    # Creating a project makes the owner a member of it
+    project_service.get_available_projects(alice.uid)
+    project_service.create_new_project(bob.uid, 'Second')
+    assert pids(project_service.get_available_projects(bob.uid)) == [pid]
+
+
+def test_available_projects_api(client, users):
+    alice, bob, _ = users
+    pid = project_service.create_new_project(alice.uid, 'Project').pid
+
+    assert client.get('/api/v1/projects/available').status_code == 401
+    login_as(client, bob.uid)
+    assert [p['pid'] for p in client.get('/api/v1/projects/available').get_json()['projects']] == [pid]
+    login_as(client, alice.uid)
+    assert client.get('/api/v1/projects/available').get_json() == {'projects': [], 'next_cursor': None}
+    assert client.get('/api/v1/projects/available?cursor=bad').status_code == 400
+
+
+def test_member_form_routes_invalidate_the_int_keyed_caches(client, users):
+    alice, bob, _ = users
+    pid = project_service.create_new_project(alice.uid, 'Project').pid
+    bob_uid = bob.uid
+    login_as(client, alice.uid)
+
+    client.post('/addmember', data={'pid': str(pid), 'uid': str(bob_uid), 'role': 'VIEWER'})
+    assert pids(project_service.get_available_projects(bob_uid)) == []
+
+    client.post('/remove_member', data={'pid': str(pid), 'uid': str(bob_uid)})
+    assert pids(project_service.get_available_projects(bob_uid)) == [pid]
+    assert not any(isinstance(key[1], str) for key in user_service.identity_cache._data if key[0] == 'uid')
+
+
+def test_role_update_with_string_ids_invalidates_the_int_keyed_caches(users):
+    alice, bob, _ = users
+    pid = project_service.create_new_project(alice.uid, 'Project').pid
+    bob_uid = bob.uid
+    assert pids(project_service.get_available_projects(bob_uid)) == [pid]
+    assert access_service.get_role(pid, bob_uid) is None
+
+    project_service.update_project_member(str(pid), str(bob_uid), 'EDITOR')
+    assert pids(project_service.get_available_projects(bob_uid)) == []
+    assert access_service.get_role(pid, bob_uid) == 'EDITOR'
@@ -0,0 +1,52 @@
+import inspect
+from benchmarks import datagen, suite
+from extensions import db
+from models.user import User
+from models.reaction import Reaction
+from services import user_service, project_service, reaction_service
+
+
+def test_datagen_is_deterministic_and_sized():
+    first = list(datagen.generate('1k', seed=7))
+    assert first == list(datagen.generate('1k', seed=7))
+    assert first != list(datagen.generate('1k', seed=8))
+
+    counts = datagen.SCALES['1k']
+    kinds = {}
+    for record in first:
+        kinds[record['kind']] = kinds.get(record['kind'], 0) + 1
+    assert kinds == {'user': counts['users'], 'project': counts['projects'], 'member': counts['members'],
+                     'friend_request': counts['friend_requests'], 'reaction': counts['reactions']}
+
+    pairs = [(r['requestor_uid'], r['recipient_uid']) for r in first if r['kind'] == 'friend_request']
+    assert len(set(pairs) | {(b, a) for a, b in pairs}) == 2 * len(pairs)
+
+
+def test_every_service_function_has_a_scenario():
+    for module in (user_service, project_service, reaction_service):
+        public = {name for name, fn in inspect.getmembers(module, inspect.isfunction)
+                  if not name.startswith('_') and fn.__module__ == module.__name__}
+        missing = {name for name in public if f'{module.__name__.split(".")[-1]}.{name}' not in suite.SCENARIOS}
+        assert not missing, missing
+
+
+def test_suite_runs_every_scenario(app):
+    suite.load('1k', datagen.DEFAULT_SEED)
+    assert db.session.execute(db.select(db.func.count()).select_from(User)).scalar() == datagen.SCALES['1k']['users']
+    assert db.session.execute(db.select(db.func.count()).select_from(Reaction)).scalar() == datagen.SCALES['1k']['reactions']
+
+    results = suite.run(app, datagen.SCALES['1k'], repeat=2, rounds=1)
+    assert set(results) == set(suite.SCENARIOS)
+    assert all(stats['n'] == 2 and stats['min_ms'] <= stats['p50_ms'] <= stats['max_ms'] for stats in results.values())
+
+
+def test_compare_flags_changes_beyond_threshold():
+    def stats(p50):
+        return {'p50_ms': p50}
+
+    baseline = {'steady': stats(1.0), 'slower': stats(1.0), 'faster': stats(1.0), 'tiny': stats(0.01), 'gone': stats(1.0)}
+    current = {'steady': stats(1.1), 'slower': stats(1.5), 'faster': stats(0.5), 'tiny': stats(0.04), 'added': stats(1.0)}
+
+    statuses = {name: status for name, _, _, status in suite.compare(current, baseline, threshold=0.25, min_delta_ms=0.05)}
+    assert statuses == {'steady': 'ok', 'slower': 'regression', 'faster': 'improved', 'tiny': 'ok',
+                        'gone': 'missing', 'added': 'new'}
@@ -0,0 +1,99 @@
+import io
+import json
+from cli import seed_sample_data
+from models.user import User
+from models.project import Project, ProjectMember
+from models.reaction import Reaction
+from services import bulk_service, friend_graph_service, project_service
+from app import create_app
+import migrations
+
+
+def test_export_then_import_round_trip(app):
+    seed_sample_data()
+    exported = io.StringIO()
+    bulk_service.write_ndjson(bulk_service.export_records(), exported)
+
+    target = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite://'})
+    with target.app_context():
+        migrations.upgrade()
+        counts = bulk_service.import_records(bulk_service.read_ndjson(io.StringIO(exported.getvalue())), batch_size=2)
+
+        assert counts == {'user': 3, 'project': 2, 'member': 3, 'reaction': 3, 'friend_request': 1}
+        assert User.query.count() == 3
+        assert ProjectMember.query.count() == 3
+        assert Reaction.query.count() == 3
+        alice = User.query.filter_by(username='Alice').first()
+        bob = User.query.filter_by(username='Bob').first()
+        assert friend_graph_service.are_friends(alice.uid, bob.uid)
+
+
+def test_projects_without_pids_get_owner_memberships(app, users):
+    alice = users[0]
+    records = [{'kind': 'project', 'name': f'Imported {i}', 'owner_uid': alice.uid,
+                'visibility': 'PUBLISHED', 'created_at': '2025-11-01T12:00:00'} for i in range(5)]
+
+    bulk_service.import_records(records, batch_size=2)
+
+    projects = Project.query.order_by(Project.pid).all()
+    assert [p.name for p in projects] == [f'Imported {i}' for i in range(5)]
+    assert {(m.pid, m.uid, m.role) for m in ProjectMember.query} == {(p.pid, alice.uid, 'OWNER') for p in projects}
+
+
+def test_records_with_different_optional_fields(app, users):
+    alice = users[0]
+    records = [
+        {'kind': 'project', 'pid': 10, 'name': 'Described', 'description': 'Has one', 'owner_uid': alice.uid},
+        {'kind': 'project', 'pid': 11, 'name': 'Bare', 'owner_uid': alice.uid},
+        {'kind': 'project', 'name': 'No pid', 'description': None, 'owner_uid': alice.uid},
+        {'kind': 'reaction', 'pid': 10, 'uid': alice.uid, 'type': 'LIKE', 'created_at': '2025-11-01T12:00:00'},
+        {'kind': 'reaction', 'pid': 11, 'uid': alice.uid, 'type': 'LIKE'},
+    ]
+
+    counts = bulk_service.import_records(records)
+
+    assert (counts['project'], counts['reaction']) == (3, 2)
+    assert {p.name: p.description for p in Project.query} == {'Described': 'Has one', 'Bare': None, 'No pid': None}
+    assert ProjectMember.query.filter_by(role='OWNER').count() == 3
+
+
+def test_imported_reactions_and_members_bump_project_versions(client, users):
+    alice, bob, _ = users
+    pid = project_service.create_new_project(alice.uid, 'Project').pid
+    etag = client.get('/').headers['ETag']
+    assert b'LIKE' not in client.get('/').data  # card is now cached
+
+    bulk_service.import_records([
+        {'kind': 'reaction', 'pid': pid, 'uid': bob.uid, 'type': 'LIKE'},
+        {'kind': 'member', 'pid': pid, 'uid': bob.uid, 'role': 'VIEWER'},
+    ])
+
+    assert project_service.get_project_details(pid).version == 3
+    response = client.get('/', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert b'LIKE' in response.data
+
+
+def test_csv_import_and_export(app):
+    source = io.StringIO('uid,email,username,hashed_password\n10,x@test.com,Xavier,hash\n11,y@test.com,Yolanda,hash\n')
+    assert bulk_service.import_records(bulk_service.read_csv(source, 'user'))['user'] == 2
+
+    out = io.StringIO()
+    assert bulk_service.write_csv(bulk_service.export_records(['user']), out, 'user') == 2
+    assert out.getvalue().splitlines()[0] == 'uid,email,username,hashed_password,created_at'
+
+
+def test_cli_import_and_export(app, tmp_path):
+    source = tmp_path / 'data.ndjson'
+    source.write_text('\n'.join(json.dumps(r) for r in [
+        {'kind': 'user', 'uid': 1, 'email': 'a@test.com', 'username': 'A', 'hashed_password': 'h'},
+        {'kind': 'project', 'pid': 7, 'name': 'P', 'owner_uid': 1},
+    ]))
+    runner = app.test_cli_runner()
+
+    result = runner.invoke(args=['import-data', str(source)])
+    assert result.exit_code == 0, result.output
+    assert '1 user(s), 1 project(s)' in result.output
+
+    result = runner.invoke(args=['export-data', '--kind', 'member', '-'])
+    assert json.loads(result.stdout.splitlines()[0]) == {'kind': 'member', 'pid': 7, 'uid': 1, 'role': 'OWNER'}
@@ -0,0 +1,111 @@
+from flask import url_for
+from http_cache import _deploy_salt, static_url
+from services import project_service, reaction_service
+from tests.conftest import login_as
+
+
+def revalidate(client, path):
+    """Fetches `path`, then re-requests it with the ETag it was given."""
+    etag = client.get(path).headers['ETag'].strip('"')
+    return etag, client.get(path, headers={'If-None-Match': f'"{etag}"'})
+
+
+def test_home_returns_304_until_a_project_changes(client, users):
+    alice, bob, _ = users
+    pid = project_service.create_new_project(alice.uid, 'Project').pid
+
+    etag, response = revalidate(client, '/')
+    assert response.status_code == 304
+    assert response.data == b''
+
+    reaction_service.add_reaction(pid, bob.uid, 'LIKE')
+    response = client.get('/', headers={'If-None-Match': f'"{etag}"'})
+    assert response.status_code == 200
+    assert response.headers['ETag'].strip('"') != etag
+
+
+def test_project_page_revalidates_on_version(client, users):
+    alice, _, _ = users
+    pid = project_service.create_new_project(alice.uid, 'Project').pid
+    login_as(client, alice.uid)
+
+    etag, response = revalidate(client, f'/project/{pid}')
+    assert response.status_code == 304
+    assert response.headers['Cache-Control'] == 'private, no-cache'
+
+    project_service.update_project(pid, 'Renamed', 'New description', 0.5)
+    response = client.get(f'/project/{pid}', headers={'If-None-Match': f'"{etag}"'})
+    assert response.status_code == 200
+    assert b'Renamed' in response.data
+
+
+def test_etag_differs_per_viewer(client, users):
+    alice, bob, _ = users
+    pid = project_service.create_new_project(alice.uid, 'Project').pid
+    project_service.add_project_member(pid, bob.uid, 'VIEWER')
+
+    login_as(client, alice.uid)
+    etag = client.get(f'/project/{pid}').headers['ETag']
+    login_as(client, bob.uid)
+    response = client.get(f'/project/{pid}', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+
+
+def test_non_members_are_not_cached(client, users):
+    alice, bob, _ = users
+    pid = project_service.create_new_project(alice.uid, 'Project').pid
+    login_as(client, bob.uid)
+
+    response = client.get(f'/project/{pid}')
+    assert response.status_code == 302
+    assert 'ETag' not in response.headers
+
+
+def test_my_projects_revalidates_on_membership(client, users):
+    alice, bob, _ = users
+    pid = project_service.create_new_project(alice.uid, 'Project').pid
+    login_as(client, bob.uid)
+
+    etag, response = revalidate(client, '/my_projects')
+    assert response.status_code == 304
+
+    project_service.add_project_member(pid, bob.uid, 'VIEWER')
+    response = client.get('/my_projects', headers={'If-None-Match': f'"{etag}"'})
+    assert response.status_code == 200
+
+
+def test_pending_flashes_bypass_304(client, users):
+    alice, _, _ = users
+    project_service.create_new_project(alice.uid, 'Project')
+    etag = client.get('/').headers['ETag']
+
+    with client.session_transaction() as session:
+        session['_flashes'] = [('info', 'Hello')]
+    response = client.get('/', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert b'Hello' in response.data
+
+
+def test_versioned_static_files_are_immutable(app, client):
+    with app.test_request_context():
+        url = url_for('static', filename='style.css')
+        versioned = static_url('style.css')
+    assert versioned.startswith(url + '?v=')
+
+    response = client.get(versioned)
+    assert response.status_code == 200
+    assert 'immutable' in response.headers['Cache-Control']
+    assert 'max-age=31536000' in response.headers['Cache-Control']
+
+    response = client.get(url)
+    assert 'immutable' not in response.headers.get('Cache-Control', '')
+
+
+def test_static_only_deploy_changes_page_etags(app, tmp_path):
+    """A CSS-only deploy changes the asset URLs in every page, so cached pages must revalidate."""
+    (tmp_path / 'style.css').write_text('body { color: black; }')
+    app.static_folder = str(tmp_path)
+    salt = _deploy_salt(app)
+
+    (tmp_path / 'style.css').write_text('body { color: navy; }')
+    assert _deploy_salt(app) != salt
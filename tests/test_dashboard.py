@@ -0,0 +1,66 @@
+from extensions import db
+from services import project_service, reaction_service
+from tests.conftest import login_as, capture_queries
+import migrations
+
+
+def test_dashboard_rows_carry_role_and_counts(users):
+    alice, bob, charlie = users
+    owned = project_service.create_new_project(alice.uid, 'Owned', status=0.25).pid
+    joined = project_service.create_new_project(bob.uid, 'Joined').pid
+    petitioned = project_service.create_new_project(charlie.uid, 'Petitioned').pid
+    project_service.add_project_member(owned, bob.uid, 'EDITOR')
+    project_service.add_project_member(owned, charlie.uid, 'PETITION')
+    project_service.add_project_member(joined, alice.uid, 'VIEWER')
+    project_service.add_project_member(petitioned, alice.uid, 'PETITION')
+    reaction_service.add_reaction(owned, bob.uid, 'LIKE')
+    reaction_service.add_reaction(owned, charlie.uid, 'UPVOTE')
+
+    uid = alice.uid
+    with capture_queries() as queries:
+        rows, next_before = project_service.get_dashboard(uid)
+    assert len(queries) == 1
+    assert next_before is None
+    assert [(r.name, r.role, r.member_count, r.reaction_count) for r in rows] == [
+        ('Petitioned', 'PETITION', 1, 0),
+        ('Joined', 'VIEWER', 2, 0),
+        ('Owned', 'OWNER', 2, 2),
+    ]
+    assert rows[-1].status == 0.25
+
+
+def test_dashboard_pages_by_pid(users):
+    alice = users[0]
+    pids = [project_service.create_new_project(alice.uid, f'Project {i}').pid for i in range(5)]
+
+    seen, before = [], None
+    while True:
+        rows, before = project_service.get_dashboard(alice.uid, before, limit=2)
+        seen += [row.pid for row in rows]
+        if before is None:
+            break
+    assert seen == pids[::-1]
+
+
+def test_my_projects_page(client, users):
+    alice, bob, _ = users
+    pid = project_service.create_new_project(alice.uid, 'Shared').pid
+    project_service.create_new_project(alice.uid, 'Second')
+    project_service.add_project_member(pid, bob.uid, 'PETITION')
+
+    login_as(client, bob.uid)
+    assert b'Petition pending' in client.get('/my_projects').data
+
+    # The owner's card for the same project and version must not reuse bob's
+    login_as(client, alice.uid)
+    page = client.get('/my_projects?limit=1').data
+    assert b'Second' in page and b'Shared' not in page and b'More Projects' in page
+    page = client.get(f'/my_projects?limit=1&before={pid + 1}').data
+    assert b'Owner' in page and b'1 member ' in page
+
+
+def test_member_index_replaced(app):
+    indexes = {row[1] for row in db.session.execute(db.text('PRAGMA index_list(project_members)'))}
+    assert 'ix_project_members_uid_pid' in indexes
+    assert 'ix_project_members_uid' not in indexes
+    assert migrations.upgrade() == 0
@@ -0,0 +1,40 @@
+from sqlalchemy import text
+from app import create_app
+from extensions import db
+
+
+def make_app(tmp_path, profile):
+    return create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + str(tmp_path / f'{profile}.db'),
+        'DATABASE_PROFILE': profile,
+    })
+
+
+def pragma(name):
+    return db.session.execute(text(f'PRAGMA {name}')).scalar()
+
+
+def test_tuned_profile_applies_pragmas(tmp_path):
+    with make_app(tmp_path, 'tuned').app_context():
+        assert pragma('journal_mode') == 'wal'
+        assert pragma('synchronous') == 1  # NORMAL
+        assert pragma('busy_timeout') == 5000
+        assert pragma('temp_store') == 2  # MEMORY
+        assert db.engine.pool.size() == 8
+
+
+def test_default_profile_leaves_sqlite_alone(tmp_path):
+    with make_app(tmp_path, 'default').app_context():
+        assert pragma('journal_mode') == 'delete'
+
+
+def test_busy_timeout_override(tmp_path):
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + str(tmp_path / 'gevent.db'),
+        'DB_BUSY_TIMEOUT_MS': 250,
+    })
+    with app.app_context():
+        assert pragma('busy_timeout') == 250
+        assert pragma('journal_mode') == 'wal'
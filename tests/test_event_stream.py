@@ -0,0 +1,156 @@
+import json
+import pytest
+from types import SimpleNamespace
+from services import event_bus, project_service, reaction_service, user_service
+from services.event_bus import EventBus
+from tests.conftest import login_as
+
+
+@pytest.fixture(autouse=True)
+def clear_bus():
+    event_bus.bus.clear()
+    yield
+    event_bus.bus.clear()
+    event_bus.bus.configure(event_bus.DEFAULT_BUFFER_SIZE, event_bus.DEFAULT_HISTORY_SIZE)
+
+
+def parse_stream(data: bytes) -> list:
+    """Returns (id, event, data) for each event in a text/event-stream body."""
+    events = []
+    for block in data.decode().split('\n\n'):
+        fields = dict(line.split(': ', 1) for line in block.splitlines() if not line.startswith(':'))
+        if 'event' in fields:
+            events.append((int(fields['id']) if 'id' in fields else None, fields['event'], json.loads(fields['data'])))
+    return events
+
+
+def test_subscribers_receive_published_events():
+    bus = EventBus()
+    subscription = bus.subscribe('project:1')
+    bus.publish('project:1', 'reaction', {'type': 'LIKE'})
+    bus.publish('project:2', 'reaction', {'type': 'LIKE'})
+
+    events = subscription.get(timeout=0)
+    assert [(e.topic, e.data) for e in events] == [('project:1', {'type': 'LIKE'})]
+    assert subscription.get(timeout=0) == []
+
+    bus.unsubscribe(subscription)
+    assert bus.stats()['subscribers'] == 0
+
+
+def test_idle_topic_history_is_pruned(monkeypatch):
+    clock = [0.0]
+    monkeypatch.setattr(event_bus, 'time', SimpleNamespace(monotonic=lambda: clock[0]))
+    bus = EventBus(history_seconds=60)
+    old = bus.publish('user:1', 'friend_request', {})
+    watched = bus.subscribe('project:1')
+    bus.publish('project:1', 'reaction', {})
+
+    clock[0] = 61
+    bus.publish('user:2', 'friend_request', {})
+
+    # user:1 is idle and unwatched; project:1 is old but has a subscriber
+    assert bus.stats()['history_topics'] == 2
+    assert bus.subscribe('user:1', last_event_id=old.id - 1).lagged
+    assert not bus.subscribe('user:2', last_event_id=0).lagged
+    bus.unsubscribe(watched)
+
+
+def test_resume_replays_missed_events():
+    bus = EventBus(history_size=3)
+    first = bus.publish('user:1', 'friend_request', {})
+    missed = [bus.publish('user:1', 'friend_request', {'n': n}) for n in range(2)]
+
+    subscription = bus.subscribe('user:1', last_event_id=first.id)
+    assert subscription.get(timeout=0) == missed
+    assert not subscription.lagged
+
+    # Once events have left the history, a resume can't be complete
+    for n in range(3):
+        bus.publish('user:1', 'friend_request', {})
+    assert bus.subscribe('user:1', last_event_id=first.id).lagged
+
+
+def test_slow_subscribers_are_marked_lagged():
+    bus = EventBus(buffer_size=2)
+    subscription = bus.subscribe('project:1')
+    for n in range(3):
+        bus.publish('project:1', 'reaction', {'n': n})
+
+    assert subscription.lagged
+    assert bus.stats()['dropped'] == 1
+
+
+def test_services_publish_after_commit(users):
+    alice, bob, _ = users
+    pid = project_service.create_new_project(alice.uid, 'Project').pid
+    project_events = event_bus.bus.subscribe(event_bus.project_topic(pid))
+    bob_events = event_bus.bus.subscribe(event_bus.user_topic(bob.uid))
+    alice_events = event_bus.bus.subscribe(event_bus.user_topic(alice.uid))
+
+    project_service.add_project_member(pid, bob.uid, 'PETITION')
+    project_service.update_project_member(pid, bob.uid, 'VIEWER')
+    reaction_service.add_reaction(pid, bob.uid, 'LIKE')
+    reaction_service.add_reaction(pid, bob.uid, 'UPVOTE')
+    reaction_service.remove_reaction(pid, bob.uid)
+    project_service.remove_project_member(pid, bob.uid)
+    user_service.send_friend_request(alice.uid, bob.uid)
+    user_service.accept_friend_request(alice.uid, bob.uid)
+
+    assert [(e.type, e.data.get('role', e.data.get('type')), e.data['previous']) for e in project_events.get(0)] == [
+        ('member', 'PETITION', None),
+        ('member', 'VIEWER', 'PETITION'),
+        ('reaction', 'LIKE', None),
+        ('reaction', 'UPVOTE', 'LIKE'),
+        ('reaction', None, 'UPVOTE'),
+        ('member', None, 'VIEWER'),
+    ]
+    assert [(e.type, e.data.get('role', e.data.get('status'))) for e in bob_events.get(0)] == [
+        ('membership', 'PETITION'), ('membership', 'VIEWER'), ('membership', None), ('friend_request', 'PENDING'),
+    ]
+    assert [e.data for e in alice_events.get(0)] == [{'uid': bob.uid, 'username': 'Bob', 'status': 'ACCEPTED'}]
+
+
+def test_project_stream_resumes_and_heartbeats(app, client, users):
+    alice, bob, _ = users
+    app.config.update(EVENT_HEARTBEAT_SECONDS=0.02, EVENT_STREAM_MAX_SECONDS=0.1)
+    pid = project_service.create_new_project(alice.uid, 'Project').pid
+    reaction_service.add_reaction(pid, alice.uid, 'LIKE')
+    seen = event_bus.bus.subscribe(event_bus.project_topic(pid), last_event_id=0).get(0)[0].id
+    reaction_service.add_reaction(pid, bob.uid, 'LIKE')
+
+    assert client.get(f'/api/v1/projects/{pid}/events').status_code == 401
+    login_as(client, bob.uid)
+    assert client.get(f'/api/v1/projects/{pid}/events').status_code == 403
+
+    login_as(client, alice.uid)
+    response = client.get(f'/api/v1/projects/{pid}/events', headers={'Last-Event-ID': str(seen)})
+    assert response.mimetype == 'text/event-stream'
+    body = response.data
+    assert b': heartbeat' in body
+    assert [(event, data['uid']) for _, event, data in parse_stream(body)] == [('reaction', bob.uid)]
+    assert event_bus.get_stats()['subscribers'] == 1  # only the subscription made above
+
+
+def test_lagged_stream_sends_reset(app, client, users):
+    alice, _, _ = users
+    app.config.update(EVENT_HEARTBEAT_SECONDS=0.02, EVENT_STREAM_MAX_SECONDS=0.1)
+    event_bus.bus.configure(history_size=2)
+    for _ in range(4):
+        event_bus.publish(event_bus.user_topic(alice.uid), 'membership', pid=1, role='VIEWER', previous=None)
+
+    login_as(client, alice.uid)
+    events = parse_stream(client.get('/api/v1/events?last_event_id=0').data)
+    assert events[-1] == (None, 'reset', {})
+
+
+def test_streams_can_be_turned_off(app, client, users):
+    alice = users[0]
+    pid = project_service.create_new_project(alice.uid, 'Project').pid
+    login_as(client, alice.uid)
+    assert b'EventSource' in client.get(f'/project/{pid}').data
+
+    app.config['EVENT_STREAMS'] = False
+    assert b'EventSource' not in client.get(f'/project/{pid}').data
+    assert client.get(f'/api/v1/projects/{pid}/events').status_code == 204
+    assert client.get('/api/v1/events').status_code == 204
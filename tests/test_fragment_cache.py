@@ -0,0 +1,68 @@
+import fragment_cache
+from services import project_service, reaction_service
+from tests.conftest import login_as
+
+
+def card_renders(monkeypatch):
+    """Counts how many times a card template is actually rendered."""
+    calls = []
+    original = fragment_cache.render_template
+
+    def counting(template, **context):
+        calls.append(template)
+        return original(template, **context)
+
+    monkeypatch.setattr(fragment_cache, 'render_template', counting)
+    return calls
+
+
+def test_home_cards_are_served_from_cache(client, users, monkeypatch):
+    for i in range(3):
+        project_service.create_new_project(users[0].uid, f'Project {i}')
+    renders = card_renders(monkeypatch)
+
+    first = client.get('/').data
+    second = client.get('/').data
+
+    assert first == second
+    assert renders.count('blocks/project_card.html') == 3
+
+
+def test_service_writes_invalidate_cards(client, users, monkeypatch):
+    alice, bob, _ = users
+    pid = project_service.create_new_project(alice.uid, 'Project').pid
+    client.get('/')
+    renders = card_renders(monkeypatch)
+
+    reaction_service.add_reaction(pid, bob.uid, 'LIKE')
+    assert b'LIKE: 1' in client.get('/').data
+
+    project_service.update_project(pid, 'Renamed', 'New description', 0.5)
+    assert b'Renamed' in client.get('/').data
+
+    project_service.add_project_member(pid, bob.uid, 'VIEWER')
+    client.get('/')
+    assert renders.count('blocks/project_card.html') == 3
+
+
+def test_version_bumps_on_writes(users):
+    alice, bob, _ = users
+    project = project_service.create_new_project(alice.uid, 'Project')
+    assert project.version == 1
+
+    reaction_service.add_reaction(project.pid, bob.uid, 'LIKE')
+    reaction_service.add_reaction(project.pid, bob.uid, 'LIKE')  # unchanged, no bump
+    project_service.update_project_member(project.pid, bob.uid, 'VIEWER')
+    project_service.remove_project_member(project.pid, bob.uid)
+    assert project_service.get_project_details(project.pid).version == 4
+
+
+def test_my_projects_cards_use_cache(client, users, monkeypatch):
+    alice = users[0]
+    project_service.create_new_project(alice.uid, 'Mine')
+    login_as(client, alice.uid)
+    renders = card_renders(monkeypatch)
+
+    client.get('/my_projects')
+    client.get('/my_projects')
+    assert renders.count('blocks/my_project_card.html') == 1
@@ -0,0 +1,52 @@
+import pytest
+from services import user_service, friend_graph_service as graph
+from tests.conftest import capture_queries
+
+
+def befriend(a, b):
+    user_service.send_friend_request(a, b)
+    user_service.accept_friend_request(a, b)
+
+
+def make_users(n):
+    return [user_service.create_new_user(f'u{i}@test.com', f'u{i}', 'hash').uid for i in range(n)]
+
+
+def test_accept_maintains_symmetric_adjacency(app):
+    a, b, c = make_users(3)
+    befriend(a, b)
+
+    assert graph.get_friend_uids(a) == {b}
+    assert graph.get_friend_uids(b) == {a}
+    assert graph.are_friends(a, b) and graph.are_friends(b, a)
+    assert not graph.are_friends(a, c)
+
+    # Cached adjacency is refreshed when a new friendship lands
+    befriend(c, a)
+    assert graph.get_friend_uids(a) == {b, c}
+    assert [u.uid for u in user_service.get_friends_list(a)] == [b, c]
+
+
+def test_mutual_friends_and_suggestions(app):
+    me, x, y, z, w = make_users(5)
+    befriend(me, x)
+    befriend(me, y)
+    befriend(x, z)
+    befriend(y, z)
+    befriend(x, w)
+    # x and y are each other's friend-of-friend too, but already my friends
+    befriend(x, y)
+
+    assert graph.get_mutual_friend_uids(me, z) == {x, y}
+    assert graph.suggest_friends(me) == [(z, 2), (w, 1)]
+    with capture_queries() as queries:
+        assert graph.suggest_friends(me, limit=1) == [(z, 2)]
+    assert len(queries) == 1 and 'LIMIT' in queries[0][0]
+
+
+def test_request_to_existing_friend_rejected(app):
+    a, b = make_users(2)
+    befriend(a, b)
+    graph.adjacency_cache.clear()
+    with pytest.raises(ValueError, match='already established'):
+        user_service.send_friend_request(b, a)
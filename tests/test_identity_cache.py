@@ -0,0 +1,59 @@
+from extensions import db
+from models.user import User
+from services import user_service
+from tests.conftest import login_as, capture_queries
+
+
+def test_record_is_cached_by_uid_and_username(users):
+    alice = users[0]
+    user_service.identity_cache.clear()
+
+    with capture_queries() as queries:
+        first = user_service.get_user_record(alice.uid)
+        again = user_service.get_user_record(alice.uid)
+        by_name = user_service.get_user_record_by_username('Alice')
+
+    assert first == again == by_name
+    assert first.username == 'Alice'
+    assert len(queries) == 1
+    assert user_service.get_identity_cache_stats()['hits'] == 2
+
+
+def test_unknown_user_is_not_cached(users):
+    assert user_service.get_user_record_by_username('Nobody') is None
+    created = user_service.create_new_user('nobody@test.com', 'Nobody', 'hash')
+    assert user_service.get_user_record_by_username('Nobody').uid == created.uid
+
+
+def test_writes_invalidate_cached_records(users):
+    alice = users[0]
+    user_service.get_user_record(alice.uid)
+
+    user_service.change_username(alice.uid, 'Alicia')
+    assert user_service.get_user_record(alice.uid).username == 'Alicia'
+    assert user_service.get_user_record_by_username('Alice') is None
+
+
+
+def test_login_reads_credentials_from_the_database(client, users):
+    alice = users[0]
+    user_service.get_user_record(alice.uid)
+    # A write made by another worker: this process's cache isn't invalidated
+    db.session.execute(db.update(User).where(User.uid == alice.uid).values(username='Alicia', hashed_password='new_hash'))
+    db.session.commit()
+
+    assert user_service.get_login_credentials('Alice') is None
+    assert user_service.get_login_credentials('Alicia') == (alice.uid, 'new_hash')
+    assert 'hashed_password' not in user_service.UserRecord._fields
+
+
+def test_routes_reuse_the_cached_user(client, users):
+    alice = users[0]
+    login_as(client, alice.uid)
+    client.get('/profile')
+
+    with capture_queries() as queries:
+        response = client.get('/profile')
+
+    assert b'Alice' in response.data
+    assert not any('FROM users \nWHERE users.uid = ?' in sql for sql, _ in queries)
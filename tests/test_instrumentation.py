@@ -0,0 +1,41 @@
+import json
+import logging
+import pytest
+import instrumentation
+from services import project_service
+
+
+@pytest.fixture(autouse=True)
+def fresh_metrics():
+    instrumentation.reset_metrics()
+
+
+def test_metrics_endpoint_disabled_by_default(client):
+    assert client.get('/_debug/metrics').status_code == 404
+
+
+def test_metrics_endpoint_reports_per_endpoint_histograms(app, client, users):
+    app.config['DEBUG_METRICS_ENDPOINT'] = True
+    project_service.create_new_project(users[0].uid, 'Project')
+
+    client.get('/')
+    client.get('/')
+    metrics = client.get('/_debug/metrics').get_json()
+
+    home = metrics['endpoints']['main.home']
+    assert home['requests'] == 2
+    assert sum(home['statements']['counts']) == 2
+    assert home['statements']['sum'] == 4  # feed + reaction summary, per request
+
+
+def test_requests_over_threshold_are_logged(app, client, users, caplog):
+    app.config['MAX_QUERIES_PER_REQUEST'] = 0
+    project_service.create_new_project(users[0].uid, 'Project')
+
+    with caplog.at_level(logging.WARNING, logger='communal_grounds.sql'):
+        client.get('/')
+
+    record = json.loads(caplog.records[-1].getMessage())
+    assert record['endpoint'] == 'main.home'
+    assert record['statements'] == 2
+    assert record['slowest'][0]['statement'].startswith('SELECT')
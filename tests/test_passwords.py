@@ -0,0 +1,79 @@
+import os
+import pytest
+from concurrent.futures.process import BrokenProcessPool
+from werkzeug.security import generate_password_hash
+from services import password_service, user_service
+
+
+def create_user(password, method='pbkdf2:sha256:1'):
+    return user_service.create_new_user('dana@test.com', 'Dana', generate_password_hash(password, method))
+
+
+def login(client, password):
+    return client.post('/submit_login', data={'username': 'Dana', 'password': password})
+
+
+def test_login_with_correct_and_wrong_password(client):
+    create_user('secret')
+    assert login(client, 'wrong').headers['Location'].endswith('/login')
+    assert login(client, 'secret').headers['Location'].endswith('/my_projects')
+
+
+def test_login_rehashes_outdated_hashes(client):
+    user = create_user('secret', method='pbkdf2:sha256:2')
+    login(client, 'secret')
+
+    stored = user_service.get_login_credentials('Dana').hashed_password
+    assert stored.startswith('pbkdf2:sha256:1$')
+    assert not password_service.needs_rehash(stored)
+    assert login(client, 'secret').headers['Location'].endswith('/my_projects')
+
+
+@pytest.mark.parametrize('method', ['pbkdf2:sha256', 'scrypt'])
+def test_shorthand_method_does_not_rehash_every_login(app, method):
+    password_service.configure(method, workers=0)
+    try:
+        assert not password_service.needs_rehash(generate_password_hash('secret', method))
+        assert password_service.needs_rehash(generate_password_hash('secret', 'pbkdf2:sha256:1'))
+    finally:
+        password_service.configure('pbkdf2:sha256:1', workers=0)
+
+
+def test_full_queue_returns_503(app, client, monkeypatch):
+    create_user('secret')
+    password_service.configure('pbkdf2:sha256:1', workers=0, queue_limit=1)
+    monkeypatch.setattr(password_service, '_in_flight', 1)  # simulate a job already in flight
+
+    response = login(client, 'secret')
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '1'
+    assert password_service.get_stats()['in_flight'] == 1
+
+    monkeypatch.setattr(password_service, '_in_flight', 0)
+    assert login(client, 'secret').status_code == 302
+    assert password_service.get_stats()['in_flight'] == 0
+
+
+def test_process_pool_round_trip(app):
+    password_service.configure('pbkdf2:sha256:1', workers=1)
+    try:
+        hashed = password_service.hash_password('secret')
+        assert password_service.verify_password(hashed, 'secret')
+        assert not password_service.verify_password(hashed, 'wrong')
+    finally:
+        password_service.configure('pbkdf2:sha256:1', workers=0)
+
+
+def test_pool_is_replaced_after_a_worker_dies(app):
+    password_service.configure('pbkdf2:sha256:1', workers=1)
+    try:
+        hashed = password_service.hash_password('secret')
+        broken = password_service._get_pool()
+        with pytest.raises(BrokenProcessPool):
+            broken.submit(os._exit, 1).result()  # a pool process dies
+
+        assert password_service.verify_password(hashed, 'secret')
+        assert password_service._get_pool() is not broken
+        assert password_service.get_stats()['in_flight'] == 0
+    finally:
+        password_service.configure('pbkdf2:sha256:1', workers=0)
@@ -0,0 +1,57 @@
+from services import user_service, project_service, reaction_service
+from tests.conftest import login_as, capture_queries
+
+
+def make_project(owner_uid, n_members):
+    project = project_service.create_new_project(owner_uid, 'Big Project', 'Lots of members')
+    for i in range(n_members):
+        name = f'member{project.pid}_{i}'
+        member = user_service.create_new_user(f'{name}@test.com', name, 'hash')
+        project_service.add_project_member(project.pid, member.uid, 'VIEWER')
+        reaction_service.add_reaction(project.pid, member.uid, 'LIKE')
+    return project.pid
+
+
+def test_project_page_access(users):
+    alice, bob, charlie = users
+    pid = project_service.create_new_project(alice.uid, "Alice's Project").pid
+    project_service.add_project_member(pid, bob.uid, 'PETITION')
+
+    page = project_service.get_project_page(pid, alice.uid)
+    assert page.is_owner and page.can_view
+    assert [(m.username, m.role) for m in page.members] == [('Alice', 'OWNER'), ('Bob', 'PETITION')]
+
+    page = project_service.get_project_page(pid, bob.uid)
+    assert page.is_member and not page.has_joined and not page.can_view
+
+    page = project_service.get_project_page(pid, charlie.uid)
+    assert not page.is_member and not page.can_view
+
+
+def test_project_route_query_count_is_fixed(client, users):
+    alice = users[0]
+    small = make_project(alice.uid, 1)
+    large = make_project(alice.uid, 25)
+    login_as(client, alice.uid)
+
+    counts = []
+    for pid in (small, large):
+        with capture_queries() as queries:
+            response = client.get(f'/project/{pid}')
+        assert response.status_code == 200
+        counts.append(len(queries))
+
+    assert counts[0] == counts[1] <= 3
+    assert f'member{large}_24 - VIEWER'.encode() in response.data
+    assert b'LIKE: 25' in response.data
+
+
+def test_edit_page_requires_owner(client, users):
+    alice, bob, _ = users
+    pid = make_project(alice.uid, 0)
+
+    login_as(client, bob.uid)
+    assert client.get(f'/project/{pid}/edit').status_code == 302
+
+    login_as(client, alice.uid)
+    assert client.get(f'/project/{pid}/edit').status_code == 200
@@ -0,0 +1,77 @@
+# Fails if a service query falls back to a full table scan.
+
+import re
+import pytest
+from extensions import db
+from models.user import User
+from services import user_service, project_service, reaction_service, friend_graph_service, trending_service
+from tests.conftest import capture_queries
+
+# A bare "SCAN <table>" (no "USING ... INDEX") is a full table scan
+FULL_SCAN = re.compile(r'^SCAN (\w+)$')
+
+
+@pytest.fixture
+def captured_queries(app):
+    with capture_queries() as queries:
+        yield queries
+
+
+def full_scans(queries):
+    scans = []
+    with db.engine.connect() as conn:
+        for statement, parameters in queries:
+            if not statement.lstrip().upper().startswith('SELECT'):
+                continue
+            plan = conn.exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, parameters).all()
+            for row in plan:
+                if FULL_SCAN.match(row[-1]):
+                    scans.append((row[-1], statement))
+    return scans
+
+
+@pytest.fixture
+def populated(users):
+    alice, bob, charlie = users
+    project = project_service.create_new_project(alice.uid, "Alice's Project")
+    project_service.add_project_member(project.pid, bob.uid, 'PETITION')
+    reaction_service.add_reaction(project.pid, charlie.uid, 'LIKE')
+    user_service.send_friend_request(alice.uid, bob.uid)
+    user_service.accept_friend_request(alice.uid, bob.uid)
+    db.session.expire_all()
+    return alice, bob, charlie, project.pid
+
+
+def test_service_queries_use_indexes(populated, captured_queries):
+    alice, bob, charlie, pid = populated
+
+    project_service.get_all_published_projects()
+    _, cursor = project_service.get_published_project_feed(limit=1)
+    project_service.get_published_project_feed(cursor, limit=1)
+    project_service.get_available_projects(charlie.uid)
+    project_service.get_project_details(pid)
+    project_service.get_project_with_related_data(pid)
+
+    reaction_service.get_reaction_count_by_type(pid, 'LIKE')
+    reaction_service.get_total_reactions(pid)
+    reaction_service.get_reaction_summaries([pid])
+    _, cursor = trending_service.get_trending_projects(limit=1)
+    project_service.get_dashboard(alice.uid, limit=1)
+    project_service.get_dashboard(alice.uid, before=pid)
+    trending_service.get_reaction_timeline(pid)
+
+    user_service.get_friends_list(alice.uid)
+    friend_graph_service.adjacency_cache.clear()
+    friend_graph_service.are_friends(alice.uid, charlie.uid)
+    friend_graph_service.get_friend_uids(alice.uid)
+    friend_graph_service.suggest_friends(bob.uid)
+    user_service.find_user_with_username('Alice')
+    with pytest.raises(ValueError):
+        user_service.send_friend_request(bob.uid, alice.uid)
+
+    user = db.session.get(User, bob.uid)
+    user.owned_projects
+    user.joined_projects
+
+    assert captured_queries
+    assert full_scans(captured_queries) == []
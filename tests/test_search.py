@@ -0,0 +1,89 @@
+from extensions import db
+from services import project_service, search_service, bulk_service
+from tests.conftest import capture_queries
+
+
+def titles(rows):
+    return [row.name for row in rows]
+
+
+def test_build_match_query_quotes_terms():
+    assert search_service.build_match_query('Community garden!') == '"Community"* "garden"*'
+    assert search_service.build_match_query('name: "OR" NEAR(') == '"name"* "OR"* "NEAR"*'
+    assert search_service.build_match_query('  -- ') is None
+
+
+def test_search_ranks_name_matches_first(users):
+    alice = users[0]
+    project_service.create_new_project(alice.uid, 'Bike repair', 'Fixing bikes for the garden club')
+    project_service.create_new_project(alice.uid, 'Community Garden', 'Growing vegetables together')
+    project_service.create_new_project(alice.uid, 'Book swap', 'Trade novels')
+
+    rows, has_more = search_service.search_projects('garden')
+    assert titles(rows) == ['Community Garden', 'Bike repair']
+    assert not has_more
+    assert titles(search_service.search_projects('gard veg')[0]) == ['Community Garden']
+    assert search_service.search_projects('') == ([], False)
+
+
+def test_search_pages(users):
+    alice = users[0]
+    for i in range(5):
+        project_service.create_new_project(alice.uid, f'Garden {i}', 'Plots')
+
+    first, has_more = search_service.search_projects('garden', page=1, limit=2)
+    assert has_more
+    last, has_more = search_service.search_projects('garden', page=3, limit=2)
+    assert len(last) == 1 and not has_more
+    seen = titles(first) + titles(search_service.search_projects('garden', page=2, limit=2)[0]) + titles(last)
+    assert sorted(seen) == [f'Garden {i}' for i in range(5)]
+
+
+def test_index_follows_updates(users):
+    alice = users[0]
+    pid = project_service.create_new_project(alice.uid, 'Garden', 'Tomatoes').pid
+
+    project_service.update_project(pid, 'Orchard', 'Apples', 0.5)
+    assert search_service.search_projects('garden')[0] == []
+    assert titles(search_service.search_projects('apples')[0]) == ['Orchard']
+
+    project_service.change_project_description(pid, 'Pears')
+    assert search_service.search_projects('apples')[0] == []
+    assert titles(search_service.search_projects('pears')[0]) == ['Orchard']
+
+    # The external-content index must still be consistent with projects
+    db.session.execute(db.text("INSERT INTO projects_fts (projects_fts, rank) VALUES ('integrity-check', 1)"))
+
+
+def test_bulk_import_is_indexed(users):
+    alice = users[0]
+    bulk_service.import_records([
+        {'kind': 'project', 'owner_uid': alice.uid, 'name': 'Imported garden', 'visibility': 'PUBLISHED', 'status': 0},
+        {'kind': 'project', 'owner_uid': alice.uid, 'name': 'Hidden garden', 'visibility': 'DRAFT', 'status': 0},
+    ])
+    assert titles(search_service.search_projects('garden')[0]) == ['Imported garden']
+
+
+def test_autocomplete_matches_name_prefixes(users):
+    alice = users[0]
+    project_service.create_new_project(alice.uid, 'Community Garden', 'Plots')
+    project_service.create_new_project(alice.uid, 'Compost', 'Garden waste')
+
+    assert sorted(titles(search_service.autocomplete_project_names('com'))) == ['Community Garden', 'Compost']
+    assert titles(search_service.autocomplete_project_names('gard')) == ['Community Garden']
+
+    with capture_queries() as queries:
+        search_service.autocomplete_project_names('community ga')
+    assert len(queries) == 1 and 'MATCH' in queries[0][0]
+
+
+def test_search_routes(client, users):
+    alice = users[0]
+    project_service.create_new_project(alice.uid, 'Community Garden', 'Plots')
+
+    assert b'Community Garden' in client.get('/search?q=garden').data
+    assert b'No projects match' in client.get('/search?q=zebra').data
+    assert client.get('/api/v1/projects/search?q=garden').get_json()['projects'][0]['name'] == 'Community Garden'
+    assert client.get('/api/v1/projects/autocomplete?q=comm').get_json() == {
+        'projects': [{'pid': 1, 'name': 'Community Garden'}],
+    }
@@ -0,0 +1,110 @@
+# Service layer tests (formerly the /service_test route)
+
+import pytest
+from services import user_service, project_service, reaction_service
+
+
+def test_create_users(users):
+    alice, bob, charlie = users
+    assert alice.uid and bob.uid and charlie.uid
+    assert len(user_service.get_all_users()) == 3
+
+
+def test_duplicate_username_rejected(users):
+    with pytest.raises(ValueError):
+        user_service.create_new_user('other@test.com', 'Alice', 'hash')
+
+
+def test_create_project_adds_owner_member(users):
+    alice = users[0]
+    project = project_service.create_new_project(alice.uid, "Alice's Project", "This is Alice's project", 0.5)
+
+    assert project_service.get_project_details(project.pid).name == "Alice's Project"
+    assert [(m.uid, m.role) for m in project.members] == [(alice.uid, 'OWNER')]
+
+
+def test_add_member_and_eager_load(users):
+    alice, bob, _ = users
+    project = project_service.create_new_project(alice.uid, "Alice's Project")
+    project_service.add_project_member(project.pid, bob.uid, role='PETITION')
+
+    loaded = project_service.get_project_with_related_data(project.pid)
+    assert sorted(m.member.username for m in loaded.members) == ['Alice', 'Bob']
+
+    with pytest.raises(ValueError):
+        project_service.add_project_member(project.pid, bob.uid)
+
+
+def test_update_and_remove_member(users):
+    alice, bob, _ = users
+    project = project_service.create_new_project(alice.uid, "Alice's Project")
+
+    assert project_service.update_project_member(project.pid, bob.uid, 'PETITION').role == 'PETITION'
+    assert project_service.update_project_member(project.pid, bob.uid, 'VIEWER').role == 'VIEWER'
+
+    project_service.remove_project_member(project.pid, bob.uid)
+    with pytest.raises(ValueError):
+        project_service.remove_project_member(project.pid, bob.uid)
+
+
+def test_reaction_counts(users):
+    alice, bob, charlie = users
+    pid = project_service.create_new_project(alice.uid, "Alice's Project").pid
+
+    reaction_service.add_reaction(pid, alice.uid, 'UPVOTE')
+    reaction_service.add_reaction(pid, bob.uid, 'UPVOTE')
+    reaction_service.add_reaction(pid, charlie.uid, 'LIKE')
+    assert reaction_service.get_reaction_count_by_type(pid, 'UPVOTE') == 2
+    assert reaction_service.get_total_reactions(pid) == 3
+
+    # Reacting again changes the type instead of adding a row
+    reaction_service.add_reaction(pid, alice.uid, 'LIKE')
+    assert reaction_service.get_reaction_count_by_type(pid, 'UPVOTE') == 1
+    assert reaction_service.get_reaction_count_by_type(pid, 'LIKE') == 2
+    assert reaction_service.get_total_reactions(pid) == 3
+
+
+def test_reaction_summaries(users):
+    alice, bob, _ = users
+    p1 = project_service.create_new_project(alice.uid, 'One').pid
+    p2 = project_service.create_new_project(alice.uid, 'Two').pid
+    reaction_service.add_reaction(p1, alice.uid, 'LIKE')
+    reaction_service.add_reaction(p1, bob.uid, 'UPVOTE')
+
+    assert reaction_service.get_reaction_summaries([p1, p2]) == {p1: {'LIKE': 1, 'UPVOTE': 1}, p2: {}}
+
+
+def test_published_feed_pages_through_everything(users):
+    alice = users[0]
+    pids = [project_service.create_new_project(alice.uid, f'Project {i}').pid for i in range(7)]
+    draft = project_service.create_new_project(alice.uid, 'Draft')
+    draft.visibility = 'DRAFT'
+    project_service.db.session.commit()
+
+    seen, cursor = [], None
+    while True:
+        rows, cursor = project_service.get_published_project_feed(cursor, limit=3)
+        seen.extend(row.pid for row in rows)
+        if not cursor:
+            break
+
+    assert seen == sorted(pids, reverse=True)
+
+    with pytest.raises(ValueError):
+        project_service.get_published_project_feed('not-a-cursor')
+
+
+def test_friendship_lifecycle(users):
+    alice, bob, charlie = users
+
+    user_service.send_friend_request(alice.uid, bob.uid)
+    with pytest.raises(ValueError):
+        user_service.send_friend_request(bob.uid, alice.uid)
+
+    user_service.accept_friend_request(alice.uid, bob.uid)
+    assert [u.username for u in user_service.get_friends_list(alice.uid)] == ['Bob']
+    assert [u.username for u in user_service.get_friends_list(bob.uid)] == ['Alice']
+    assert user_service.get_friends_list(charlie.uid) == []
+
+    with pytest.raises(ValueError):
+        user_service.send_friend_request(alice.uid, alice.uid)
@@ -0,0 +1,19 @@
+from extensions import db
+from models.user import User
+import migrations
+
+
+def test_upgrade_is_idempotent(app):
+    assert migrations.upgrade() == 0
+    with db.engine.connect() as conn:
+        assert migrations.get_version(conn) == migrations.LATEST_VERSION
+
+
+def test_seed_command(app):
+    result = app.test_cli_runner().invoke(args=['seed-db'])
+    assert result.exit_code == 0
+    assert User.query.count() == 3
+
+
+def test_home_page_renders(client, users):
+    assert client.get('/').status_code == 200
@@ -0,0 +1,108 @@
+import time
+import pytest
+from extensions import db
+from models.trending import ReactionBucket, ProjectTrending
+from services import project_service, reaction_service, trending_service, bulk_service
+
+HOUR = 3600
+
+
+def scores():
+    return dict(db.session.execute(db.select(ProjectTrending.pid, ProjectTrending.hot_score)).all())
+
+
+def test_heat_decays_with_half_life():
+    now = time.time()
+    bucket = trending_service.bucket_for(now)
+    score = trending_service.score_buckets([(bucket, 4)])
+    start = bucket * trending_service.BUCKET_SECONDS
+
+    assert trending_service.heat(score, start) == pytest.approx(4)
+    assert trending_service.heat(score, start + 24 * HOUR) == pytest.approx(2)
+    assert trending_service.score_buckets([(bucket, 0)]) is None
+
+
+def test_add_reaction_updates_buckets_and_score(users):
+    alice, bob, charlie = users
+    pid = project_service.create_new_project(alice.uid, 'Project').pid
+
+    reaction_service.add_reaction(pid, bob.uid, 'LIKE')
+    reaction_service.add_reaction(pid, bob.uid, 'UPVOTE')  # a changed type isn't a new reaction
+    reaction_service.add_reaction(pid, charlie.uid, 'LIKE')
+
+    bucket = trending_service.bucket_for(time.time())
+    assert db.session.execute(db.select(ReactionBucket.bucket, ReactionBucket.count)).all() == [(bucket, 2)]
+    assert scores()[pid] == pytest.approx(trending_service.score_buckets([(bucket, 2)]))
+
+    reaction_service.remove_reaction(pid, bob.uid)
+    assert scores()[pid] == pytest.approx(trending_service.score_buckets([(bucket, 1)]))
+    reaction_service.remove_reaction(pid, charlie.uid)
+    assert scores() == {}
+    assert db.session.execute(db.select(ReactionBucket)).all() == []
+
+
+def test_recent_reactions_outrank_older_ones(users):
+    alice = users[0]
+    old, recent = (project_service.create_new_project(alice.uid, name).pid for name in ('Old', 'Recent'))
+    now = time.time()
+
+    # Five reactions three days ago are worth 5/8 of one now with a 24h half-life
+    for _ in range(5):
+        trending_service.record_reaction(old, now - 72 * HOUR)
+    trending_service.record_reaction(recent, now)
+    db.session.commit()
+
+    rows, _ = trending_service.get_trending_projects()
+    assert [row.name for row in rows] == ['Recent', 'Old']
+    assert trending_service.heat(rows[1].hot_score, now) == pytest.approx(5 / 8, rel=0.1)
+
+
+def test_rebuild_matches_incremental_scores(users):
+    alice, bob, charlie = users
+    pids = [project_service.create_new_project(alice.uid, f'Project {i}').pid for i in range(3)]
+    for pid in pids[:2]:
+        reaction_service.add_reaction(pid, bob.uid, 'LIKE')
+    reaction_service.add_reaction(pids[0], charlie.uid, 'LIKE')
+    incremental = scores()
+
+    trending_service.rebuild_scores()
+    db.session.commit()
+    assert scores() == pytest.approx(incremental)
+
+
+def test_feed_pagination(client, users):
+    alice, bob, _ = users
+    pids = [project_service.create_new_project(alice.uid, f'Project {i}').pid for i in range(5)]
+    now = time.time()
+    for rank, pid in enumerate(pids):
+        for _ in range(rank + 1):
+            trending_service.record_reaction(pid, now)
+    db.session.commit()
+
+    seen, cursor = [], None
+    while True:
+        rows, cursor = trending_service.get_trending_projects(cursor, limit=2)
+        seen += [row.pid for row in rows]
+        if not cursor:
+            break
+    assert seen == pids[::-1]
+
+    with pytest.raises(ValueError):
+        trending_service.get_trending_projects('garbage')
+
+    assert b'Project 4' in client.get('/trending').data
+    body = client.get('/api/v1/projects/trending?limit=1').get_json()
+    assert body['projects'][0]['pid'] == pids[-1]
+    assert body['projects'][0]['heat'] == pytest.approx(5, rel=0.1)
+
+
+def test_bulk_import_scores_reactions(users):
+    alice, bob, charlie = users
+    bulk_service.import_records([
+        {'kind': 'project', 'pid': 10, 'owner_uid': alice.uid, 'name': 'Imported', 'visibility': 'PUBLISHED', 'status': 0},
+        {'kind': 'reaction', 'pid': 10, 'uid': bob.uid, 'type': 'LIKE'},
+        {'kind': 'reaction', 'pid': 10, 'uid': charlie.uid, 'type': 'LIKE'},
+    ])
+    rows, _ = trending_service.get_trending_projects()
+    assert [row.pid for row in rows] == [10]
+    assert trending_service.heat(rows[0].hot_score) == pytest.approx(2, rel=0.1)
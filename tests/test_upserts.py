@@ -0,0 +1,119 @@
+import random
+import threading
+import pytest
+from app import create_app
+from extensions import db
+from models.project import ProjectMember
+from models.reaction import Reaction
+from models.trending import ReactionBucket, ProjectTrending
+from services import project_service, reaction_service, user_service
+from tests.conftest import capture_queries, login_as
+import migrations
+
+
+def test_new_reaction_starts_with_the_upsert(users):
+    alice, bob, _ = users
+    pid = project_service.create_new_project(alice.uid, 'Project').pid
+    uid = bob.uid
+
+    with capture_queries() as queries:
+        row = reaction_service.add_reaction(pid, uid, 'LIKE')
+
+    assert queries[0][0].startswith('INSERT INTO reactions')
+    assert (row.pid, row.uid, row.type) == (pid, uid, 'LIKE')
+
+
+def test_repeated_reaction_and_role_are_no_ops(users):
+    alice, bob, _ = users
+    pid = project_service.create_new_project(alice.uid, 'Project').pid
+    reaction_service.add_reaction(pid, bob.uid, 'LIKE')
+    project_service.update_project_member(pid, bob.uid, 'VIEWER')
+    version = project_service.get_project_details(pid).version
+
+    assert reaction_service.add_reaction(pid, bob.uid, 'LIKE').type == 'LIKE'
+    assert project_service.update_project_member(pid, bob.uid, 'VIEWER').role == 'VIEWER'
+    assert project_service.get_project_details(pid).version == version
+
+    with pytest.raises(ValueError):
+        project_service.add_project_member(pid, bob.uid)
+
+
+def test_toggle_reaction(users):
+    alice, bob, _ = users
+    pid = project_service.create_new_project(alice.uid, 'Project').pid
+
+    assert reaction_service.toggle_reaction(pid, bob.uid, 'LIKE') == 'LIKE'
+    assert reaction_service.toggle_reaction(pid, bob.uid, 'UPVOTE') == 'UPVOTE'
+    assert reaction_service.get_reaction_summary(pid) == {'UPVOTE': 1}
+    assert reaction_service.toggle_reaction(pid, bob.uid, 'UPVOTE') is None
+    assert reaction_service.get_reaction_summary(pid) == {}
+    assert db.session.get(ProjectTrending, pid) is None
+
+
+def test_toggle_reaction_api(client, users):
+    alice, bob, _ = users
+    pid = project_service.create_new_project(alice.uid, 'Project').pid
+    login_as(client, bob.uid)
+
+    toggle = f'/api/v1/projects/{pid}/reactions/toggle'
+    assert client.post(toggle, json={'type': 'like'}).get_json() == {'reactions': {'LIKE': 1}, 'mine': 'LIKE'}
+    assert client.post(toggle, json={'type': 'LIKE'}).get_json() == {'reactions': {}, 'mine': None}
+    assert client.post(toggle, json={}).status_code == 400
+
+
+def test_concurrent_writes_to_one_pair(tmp_path):
+    """Threads racing on one (pid, uid) never hit the unique constraints or leave counts out of step."""
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + str(tmp_path / 'race.db'),
+        'DATABASE_PROFILE': 'tuned',
+        'PASSWORD_HASH_METHOD': 'pbkdf2:sha256:1',
+        'PASSWORD_HASH_WORKERS': 0,
+    })
+    with app.app_context():
+        migrations.upgrade()
+        owner = user_service.create_new_user('owner@test.com', 'Owner', 'hash').uid
+        uid = user_service.create_new_user('racer@test.com', 'Racer', 'hash').uid
+        pid = project_service.create_new_project(owner, 'Project').pid
+        db.session.remove()
+
+    errors, joined = [], []
+    barrier = threading.Barrier(8)
+
+    def worker(seed):
+        rng = random.Random(seed)
+        with app.app_context():
+            try:
+                barrier.wait()
+                try:
+                    project_service.add_project_member(pid, uid, 'PETITION')
+                    joined.append(seed)
+                except ValueError:
+                    pass
+                for _ in range(25):
+                    action = rng.choice(('add', 'toggle', 'remove'))
+                    if action == 'add':
+                        reaction_service.add_reaction(pid, uid, rng.choice(('LIKE', 'UPVOTE')))
+                    elif action == 'toggle':
+                        reaction_service.toggle_reaction(pid, uid, rng.choice(('LIKE', 'UPVOTE')))
+                    else:
+                        reaction_service.remove_reaction(pid, uid)
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                db.session.remove()
+
+    threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len(joined) == 1
+    with app.app_context():
+        reactions = Reaction.query.filter_by(pid=pid).count()
+        assert reactions <= 1
+        assert db.session.query(db.func.coalesce(db.func.sum(ReactionBucket.count), 0)).filter_by(pid=pid).scalar() == reactions
+        assert (db.session.get(ProjectTrending, pid) is not None) == (reactions == 1)
+        assert db.session.get(ProjectMember, (pid, uid)).role == 'PETITION'
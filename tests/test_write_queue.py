@@ -0,0 +1,118 @@
+import threading
+import pytest
+from sqlalchemy import event
+from app import create_app
+from extensions import db
+from models.reaction import Reaction
+from models.trending import ReactionBucket
+from services import event_bus, project_service, reaction_service, user_service
+import migrations
+
+
+@pytest.fixture
+def make_app(tmp_path):
+    """Builds a file-backed app with the reaction write queue in the given mode, plus a project and 20 users."""
+    def make(mode, **config):
+        app = create_app(dict({
+            'TESTING': True,
+            'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + str(tmp_path / f'{mode}.db'),
+            'PASSWORD_HASH_METHOD': 'pbkdf2:sha256:1',
+            'PASSWORD_HASH_WORKERS': 0,
+            'REACTION_WRITE_MODE': mode,
+        }, **config))
+        with app.app_context():
+            migrations.upgrade()
+            uids = [user_service.create_new_user(f'user{i}@test.com', f'User{i}', 'hash').uid for i in range(20)]
+            pid = project_service.create_new_project(uids[0], 'Project').pid
+            db.session.remove()
+        return app, pid, uids
+
+    yield make
+    reaction_service.write_queue.configure(None)
+
+
+def run_threads(app, target, args_list):
+    errors = []
+
+    def worker(*args):
+        with app.app_context():
+            try:
+                target(*args)
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                db.session.remove()
+
+    threads = [threading.Thread(target=worker, args=args) for args in args_list]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return errors
+
+
+def test_group_mode_batches_commits_and_returns_results(make_app):
+    app, pid, uids = make_app('group', REACTION_FLUSH_MS=50)
+    subscription = event_bus.bus.subscribe(event_bus.project_topic(pid))
+    results, commits = [], [0]
+
+    def on_commit(conn):
+        commits[0] += 1
+
+    with app.app_context():
+        event.listen(db.engine, 'commit', on_commit)
+    errors = run_threads(app, lambda uid: results.append(reaction_service.add_reaction(pid, uid, 'LIKE')),
+                         [(uid,) for uid in uids])
+
+    assert errors == []
+    assert sorted(row.uid for row in results) == sorted(uids)
+    stats = reaction_service.get_write_queue_stats()
+    assert stats['written'] == len(uids) and stats['depth'] == 0
+    assert stats['batches'] < len(uids) and commits[0] == stats['batches']
+    assert len(subscription.get(timeout=0)) == len(uids)
+    with app.app_context():
+        assert reaction_service.get_reaction_summary(pid) == {'LIKE': len(uids)}
+        assert db.session.query(db.func.sum(ReactionBucket.count)).filter_by(pid=pid).scalar() == len(uids)
+    event_bus.bus.unsubscribe(subscription)
+
+
+def test_async_mode_acknowledges_before_commit(make_app):
+    app, pid, uids = make_app('async')
+    with app.app_context():
+        assert reaction_service.add_reaction(pid, uids[1], 'LIKE') is None
+        assert reaction_service.toggle_reaction(pid, uids[2], 'LIKE') is None
+        assert reaction_service.remove_reaction(pid, uids[2]) is True
+
+        reaction_service.write_queue.close()
+        assert reaction_service.get_reaction_summary(pid) == {'LIKE': 1}
+        assert reaction_service.get_user_reaction_type(pid, uids[1]) == 'LIKE'
+
+
+def test_failed_write_does_not_sink_its_batch(make_app):
+    app, pid, uids = make_app('group', REACTION_FLUSH_MS=300)
+    outcomes = {}
+
+    def broken_stage():
+        raise RuntimeError('broken write')
+
+    def write(kind):
+        if kind == 'broken':
+            try:
+                reaction_service.write_queue.submit(broken_stage)
+            except RuntimeError as exc:
+                outcomes[kind] = exc
+        else:
+            outcomes[kind] = reaction_service.add_reaction(pid, uids[1], 'LIKE')
+
+    assert run_threads(app, write, [('broken',), ('good',)]) == []
+    assert str(outcomes['broken']) == 'broken write'
+    assert outcomes['good'].type == 'LIKE'
+    stats = reaction_service.get_write_queue_stats()
+    assert (stats['written'], stats['failed'], stats['batches']) == (1, 1, 1)
+    with app.app_context():
+        assert Reaction.query.filter_by(pid=pid).count() == 1
+
+
+def test_queue_needs_a_file_database():
+    with pytest.raises(ValueError):
+        create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'REACTION_WRITE_MODE': 'group'})
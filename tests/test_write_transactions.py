@@ -0,0 +1,47 @@
+import pytest
+from sqlalchemy import event
+from extensions import db
+from models.project import Project, ProjectMember
+from services import project_service
+
+
+@pytest.fixture
+def commits(app):
+    count = [0]
+
+    def on_commit(conn):
+        count[0] += 1
+
+    event.listen(db.engine, 'commit', on_commit)
+    yield count
+    event.remove(db.engine, 'commit', on_commit)
+
+
+def test_create_project_commits_once(users, commits):
+    project = project_service.create_new_project(users[0].uid, 'Project')
+
+    assert commits[0] == 1
+    assert db.session.get(ProjectMember, (project.pid, users[0].uid)).role == 'OWNER'
+
+
+def test_failed_membership_leaves_no_project(users, monkeypatch):
+    def broken_member(**kwargs):
+        raise RuntimeError('membership failed')
+
+    monkeypatch.setattr(project_service, 'ProjectMember', broken_member)
+    with pytest.raises(RuntimeError):
+        project_service.create_new_project(users[0].uid, 'Orphan')
+
+    assert Project.query.filter_by(name='Orphan').count() == 0
+
+
+def test_update_member_inserts_or_updates_with_one_commit(users, commits):
+    alice, bob, _ = users
+    pid = project_service.create_new_project(alice.uid, 'Project').pid
+
+    commits[0] = 0
+    project_service.update_project_member(pid, bob.uid, 'PETITION')
+    project_service.update_project_member(pid, bob.uid, 'VIEWER')
+
+    assert commits[0] == 2
+    assert db.session.get(ProjectMember, (pid, bob.uid)).role == 'VIEWER'
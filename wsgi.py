@@ -0,0 +1,12 @@
+# Production WSGI entry point, served by gunicorn (see gunicorn.conf.py):
+#   gunicorn -c gunicorn.conf.py wsgi:app
+
+from app import create_app
+import migrations
+
+app = create_app()
+
+# Runs once per process. With preload_app this is once for the whole server,
+# before the workers are forked, and is a single pragma read when up to date.
+with app.app_context():
+    migrations.upgrade()